@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import logging
-import time
-from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     DOMAIN,
@@ -14,59 +15,77 @@ from .const import (
     CONF_LISTEN_PORT,
     CONF_DEVID,
     CONF_DEVPIN,
+    CONF_CAPTURE,
+    CONF_LONGTERM_STATS,
+    CONF_PUBLISH_MAX_STALE,
+    CONF_PUBLISH_TEMP_DEADBAND,
+    CONF_RETRY_DEADLINE,
+    CONF_RETRY_MAX_ATTEMPTS,
+    CONF_UPSTREAM_HOST,
+    CONF_UPSTREAM_PORT,
+    DEFAULT_LISTEN_PORT,
+    DEFAULT_PUBLISH_MAX_STALE,
+    DEFAULT_PUBLISH_TEMP_DEADBAND,
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    STORAGE_VERSION,
 )
-from .coordinator import EltermLocalCfg, EltermLocalServer
+from .coordinator import EltermCoordinator, EltermLocalCfg, EltermLocalServer
+from .longterm import LongTermStats
+from .power import PowerEstimator
+from .publish import FramePublisher, PublishPolicy
+from .schedule import ScheduleEngine
+from .services import async_setup_services
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["sensor", "number", "select", "climate", "switch"]
-THROTTLE_SECONDS = 2.0
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
+def _snapshot_store_key(entry: ConfigEntry) -> str:
+    return f"{DOMAIN}.{entry.entry_id}.snapshot"
+
+def _schedule_store_key(entry: ConfigEntry) -> str:
+    return f"{DOMAIN}.{entry.entry_id}.schedule"
+
+def _publish_policy(entry: ConfigEntry) -> PublishPolicy:
+    return PublishPolicy(
+        temp_deadband=float(entry.options.get(CONF_PUBLISH_TEMP_DEADBAND, DEFAULT_PUBLISH_TEMP_DEADBAND)),
+        max_stale=float(entry.options.get(CONF_PUBLISH_MAX_STALE, DEFAULT_PUBLISH_MAX_STALE)),
+    )
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
-    coordinator = DataUpdateCoordinator(
+    coordinator = EltermCoordinator(
         hass,
-        logger=_LOGGER,
         name=f"{DOMAIN}_{entry.entry_id}",
-        update_method=None,
-        update_interval=None,
+        store=Store(hass, STORAGE_VERSION, _snapshot_store_key(entry)),
     )
+    await coordinator.async_restore()
 
-    last_publish: float = 0.0
-    latest_obj: dict[str, Any] | None = None
-    scheduled_handle = None
-
-    def _publish_latest() -> None:
-        nonlocal last_publish, scheduled_handle, latest_obj
-        scheduled_handle = None
-        if latest_obj is None:
-            return
-        last_publish = time.monotonic()
-        coordinator.async_set_updated_data(latest_obj)
-
-    def _schedule_publish(delay: float) -> None:
-        nonlocal scheduled_handle
-        if scheduled_handle is not None:
-            return
-        if delay < 0:
-            delay = 0
-        scheduled_handle = hass.loop.call_later(delay, _publish_latest)
+    publisher = FramePublisher(hass, coordinator.async_set_frame, _publish_policy(entry))
+    longterm = LongTermStats(hass, entry.data[CONF_DEVID], entry.title)
+    power = PowerEstimator()
 
+    @callback
     def on_status(obj: dict) -> None:
-        nonlocal latest_obj, last_publish
-        latest_obj = obj
-        now = time.monotonic()
-
-        if last_publish == 0.0:
-            hass.loop.call_soon_threadsafe(_publish_latest)
-            return
+        # Statystyki dostają każdą ramkę; do encji trafia to, co przepuści publisher
+        longterm.async_add_frame(obj)
+        power.add_frame(obj)
+        publisher.async_on_status(obj)
 
-        elapsed = now - last_publish
-        if elapsed >= THROTTLE_SECONDS:
-            hass.loop.call_soon_threadsafe(_publish_latest)
-        else:
-            hass.loop.call_soon_threadsafe(_schedule_publish, THROTTLE_SECONDS - elapsed)
+    @callback
+    def on_connection(connected: bool) -> None:
+        coordinator.async_set_connected(connected)
+        schedule.async_set_connected(connected)
 
     server = EltermLocalServer(
         hass,
@@ -74,27 +93,87 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             listen_host=entry.data[CONF_LISTEN_HOST],
             listen_port=int(entry.data[CONF_LISTEN_PORT]),
             devid=entry.data[CONF_DEVID],
-            devpin=entry.data[CONF_DEVPIN],
+            devpin=entry.options.get(CONF_DEVPIN, entry.data[CONF_DEVPIN]),
+            retry_max_attempts=int(entry.options.get(CONF_RETRY_MAX_ATTEMPTS, DEFAULT_RETRY_MAX_ATTEMPTS)),
+            retry_deadline=float(entry.options.get(CONF_RETRY_DEADLINE, DEFAULT_RETRY_DEADLINE)),
         ),
         on_status=on_status,
+        entry_id=entry.entry_id,
+        on_connection=on_connection,
+        on_optimistic=coordinator.async_set_optimistic,
+        on_rollback=coordinator.async_rollback,
     )
 
-    await server.start()
+    schedule = ScheduleEngine(
+        hass, Store(hass, STORAGE_VERSION, _schedule_store_key(entry)), server.async_apply_settings
+    )
+    await schedule.async_load()
+
+    try:
+        await server.start()
+    except OSError as err:
+        # Port zajęty itp. – wpis się nie załaduje, więc nie zostawiamy uzbrojonych timerów
+        schedule.async_shutdown()
+        await coordinator.async_shutdown()
+        raise ConfigEntryNotReady(
+            f"LokalTerm: nie można nasłuchiwać na {entry.data[CONF_LISTEN_HOST]}:{entry.data[CONF_LISTEN_PORT]}: {err}"
+        ) from err
+    await server.async_set_capture(bool(entry.options.get(CONF_CAPTURE, False)))
+    await _async_set_upstream(server, entry)
+    await _async_set_longterm(longterm, entry)
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
 
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "server": server,
+        "publisher": publisher,
+        "longterm": longterm,
+        "power": power,
+        "schedule": schedule,
         "devid": entry.data[CONF_DEVID],
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
+async def _async_set_longterm(longterm: LongTermStats, entry: ConfigEntry) -> None:
+    if entry.options.get(CONF_LONGTERM_STATS, False):
+        await longterm.async_enable()
+    else:
+        longterm.async_disable()
+
+async def _async_set_upstream(server: EltermLocalServer, entry: ConfigEntry) -> None:
+    host = str(entry.options.get(CONF_UPSTREAM_HOST, "")).strip()
+    await server.async_set_upstream(host or None, int(entry.options.get(CONF_UPSTREAM_PORT, DEFAULT_LISTEN_PORT)))
+
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Zmiana opcji – stosujemy w działającym serwerze, bez zrywania połączenia."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    server: EltermLocalServer = data["server"]
+    data["publisher"].set_policy(_publish_policy(entry))
+    server.async_update_retry_policy(
+        max_attempts=int(entry.options.get(CONF_RETRY_MAX_ATTEMPTS, DEFAULT_RETRY_MAX_ATTEMPTS)),
+        deadline=float(entry.options.get(CONF_RETRY_DEADLINE, DEFAULT_RETRY_DEADLINE)),
+    )
+    server.async_update_pin(entry.options.get(CONF_DEVPIN, entry.data[CONF_DEVPIN]))
+    await server.async_set_capture(bool(entry.options.get(CONF_CAPTURE, False)))
+    await _async_set_upstream(server, entry)
+    await _async_set_longterm(data["longterm"], entry)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        server = hass.data[DOMAIN][entry.entry_id].get("server")
+        data = hass.data[DOMAIN][entry.entry_id]
+        data["publisher"].async_shutdown()
+        data["schedule"].async_shutdown()
+        await data["coordinator"].async_shutdown()
+        data["longterm"].async_disable()
+        server = data.get("server")
         if server:
-            # Tutaj można by dodać metodę stop() do serwera, jeśli potrzebna
-            pass
+            await server.stop()
         hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Usunięcie wpisu – kasujemy też zapisany stan pieca i harmonogram."""
+    await Store(hass, STORAGE_VERSION, _snapshot_store_key(entry)).async_remove()
+    await Store(hass, STORAGE_VERSION, _schedule_store_key(entry)).async_remove()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .const import (
+    CAPTURE_FLUSH_SECONDS,
+    CAPTURE_KEEP_FILES,
+    CAPTURE_MAX_BYTES,
+    CAPTURE_QUEUE_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DIR_IN = "in"
+DIR_OUT = "out"
+
+
+class FrameRecorder:
+    """Zapis ramek do rotowanych plików ``.jsonl.gz`` w wątku w tle.
+
+    Pętla zdarzeń tylko wkłada rekord do ograniczonej kolejki (``record``);
+    kompresja i zapis na dysk odbywają się w osobnym wątku. Gdy kolejka jest
+    pełna, rekord jest odrzucany i liczony w ``dropped``.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        prefix: str = "capture",
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        keep_files: int = CAPTURE_KEEP_FILES,
+    ) -> None:
+        self._dir = Path(directory)
+        self._prefix = prefix
+        self._max_bytes = max_bytes
+        self._keep = keep_files
+        self._queue: queue.Queue[tuple[float, str, dict[str, Any]] | None] = queue.Queue(CAPTURE_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._t0 = time.monotonic()
+        self.recorded = 0
+        self.dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._t0 = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="lokalterm_capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Kończy zapis (blokujące – wołać z executora)."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def record(self, direction: str, frame: dict[str, Any]) -> None:
+        """Nieblokujące dodanie ramki (już zamaskowanej) do kolejki zapisu."""
+        try:
+            self._queue.put_nowait((time.monotonic() - self._t0, direction, frame))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.recorded += 1
+
+    def _new_path(self) -> Path:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self._dir / f"{self._prefix}-{stamp}.jsonl.gz"
+        n = 1
+        while path.exists():
+            path = self._dir / f"{self._prefix}-{stamp}-{n}.jsonl.gz"
+            n += 1
+        return path
+
+    def _prune(self) -> None:
+        files = sorted(self._dir.glob(f"{self._prefix}-*.jsonl.gz"), key=lambda p: p.stat().st_mtime)
+        for old in files[: max(len(files) - self._keep, 0)]:
+            try:
+                old.unlink()
+            except OSError as e:
+                _LOGGER.debug("LokalTerm: nie można usunąć starego zapisu %s: %s", old, e)
+
+    def _run(self) -> None:
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            _LOGGER.error("LokalTerm: nie można utworzyć katalogu zapisu ramek: %s", e)
+            return
+
+        fh: gzip.GzipFile | None = None
+        written = 0
+        dirty = False
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=CAPTURE_FLUSH_SECONDS)
+                except queue.Empty:
+                    # Bezczynność – zrzucamy bufor kompresora na dysk
+                    if fh is not None and dirty:
+                        fh.flush()
+                        dirty = False
+                        last_flush = time.monotonic()
+                    continue
+                if item is None:
+                    break
+
+                if fh is None or written >= self._max_bytes:
+                    if fh is not None:
+                        fh.close()
+                    fh = gzip.open(self._new_path(), "ab")
+                    written = 0
+                    self._prune()
+
+                t, direction, frame = item
+                line = json.dumps({"t": round(t, 4), "dir": direction, "frame": frame}, separators=(",", ":"))
+                data = line.encode("utf-8") + b"\n"
+                fh.write(data)
+                written += len(data)
+                dirty = True
+
+                now = time.monotonic()
+                if now - last_flush >= CAPTURE_FLUSH_SECONDS:
+                    fh.flush()
+                    dirty = False
+                    last_flush = now
+        except OSError as e:
+            _LOGGER.error("LokalTerm: zapis ramek przerwany: %s", e)
+        finally:
+            if fh is not None:
+                fh.close()
+
+
+@dataclass(slots=True)
+class CaptureRecord:
+    t: float
+    direction: str
+    frame: dict[str, Any]
+
+
+def load_capture(path: str | os.PathLike[str]) -> list[CaptureRecord]:
+    """Wczytuje plik zapisu (blokujące – wołać z executora)."""
+    records: list[CaptureRecord] = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                    records.append(CaptureRecord(float(rec["t"]), str(rec["dir"]), dict(rec["frame"])))
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except EOFError:
+        # Plik urwany (np. restart HA w trakcie zapisu) – zwracamy to, co się dało odczytać
+        pass
+    return records
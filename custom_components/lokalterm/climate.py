@@ -1,5 +1,4 @@
 from __future__ import annotations
-from typing import Any
 
 from homeassistant.components.climate import ClimateEntity, ClimateEntityFeature, HVACMode
 from homeassistant.config_entries import ConfigEntry
@@ -9,23 +8,14 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .fields import FIELDS
+from .snapshot import EltermSnapshot
 
 
 PRESET_NORMALNY = "Normalny"
 PRESET_PRIORYTET = "Priorytet"
 
 
-def _to_temp(value: Any) -> float | None:
-    try:
-        return int(value) / 100.0 if value is not None else None
-    except Exception:
-        return None
-
-
-def _temp_to_wire(value_c: float) -> str:
-    return str(int(round(value_c * 100)))
-
-
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     data = hass.data[DOMAIN][entry.entry_id]
     async_add_entities(
@@ -38,10 +28,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 
 class _BaseEltermClimate(CoordinatorEntity, ClimateEntity):
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
-    _attr_max_temp = 69.0
+    # Pole nastawy temperatury (zakres i kodowanie z rejestru pól)
+    _temp_field: str
+    # Pola ramki SkzpData, od których zależy stan termostatu (routing aktualizacji)
+    _fields: frozenset[str] = frozenset()
 
     def __init__(self, coordinator, server, devid: str, dev_name: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, self._fields)
+        spec = FIELDS[self._temp_field]
+        self._attr_min_temp = spec.min_value
+        self._attr_max_temp = spec.max_value
+        self._attr_target_temperature_step = spec.step
         self._server = server
         self._devid = devid
         self._attr_device_info = {
@@ -53,13 +50,19 @@ class _BaseEltermClimate(CoordinatorEntity, ClimateEntity):
 
     @property
     def available(self) -> bool:
-        return self.coordinator.data is not None
+        return self.coordinator.available
+
+    @property
+    def _snapshot(self) -> EltermSnapshot | None:
+        return self.coordinator.data
 
 
 class EltermCoClimate(_BaseEltermClimate):
     _attr_name = "Termostat CO"
     _attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+    _fields = frozenset({"BoilerTempAct", "BoilerTempCmd", "CH1Mode"})
+    _temp_field = "BoilerTempCmd"
 
     def __init__(self, coordinator, server, devid: str, dev_name: str) -> None:
         super().__init__(coordinator, server, devid, dev_name)
@@ -68,22 +71,22 @@ class EltermCoClimate(_BaseEltermClimate):
 
     @property
     def current_temperature(self) -> float | None:
-        return _to_temp((self.coordinator.data or {}).get("BoilerTempAct"))
+        return self._snapshot.boiler_temp_act if self._snapshot else None
 
     @property
     def target_temperature(self) -> float | None:
-        return _to_temp((self.coordinator.data or {}).get("BoilerTempCmd"))
+        return self._snapshot.boiler_temp_cmd if self._snapshot else None
 
     @property
     def hvac_mode(self) -> HVACMode | None:
-        mode = (self.coordinator.data or {}).get("CH1Mode")
+        mode = self._snapshot.ch1_mode if self._snapshot else None
         return HVACMode.OFF if mode == "Stop" else HVACMode.HEAT
 
     async def async_set_temperature(self, **kwargs) -> None:
         temp = kwargs.get("temperature")
         if temp is None:
             return
-        await self._server.send_data_to_send({"BoilerTempCmd": _temp_to_wire(float(temp))})
+        await self._server.send_data_to_send({"BoilerTempCmd": FIELDS["BoilerTempCmd"].encode(temp)})
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         mode = "Stop" if hvac_mode == HVACMode.OFF else "Still_On"
@@ -95,6 +98,8 @@ class EltermCwuClimate(_BaseEltermClimate):
     _attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
     _attr_preset_modes = [PRESET_NORMALNY, PRESET_PRIORYTET]
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.PRESET_MODE
+    _fields = frozenset({"DHWTempAct", "DHWTempCmd", "DHWMode"})
+    _temp_field = "DHWTempCmd"
 
     def __init__(self, coordinator, server, devid: str, dev_name: str) -> None:
         super().__init__(coordinator, server, devid, dev_name)
@@ -103,20 +108,20 @@ class EltermCwuClimate(_BaseEltermClimate):
 
     @property
     def current_temperature(self) -> float | None:
-        return _to_temp((self.coordinator.data or {}).get("DHWTempAct"))
+        return self._snapshot.dhw_temp_act if self._snapshot else None
 
     @property
     def target_temperature(self) -> float | None:
-        return _to_temp((self.coordinator.data or {}).get("DHWTempCmd"))
+        return self._snapshot.dhw_temp_cmd if self._snapshot else None
 
     @property
     def hvac_mode(self) -> HVACMode | None:
-        mode = (self.coordinator.data or {}).get("DHWMode")
+        mode = self._snapshot.dhw_mode if self._snapshot else None
         return HVACMode.OFF if mode == "Stop" else HVACMode.HEAT
 
     @property
     def preset_mode(self) -> str | None:
-        mode = (self.coordinator.data or {}).get("DHWMode")
+        mode = self._snapshot.dhw_mode if self._snapshot else None
         if mode == "Priority":
             return PRESET_PRIORYTET
         return PRESET_NORMALNY
@@ -125,7 +130,7 @@ class EltermCwuClimate(_BaseEltermClimate):
         temp = kwargs.get("temperature")
         if temp is None:
             return
-        await self._server.send_data_to_send({"DHWTempCmd": _temp_to_wire(float(temp))})
+        await self._server.send_data_to_send({"DHWTempCmd": FIELDS["DHWTempCmd"].encode(temp)})
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         if hvac_mode == HVACMode.OFF:
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import string
+import time
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+from .const import (
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_JITTER,
+    RETRY_MAX_DELAY_SECONDS,
+)
+
+
+# Wynik zmiany pola (AckTracker)
+ACK_CONFIRMED = "acked"
+ACK_TIMEOUT = "timeout"
+ACK_SUPERSEDED = "superseded"  # nowsza komenda zmieniła pole przed potwierdzeniem
+ACK_CANCELLED = "cancelled"  # sesja zatrzymana
+
+
+def _rand_token(n: int = 7) -> str:
+    return "".join(random.choice(string.ascii_uppercase) for _ in range(n))
+
+
+@dataclass(slots=True)
+class PendingField:
+    """Oczekująca na potwierdzenie zmiana jednego pola DataToSend."""
+
+    value: str
+    token: str
+    queued_at: float = field(default_factory=time.monotonic)
+    sent_at: float | None = None
+    attempts: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Parametry retransmisji niepotwierdzonych komend."""
+
+    max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS
+    deadline: float = DEFAULT_RETRY_DEADLINE
+    base_delay: float = RETRY_BASE_DELAY_SECONDS
+    max_delay: float = RETRY_MAX_DELAY_SECONDS
+    jitter: float = RETRY_JITTER
+
+    def delay(self, attempts: int) -> float:
+        """Czas do kolejnej próby po ``attempts`` dotychczasowych wysyłkach."""
+        base = min(self.max_delay, self.base_delay * (2 ** max(attempts - 1, 0)))
+        return base * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+
+class CommandQueue:
+    """Kolejka zmian dla jednego urządzenia – scala zapisy po kluczu pola.
+
+    Kolejne kliknięcia w UI nadpisują tylko swoje pole, więc jedna ramka
+    DataToSend niesie wszystkie niepotwierdzone jeszcze zmiany. Każde pole ma
+    własny token, a pole znika z kolejki dopiero po potwierdzeniu w SkzpData.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[str, PendingField] = {}
+        self._frame_token: str | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def pending(self) -> Mapping[str, PendingField]:
+        return self._pending
+
+    @property
+    def frame_token(self) -> str | None:
+        """vToken ramki – token najnowszej zmiany (stały przy retransmisjach)."""
+        return self._frame_token
+
+    def merge(self, fields: Mapping[str, Any]) -> dict[str, str]:
+        """Dokłada zmiany do kolejki; zwraca nowe tokeny per pole."""
+        now = time.monotonic()
+        tokens: dict[str, str] = {}
+        for key, value in fields.items():
+            token = _rand_token()
+            self._pending[key] = PendingField(value=str(value), token=token, queued_at=now)
+            tokens[key] = token
+            self._frame_token = token
+        return tokens
+
+    def values(self) -> dict[str, str]:
+        """Wartości wszystkich niepotwierdzonych pól (do ramki DataToSend)."""
+        return {k: p.value for k, p in self._pending.items()}
+
+    def mark_sent(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        for p in self._pending.values():
+            if p.sent_at is None:
+                p.sent_at = now
+            p.attempts += 1
+
+    def ack(self, obj: Mapping[str, Any]) -> dict[str, PendingField]:
+        """Usuwa pola, których wartość potwierdził piec; zwraca potwierdzone."""
+        acked = {k: p for k, p in self._pending.items() if str(obj.get(k)) == p.value}
+        for k in acked:
+            del self._pending[k]
+        if not self._pending:
+            self._frame_token = None
+        return acked
+
+    def min_attempts(self) -> int:
+        """Liczba wysyłek najświeższego pola – od niej liczony jest backoff."""
+        return min((p.attempts for p in self._pending.values()), default=0)
+
+    def expire(self, policy: RetryPolicy, now: float | None = None) -> dict[str, PendingField]:
+        """Usuwa pola po przekroczeniu terminu lub limitu prób; zwraca usunięte."""
+        now = time.monotonic() if now is None else now
+        expired = {
+            k: p
+            for k, p in self._pending.items()
+            if now - p.queued_at >= policy.deadline or p.attempts >= policy.max_attempts
+        }
+        for k in expired:
+            del self._pending[k]
+        if not self._pending:
+            self._frame_token = None
+        return expired
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._frame_token = None
+
+
+class AckTracker:
+    """Oczekiwanie na wynik grupy pól wysłanych jedną komendą.
+
+    Każda grupa pamięta tokeny swoich pól; pole jest rozstrzygane, gdy
+    ``CommandQueue`` je potwierdzi lub wygasi. Inny token przy potwierdzeniu
+    oznacza, że wartość zmieniła w międzyczasie nowsza komenda.
+    """
+
+    def __init__(self) -> None:
+        self._waiters: list[tuple[dict[str, str], dict[str, str], asyncio.Future[dict[str, str]]]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._waiters)
+
+    def track(self, tokens: Mapping[str, str]) -> asyncio.Future[dict[str, str]]:
+        """Future z wynikiem ``pole -> ACK_*`` rozstrzygany po ostatnim polu grupy."""
+        future: asyncio.Future[dict[str, str]] = asyncio.get_running_loop().create_future()
+        self._waiters.append((dict(tokens), {}, future))
+        return future
+
+    def resolve(self, fields: Mapping[str, PendingField], status: str) -> None:
+        if not self._waiters:
+            return
+        done = []
+        for waiter in self._waiters:
+            tokens, results, future = waiter
+            for key, pending in fields.items():
+                if key in tokens and key not in results:
+                    results[key] = status if pending.token == tokens[key] else ACK_SUPERSEDED
+            if len(results) == len(tokens):
+                done.append(waiter)
+                if not future.done():
+                    future.set_result(results)
+        for waiter in done:
+            self._waiters.remove(waiter)
+
+    def cancel(self) -> None:
+        """Rozstrzyga wszystkie grupy – nierozstrzygnięte pola jako ACK_CANCELLED."""
+        waiters, self._waiters = self._waiters, []
+        for tokens, results, future in waiters:
+            for key in tokens:
+                results.setdefault(key, ACK_CANCELLED)
+            if not future.done():
+                future.set_result(results)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME
+from homeassistant.core import callback
 
 from .const import (
     DOMAIN,
@@ -10,8 +11,20 @@ from .const import (
     CONF_LISTEN_PORT,
     CONF_DEVID,
     CONF_DEVPIN,
+    CONF_CAPTURE,
+    CONF_LONGTERM_STATS,
+    CONF_PUBLISH_MAX_STALE,
+    CONF_PUBLISH_TEMP_DEADBAND,
+    CONF_RETRY_DEADLINE,
+    CONF_RETRY_MAX_ATTEMPTS,
+    CONF_UPSTREAM_HOST,
+    CONF_UPSTREAM_PORT,
     DEFAULT_LISTEN_HOST,
     DEFAULT_LISTEN_PORT,
+    DEFAULT_PUBLISH_MAX_STALE,
+    DEFAULT_PUBLISH_TEMP_DEADBAND,
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
 )
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
@@ -27,6 +40,11 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlow:
+        return OptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         if user_input is None:
             return self.async_show_form(step_id="user", data_schema=STEP_USER_DATA_SCHEMA)
@@ -36,3 +54,57 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         title = user_input.pop(CONF_NAME)
         return self.async_create_entry(title=title, data=user_input)
+
+
+class OptionsFlow(config_entries.OptionsFlow):
+    def __init__(self, entry: config_entries.ConfigEntry) -> None:
+        self._entry = entry
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            # Wyczyszczone pole frontend pomija – brak hosta to wyłączony tryb proxy
+            user_input[CONF_UPSTREAM_HOST] = str(user_input.get(CONF_UPSTREAM_HOST) or "").strip()
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_DEVPIN,
+                    default=options.get(CONF_DEVPIN, self._entry.data[CONF_DEVPIN]),
+                ): str,
+                vol.Required(
+                    CONF_RETRY_MAX_ATTEMPTS,
+                    default=options.get(CONF_RETRY_MAX_ATTEMPTS, DEFAULT_RETRY_MAX_ATTEMPTS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                vol.Required(
+                    CONF_RETRY_DEADLINE,
+                    default=options.get(CONF_RETRY_DEADLINE, DEFAULT_RETRY_DEADLINE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=2, max=300)),
+                vol.Required(
+                    CONF_PUBLISH_TEMP_DEADBAND,
+                    default=options.get(CONF_PUBLISH_TEMP_DEADBAND, DEFAULT_PUBLISH_TEMP_DEADBAND),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Required(
+                    CONF_PUBLISH_MAX_STALE,
+                    default=options.get(CONF_PUBLISH_MAX_STALE, DEFAULT_PUBLISH_MAX_STALE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=2, max=900)),
+                vol.Required(
+                    CONF_LONGTERM_STATS,
+                    default=options.get(CONF_LONGTERM_STATS, False),
+                ): bool,
+                vol.Required(
+                    CONF_CAPTURE,
+                    default=options.get(CONF_CAPTURE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_UPSTREAM_HOST,
+                    description={"suggested_value": options.get(CONF_UPSTREAM_HOST)},
+                ): str,
+                vol.Required(
+                    CONF_UPSTREAM_PORT,
+                    default=options.get(CONF_UPSTREAM_PORT, DEFAULT_LISTEN_PORT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
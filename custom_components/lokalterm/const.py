@@ -1,11 +1,112 @@
 DOMAIN = "lokalterm"
 
+# Klucz w hass.data[DOMAIN] ze wspólnymi listenerami TCP: (host, port) -> EltermListener
+DATA_LISTENERS = "listeners"
+
 CONF_LISTEN_HOST = "listen_host"
 CONF_LISTEN_PORT = "listen_port"
 CONF_DEVID = "devid"
 CONF_DEVPIN = "devpin"
+CONF_RETRY_MAX_ATTEMPTS = "retry_max_attempts"
+CONF_RETRY_DEADLINE = "retry_deadline"
+CONF_CAPTURE = "capture"
+CONF_PUBLISH_TEMP_DEADBAND = "publish_temp_deadband"
+CONF_PUBLISH_MAX_STALE = "publish_max_stale"
+CONF_LONGTERM_STATS = "longterm_stats"
+CONF_UPSTREAM_HOST = "upstream_host"
+CONF_UPSTREAM_PORT = "upstream_port"
 
 DEFAULT_LISTEN_HOST = "0.0.0.0"
 DEFAULT_LISTEN_PORT = 1088
 
-BU_MODUL_TO_PERCENT = {0: 33, 1: 67, 2: 100}
\ No newline at end of file
+BU_MODUL_TO_PERCENT = {0: 33, 1: 67, 2: 100}
+
+# Twardy limit długości pojedynczej ramki (bajty) – ochrona bufora przed śmieciami
+MAX_FRAME_BYTES = 8192
+
+# Kolejka komend: debounce szybkich zmian w UI i limit oczekiwania na potwierdzenie
+COMMAND_DEBOUNCE_SECONDS = 0.25
+COMMAND_DEBOUNCE_MAX_SECONDS = 1.0
+
+# Retransmisje niepotwierdzonych komend: backoff wykładniczy z jitterem
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 8.0
+RETRY_JITTER = 0.2
+DEFAULT_RETRY_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DEADLINE = 20.0
+# Nakładka optymistyczna żyje do potwierdzenia, najdłużej termin retransmisji + zapas
+OPTIMISTIC_GRACE_SECONDS = 2.0
+
+EVENT_COMMAND_TIMEOUT = f"{DOMAIN}_command_timeout"
+EVENT_SETTINGS_APPLIED = f"{DOMAIN}_settings_applied"
+
+SERVICE_APPLY_SETTINGS = "apply_settings"
+SERVICE_SET_SCHEDULE = "set_schedule"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+# Statystyki protokołu: rozmiar bufora pomiarów opóźnień i okno liczenia tempa (s)
+STATS_RING_SIZE = 256
+STATS_RATE_WINDOW_SECONDS = 60
+# Diagnostyka: historia połączeń i próbka ostatnich ramek
+STATS_CONNECTION_HISTORY = 20
+STATS_RECENT_FRAMES = 10
+
+# Strumień websocket (lokalterm/subscribe): maks. liczba zmian czekających na
+# wysłanie do jednego subskrybenta – przy przepełnieniu odrzucane są najstarsze
+WS_SUBSCRIBER_BUFFER = 32
+
+# Zapis ramek do plików (opcjonalny): katalog w /config, rotacja i bufor wątku zapisu
+CAPTURE_DIR = "lokalterm_capture"
+CAPTURE_MAX_BYTES = 5 * 1024 * 1024
+CAPTURE_KEEP_FILES = 10
+CAPTURE_QUEUE_SIZE = 10000
+CAPTURE_FLUSH_SECONDS = 2.0
+
+# Publikacja ramek do encji: pola sterujące (fields.WRITABLE_FIELDS) od razu,
+# pomiary z martwą strefą, pozostałe zmiany nie częściej niż co
+# PUBLISH_MIN_INTERVAL_SECONDS
+PUBLISH_MIN_INTERVAL_SECONDS = 2.0
+DEFAULT_PUBLISH_TEMP_DEADBAND = 0.1
+DEFAULT_PUBLISH_ENERGY_DEADBAND = 0.1
+DEFAULT_PUBLISH_MAX_STALE = 60.0
+
+# Statystyki długoterminowe: kubełki 5-minutowe w pamięci (24 h), import godzinowy
+LTS_BUCKET_SECONDS = 300
+LTS_BUCKET_COUNT = 288
+
+# Estymacja mocy z licznika P033: stała czasowa wygładzania (s) i waga nowej
+# próbki przy uczeniu mocy znamionowej
+POWER_SMOOTHING_SECONDS = 120.0
+POWER_RATED_SMOOTHING = 0.1
+
+# Żywotność połączeń: keepalive TCP (s) i zamykanie połączeń bez ramek przez
+# CONNECTION_IDLE_TIMEOUT sekund (sprawdzane co CONNECTION_WATCHDOG_SECONDS)
+TCP_KEEPALIVE_IDLE = 30
+TCP_KEEPALIVE_INTERVAL = 10
+TCP_KEEPALIVE_COUNT = 3
+CONNECTION_IDLE_TIMEOUT = 90.0
+CONNECTION_WATCHDOG_SECONDS = 15.0
+
+# Zapis do pieca: próg bufora nadawczego transportu (powyżej niego kolejne
+# komendy czekają scalone w kolejce) i limit czasu opróżnienia bufora – po nim
+# połączenie uznajemy za martwe
+WRITE_BUFFER_HIGH_BYTES = 4096
+DRAIN_TIMEOUT_SECONDS = 5.0
+
+# Tryb proxy: kolejka ramek do serwera nadrzędnego (przy przepełnieniu
+# odrzucane są najstarsze), limit czasu łączenia i backoff ponownych prób (s)
+UPSTREAM_QUEUE_SIZE = 16
+UPSTREAM_CONNECT_TIMEOUT_SECONDS = 10.0
+UPSTREAM_RECONNECT_MIN_SECONDS = 1.0
+UPSTREAM_RECONNECT_MAX_SECONDS = 60.0
+
+# Po wyrejestrowaniu ostatniego urządzenia gniazdo nasłuchu i połączenia pieców
+# czekają tyle sekund na ponowną rejestrację (przeładowanie integracji)
+LISTENER_RELEASE_GRACE_SECONDS = 5.0
+
+# Ostatni znany stan pieca w .storage: odczyt przy starcie, zapis najwyżej raz
+# na SNAPSHOT_SAVE_DELAY_SECONDS; odtworzone dane są pokazywane jako nieaktualne
+# do pierwszego połączenia, najdłużej SNAPSHOT_STALE_SECONDS
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY_SECONDS = 60.0
+SNAPSHOT_STALE_SECONDS = 300.0
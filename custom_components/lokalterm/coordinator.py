@@ -3,13 +3,37 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import random
-import string
 import time
+from contextlib import suppress
 from dataclasses import dataclass
-from typing import Any, Callable
-
-from homeassistant.core import HomeAssistant
+from typing import Any, Callable, Iterable, Mapping
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .capture import DIR_IN, DIR_OUT, FrameRecorder
+from .commands import ACK_CONFIRMED, ACK_TIMEOUT, AckTracker, CommandQueue, PendingField, RetryPolicy
+from .const import (
+    CAPTURE_DIR,
+    COMMAND_DEBOUNCE_MAX_SECONDS,
+    COMMAND_DEBOUNCE_SECONDS,
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DOMAIN,
+    DRAIN_TIMEOUT_SECONDS,
+    EVENT_COMMAND_TIMEOUT,
+    OPTIMISTIC_GRACE_SECONDS,
+    SNAPSHOT_SAVE_DELAY_SECONDS,
+    SNAPSHOT_STALE_SECONDS,
+)
+from .listener import async_get_listener, async_release_listener
+from .overlay import OptimisticOverlay
+from .protocol import EltermProtocol
+from .snapshot import EltermSnapshot, decode_frame, overlay_snapshot
+from .stats import ConnectionRecord, LatencyRing, ServerStats
+from .upstream import UpstreamRelay
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,8 +49,192 @@ def _mask_sensitive(d: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
-def _rand_token(n: int = 7) -> str:
-    return "".join(random.choice(string.ascii_uppercase) for _ in range(n))
+class EltermCoordinator(DataUpdateCoordinator):
+    """Koordynator push – dekoduje ramkę do EltermSnapshot i powiadamia tylko
+    encje, których pola ramki się zmieniły.
+
+    Encje deklarują obserwowane pola jako ``frozenset`` przekazany jako kontekst
+    ``CoordinatorEntity``; na tej podstawie budowana jest mapa pole -> słuchacze.
+
+    Wartości wysłane z UI, jeszcze niepotwierdzone przez piec, trzymane są
+    w ``overlay`` i nakładane na ostatnią prawdziwą ramkę tylko na czas ich
+    życia. Każda ramka od pieca dekodowana jest raz; publikacja z nakładkami
+    dekoduje tylko nadpisane pola, a bez nakładek ``data`` to zdekodowana
+    ramka bez kopiowania.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, store: Store | None = None) -> None:
+        super().__init__(
+            hass,
+            logger=_LOGGER,
+            name=name,
+            update_method=None,
+            update_interval=None,
+        )
+        # None = nieznany zakres zmian (np. pierwsza ramka) -> odśwież wszystkich
+        self.changed_fields: frozenset[str] | None = None
+        # Czy piec ma aktywne połączenie (ustawiane przez serwer)
+        self.connected = False
+        # Ostatni stan w .storage; stale = dane odtworzone, jeszcze bez ramki od pieca
+        self._store = store
+        self._save_pending = False
+        self.stale = False
+        self.restored_at: float | None = None
+        self._stale_handle: asyncio.TimerHandle | None = None
+        # Ostatnia prawdziwa ramka od pieca (zdekodowana) i optymistyczne nakładki z UI
+        self._real: EltermSnapshot | None = None
+        self.overlay = OptimisticOverlay(hass, self._async_overlay_expired)
+        self._field_listeners: dict[str, dict[CALLBACK_TYPE, None]] = {}
+        self._unrouted_listeners: dict[CALLBACK_TYPE, None] = {}
+        # Czas dekodowania i powiadomienia encji przy publikacji (µs)
+        self.update_duration = LatencyRing()
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        remove = super().async_add_listener(update_callback, context)
+
+        if isinstance(context, frozenset) and context:
+            buckets = [self._field_listeners.setdefault(f, {}) for f in context]
+        else:
+            buckets = [self._unrouted_listeners]
+        for bucket in buckets:
+            bucket[update_callback] = None
+
+        @callback
+        def remove_listener() -> None:
+            for bucket in buckets:
+                bucket.pop(update_callback, None)
+            remove()
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        changed = self.changed_fields
+        if changed is None:
+            super().async_update_listeners()
+            return
+
+        # dict zachowuje kolejność i deduplikuje encje obserwujące kilka pól
+        targets: dict[CALLBACK_TYPE, None] = dict(self._unrouted_listeners)
+        for field in changed:
+            bucket = self._field_listeners.get(field)
+            if bucket:
+                targets.update(bucket)
+        for update_callback in list(targets):
+            update_callback()
+
+    @property
+    def available(self) -> bool:
+        """Encje są dostępne, gdy są dane i żywe połączenie z piecem (lub świeżo odtworzony stan)."""
+        return self.data is not None and (self.connected or self.stale)
+
+    async def async_restore(self) -> bool:
+        """Odtwarza ostatni zapisany stan jako nieaktualny; zwraca True, gdy był zapis."""
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        raw = stored.get("raw") if isinstance(stored, dict) else None
+        if not isinstance(raw, dict) or self.data is not None:
+            return False
+        self.changed_fields = None
+        self.data = self._real = decode_frame(raw)
+        self.stale = True
+        self.restored_at = stored.get("saved_at")
+        self._stale_handle = self.hass.loop.call_later(SNAPSHOT_STALE_SECONDS, self._async_expire_stale)
+        _LOGGER.debug("LokalTerm: odtworzono ostatni stan pieca z %s", self.restored_at)
+        return True
+
+    @callback
+    def _async_expire_stale(self) -> None:
+        self._stale_handle = None
+        self._clear_stale()
+        if not self.connected:
+            super().async_update_listeners()
+
+    def _clear_stale(self) -> None:
+        self.stale = False
+        if self._stale_handle is not None:
+            self._stale_handle.cancel()
+            self._stale_handle = None
+
+    def _store_data(self) -> dict[str, Any]:
+        self._save_pending = False
+        # Zapisujemy stan pieca, bez niepotwierdzonych nakładek
+        real = self._real
+        return {"saved_at": time.time(), "raw": dict(real.raw) if real is not None else None}
+
+    @callback
+    def _schedule_save(self) -> None:
+        # Jeden zaplanowany zapis obejmuje wszystkie ramki do chwili zapisu
+        if self._store is None or self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._store_data, SNAPSHOT_SAVE_DELAY_SECONDS)
+
+    async def async_shutdown(self) -> None:
+        """Zapisuje od razu oczekujący stan (np. przed przeładowaniem) i zatrzymuje timery."""
+        self._clear_stale()
+        self.overlay.async_shutdown()
+        if self._store is not None and self._save_pending:
+            await self._store.async_save(self._store_data())
+        await super().async_shutdown()
+
+    @callback
+    def async_set_connected(self, connected: bool) -> None:
+        if connected == self.connected:
+            return
+        self.connected = connected
+        # Zmiana dostępności dotyczy wszystkich encji, niezależnie od pól
+        super().async_update_listeners()
+
+    @callback
+    def async_set_frame(self, obj: dict[str, Any]) -> None:
+        """Dekoduje i publikuje ramkę, jeśli różni się od poprzedniej w choć jednym polu."""
+        prev = self._real.raw if self._real is not None else None
+        if self.stale:
+            self._clear_stale()
+        # Pola potwierdzone przez piec przestają być nakładką (ta sama wartość – bez skoku)
+        self.overlay.settle(obj)
+        changed: frozenset[str] | None = None
+        if prev is not None:
+            changed = frozenset(k for k in obj.keys() | prev.keys() if obj.get(k) != prev.get(k))
+            if not changed:
+                return
+        self._async_publish(changed, obj)
+        self._schedule_save()
+
+    @callback
+    def async_set_optimistic(self, fields: Mapping[str, Any], ttl: float) -> None:
+        """Nakłada wysłane z UI wartości na stan do potwierdzenia (lub ``ttl``)."""
+        changed = self.overlay.set(fields, ttl)
+        if changed and self._real is not None:
+            self._async_publish(changed)
+
+    @callback
+    def async_rollback(self, keys: Iterable[str]) -> None:
+        """Wycofuje nakładki pól, których piec nie przyjął – encje wracają do stanu pieca."""
+        removed = self.overlay.clear(keys)
+        if removed and self._real is not None:
+            self._async_publish(removed)
+
+    @callback
+    def _async_overlay_expired(self, removed: frozenset[str]) -> None:
+        if self._real is not None:
+            self._async_publish(removed)
+
+    @callback
+    def _async_publish(self, changed: frozenset[str] | None, frame: Mapping[str, Any] | None = None) -> None:
+        start = time.perf_counter()
+        if frame is not None:
+            self._real = decode_frame(frame)
+        real = self._real
+        assert real is not None
+        self.changed_fields = changed
+        self.async_set_updated_data(overlay_snapshot(real, self.overlay.values) if self.overlay else real)
+        self.update_duration.add((time.perf_counter() - start) * 1_000_000.0)
 
 
 @dataclass
@@ -35,6 +243,8 @@ class EltermLocalCfg:
     listen_port: int
     devid: str
     devpin: str
+    retry_max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS
+    retry_deadline: float = DEFAULT_RETRY_DEADLINE
 
 
 class EltermLocalServer:
@@ -43,133 +253,422 @@ class EltermLocalServer:
         hass: HomeAssistant,
         cfg: EltermLocalCfg,
         on_status: Callable[[dict[str, Any]], None],
+        entry_id: str | None = None,
+        on_connection: Callable[[bool], None] | None = None,
+        on_optimistic: Callable[[dict[str, str], float], None] | None = None,
+        on_rollback: Callable[[Iterable[str]], None] | None = None,
     ) -> None:
         self.hass = hass
         self.cfg = cfg
         self.on_status = on_status
-        self._server: asyncio.Server | None = None
-        self._client_writer: asyncio.StreamWriter | None = None
-
-        self._last_obj: dict[str, Any] = {}
-        self._pending_fields: dict[str, Any] | None = None
-        self._pending_token: str | None = None
-        self._lock = asyncio.Lock()
-        self._last_send_time: float = 0
+        self.on_connection = on_connection
+        # Optymistyczny UI: nakładka wysłanych pól (z terminem) i jej wycofanie po timeoucie
+        self.on_optimistic = on_optimistic
+        self.on_rollback = on_rollback
+        self.entry_id = entry_id
+        self._client: EltermProtocol | None = None
+        # Rekord bieżącego połączenia w historii (diagnostyka)
+        self._connection: ConnectionRecord | None = None
+
+        self._commands = CommandQueue()
+        # Grupy pól czekające na wynik (usługa apply_settings)
+        self._acks = AckTracker()
+        # Początek ramki DataToSend (FrameType, vId, vPin) – kodowany raz na sesję/PIN
+        self._prefix = self._encode_prefix()
+        # Debounce wysyłki: jeden timer zamiast zadania na każde kliknięcie
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_deadline: float | None = None
+        # Retransmisje: jeden timer z backoffem, niezależny od napływu ramek
+        self._retry_policy = RetryPolicy(
+            max_attempts=cfg.retry_max_attempts,
+            deadline=cfg.retry_deadline,
+        )
+        self._retry_handle: asyncio.TimerHandle | None = None
+        # Jeden nadawca na sesję – budzony zdarzeniem, kolejne pobudki scalają się
+        self._wake = asyncio.Event()
+        self._sender: asyncio.Task[None] | None = None
+
+        # Liczniki odrzuconych danych wg powodu (json / oversize / garbage)
+        self.parse_errors: dict[str, int] = {}
+        self.stats = ServerStats()
+        # Opcjonalny zapis ramek do plików (wątek w tle)
+        self.recorder: FrameRecorder | None = None
+        # Opcjonalne przekazywanie ramek do serwera nadrzędnego (tryb proxy)
+        self.upstream: UpstreamRelay | None = None
 
     async def start(self) -> None:
-        self._server = await asyncio.start_server(
-            self._handle_connection,
-            self.cfg.listen_host,
-            self.cfg.listen_port,
-        )
-        _LOGGER.info(
-            "LokalTerm: serwer nasłuchuje na %s:%d",
-            self.cfg.listen_host,
-            self.cfg.listen_port,
+        listener = await async_get_listener(self.hass, self.cfg.listen_host, int(self.cfg.listen_port))
+        self._sender = self.hass.async_create_background_task(
+            self._async_sender(), f"{DOMAIN}_sender_{self.entry_id or self.cfg.devid}"
         )
+        listener.async_register(self)
 
     async def stop(self) -> None:
-        if self._server:
-            self._server.close()
-            await self._server.wait_closed()
-
-    async def send_data_to_send(self, fields: dict[str, Any], **kwargs) -> None:
-        """Wywoływane natychmiast po kliknięciu w UI Home Assistanta."""
-        async with self._lock:
-            self._pending_fields = fields
-            self._pending_token = _rand_token()
-            self._last_send_time = time.monotonic()
-
-            _LOGGER.info("LokalTerm: kliknięcie w UI [%s] -> %s", self._pending_token, fields)
+        """Zatrzymuje sesję: timery, nadawcę, zapis ramek i rejestrację w listenerze.
+
+        Gniazdo nasłuchu i połączenie pieca zamyka listener, gdy w czasie
+        karencji nie zarejestruje się ponownie żadna sesja (przeładowanie).
+        """
+        self.async_shutdown()
+        if self._sender is not None:
+            sender, self._sender = self._sender, None
+            sender.cancel()
+            with suppress(asyncio.CancelledError):
+                await sender
+        await self.async_set_capture(False)
+        await self.async_set_upstream(None)
+        await async_release_listener(self.hass, self)
+        self._client = None
+        self._close_connection_record("detached")
+
+    async def async_set_capture(self, enabled: bool) -> None:
+        """Włącza/wyłącza zapis ramek bez przerywania połączenia z piecem."""
+        if enabled and self.recorder is None:
+            self.recorder = FrameRecorder(
+                self.hass.config.path(CAPTURE_DIR),
+                prefix=f"capture-{self.entry_id or 'replay'}",
+            )
+            self.recorder.start()
+            _LOGGER.info("LokalTerm: zapis ramek włączony")
+        elif not enabled and self.recorder is not None:
+            recorder, self.recorder = self.recorder, None
+            await self.hass.async_add_executor_job(recorder.stop)
+            _LOGGER.info("LokalTerm: zapis ramek wyłączony (%d ramek)", recorder.recorded)
+
+    async def async_set_upstream(self, host: str | None, port: int | None = None) -> None:
+        """Włącza/zmienia/wyłącza tryb proxy bez przerywania połączenia z piecem."""
+        current = self.upstream
+        if current is not None and host and (current.host, current.port) == (host, port):
+            return
+        if current is not None:
+            self.upstream = None
+            await current.stop()
+            _LOGGER.info("LokalTerm: przekazywanie do %s:%s wyłączone", current.host, current.port)
+        if host and port:
+            self.upstream = UpstreamRelay(
+                self.hass, host, int(port), str(self.cfg.devid), self._async_upstream_command
+            )
+            self.upstream.start()
+            _LOGGER.info("LokalTerm: przekazywanie ramek do %s:%s włączone", host, port)
+
+    @callback
+    def _async_upstream_command(self, fields: dict[str, str]) -> None:
+        """Komenda z serwera nadrzędnego – za komendami lokalnymi.
+
+        Pola, które czekają już na potwierdzenie zmiany z Home Assistanta,
+        pozostają przy wartości lokalnej; reszta trafia do wspólnej kolejki
+        i wychodzi najbliższą ramką DataToSend.
+        """
+        pending = self._commands.pending
+        fields = {k: v for k, v in fields.items() if k not in pending}
+        if not fields:
+            return
+        tokens = self._commands.merge(fields)
+        _LOGGER.info("LokalTerm: komenda z serwera nadrzędnego %s -> %s", list(tokens.values()), fields)
+        self._schedule_flush()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Zatrzymuje timery sesji i porzuca oczekujące komendy."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._flush_deadline = None
+        self._cancel_retry()
+        self._commands.clear()
+        self._acks.cancel()
+
+    @callback
+    def async_queue_replayed_command(self, fields: dict[str, Any]) -> None:
+        """Odtwarzanie: komenda z zapisu trafia do kolejki jako już wysłana."""
+        self._commands.merge(fields)
+        self._commands.mark_sent()
+
+    @callback
+    def async_update_pin(self, devpin: str) -> None:
+        """Nowy vPin – obowiązuje od najbliższej ramki DataToSend, bez zrywania połączenia."""
+        self.cfg.devpin = devpin
+        self._prefix = self._encode_prefix()
+
+    def _encode_prefix(self) -> bytes:
+        head = json.dumps(
+            {"FrameType": "DataToSend", "vId": str(self.cfg.devid), "vPin": str(self.cfg.devpin)},
+            separators=(",", ":"),
+        )
+        return head[:-1].encode("ascii") + b","
 
-            # 1. NATYCHMIAST informujemy HA o nowej wartości (Optimistic UI)
-            if self._last_obj:
-                fake_obj = dict(self._last_obj)
-                fake_obj.update(fields)
-                self.on_status(fake_obj)
+    @callback
+    def async_update_retry_policy(self, max_attempts: int, deadline: float) -> None:
+        """Nowe parametry retransmisji – obowiązują od najbliższej próby."""
+        self.cfg.retry_max_attempts = max_attempts
+        self.cfg.retry_deadline = deadline
+        self._retry_policy = RetryPolicy(max_attempts=max_attempts, deadline=deadline)
 
-            # 2. NATYCHMIAST wysyłamy do pieca (nie czekamy na ramkę statusu)
-            self.hass.async_create_task(self._send_minimal_command())
+    async def send_data_to_send(self, fields: dict[str, Any], **kwargs) -> None:
+        """Wywoływane natychmiast po kliknięciu w UI Home Assistanta.
+
+        Samo zakolejkowanie jest synchroniczne – wysyłkę wykonuje nadawca sesji.
+        """
+        self._queue_command(fields)
+        # Wysyłka po krótkim debounce – szybkie zmiany trafiają do jednej ramki
+        self._schedule_flush()
+
+    @callback
+    def async_apply_settings(self, fields: dict[str, str]) -> asyncio.Future[dict[str, str]]:
+        """Wiele pól naraz: jedna ramka DataToSend bez debounce i wynik per pole.
+
+        Future rozstrzyga się, gdy piec potwierdzi lub gdy wygaśnie każde z pól
+        (``commands.ACK_*``).
+        """
+        future = self._acks.track(self._queue_command(fields))
+        self._flush()
+        return future
+
+    def _queue_command(self, fields: dict[str, Any]) -> dict[str, str]:
+        pending = self._commands.pending
+        self.stats.superseded_commands_total += sum(1 for k in fields if k in pending)
+        tokens = self._commands.merge(fields)
+
+        _LOGGER.info("LokalTerm: kliknięcie w UI %s -> %s", list(tokens.values()), fields)
+
+        # NATYCHMIAST informujemy HA o nowej wartości (Optimistic UI) – tylko zmienione pola
+        if self.on_optimistic is not None:
+            self.on_optimistic(
+                {k: pending[k].value for k in tokens},
+                self._retry_policy.deadline + OPTIMISTIC_GRACE_SECONDS,
+            )
+        return tokens
+
+    @callback
+    def _schedule_flush(self) -> None:
+        now = self.hass.loop.time()
+        if self._flush_deadline is None:
+            self._flush_deadline = now + COMMAND_DEBOUNCE_MAX_SECONDS
+        when = min(now + COMMAND_DEBOUNCE_SECONDS, self._flush_deadline)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = self.hass.loop.call_at(when, self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = None
+        self._flush_deadline = None
+        if self._commands:
+            self._wake.set()
+
+    @callback
+    def _schedule_retry(self) -> None:
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+        delay = self._retry_policy.delay(self._commands.min_attempts())
+        self._retry_handle = self.hass.loop.call_later(delay, self._retry)
+
+    @callback
+    def _cancel_retry(self) -> None:
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+    @callback
+    def _retry(self) -> None:
+        self._retry_handle = None
+        expired = self._commands.expire(self._retry_policy)
+        if expired:
+            self._async_command_timeout(expired)
+        if self._commands:
+            # Piec jeszcze nie potwierdził – ponawiamy wysyłkę
+            self._flush()
+
+    @callback
+    def _async_command_timeout(self, expired: dict[str, PendingField]) -> None:
+        self._acks.resolve(expired, ACK_TIMEOUT)
+        if self.on_rollback is not None:
+            self.on_rollback(expired)
+        now = time.monotonic()
+        for key, pending in expired.items():
+            self.stats.record_timeout(pending.queued_at, pending.sent_at, pending.attempts, now)
+            _LOGGER.warning(
+                "LokalTerm: timeout – piec nie przyjął zmiany %s (token=%s, prób=%d).",
+                key,
+                pending.token,
+                pending.attempts,
+            )
+        self.hass.bus.async_fire(
+            EVENT_COMMAND_TIMEOUT,
+            {
+                "entry_id": self.entry_id,
+                "fields": {k: p.value for k, p in expired.items()},
+                "tokens": {k: p.token for k, p in expired.items()},
+                "attempts": {k: p.attempts for k, p in expired.items()},
+            },
+        )
+        persistent_notification.async_create(
+            self.hass,
+            "Piec nie potwierdził zmian: "
+            + ", ".join(f"{k}={p.value}" for k, p in expired.items())
+            + ". Sprawdź połączenie z piecem i spróbuj ponownie.",
+            title="LokalTerm: komenda nie została przyjęta",
+            notification_id=f"{DOMAIN}_{self.entry_id}_command_timeout",
+        )
 
-    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-        peer = writer.get_extra_info("peername")
-        _LOGGER.info("LokalTerm: piec podłączony z %s", peer)
-        self._client_writer = writer
+    @callback
+    def async_record_parse_error(self, reason: str) -> None:
+        self.parse_errors[reason] = self.parse_errors.get(reason, 0) + 1
+        _LOGGER.debug(
+            "LokalTerm: odrzucono dane od pieca (%s, łącznie %d)",
+            reason,
+            self.parse_errors[reason],
+        )
 
-        try:
-            while True:
-                line = await reader.readline()
-                if not line:
-                    break
-
-                try:
-                    obj = json.loads(line.decode("ascii", "ignore"))
-                except Exception:
-                    continue
-
-                if obj.get("FrameType") == "SkzpData":
-                    self._last_obj = obj
-                    display_obj = dict(obj)
-
-                    if self._pending_fields:
-                        match = True
-                        for k, v in self._pending_fields.items():
-                            if str(obj.get(k)) != str(v):
-                                match = False
-                                display_obj[k] = v  # Nadpisujemy, by suwak stał w miejscu
-
-                        if match:
-                            _LOGGER.info("LokalTerm: potwierdzone przez piec [%s]", self._pending_token)
-                            self._pending_fields = None
-                            self._pending_token = None
-                        else:
-                            # Piec jeszcze nie zmienił – ponawiamy wysyłkę
-                            self.hass.async_create_task(self._send_minimal_command())
-
-                            if time.monotonic() - self._last_send_time > 20:
-                                _LOGGER.warning(
-                                    "LokalTerm: timeout – piec nie przyjął zmian (token=%s).",
-                                    self._pending_token,
-                                )
-                                self._pending_fields = None
-
-                    self.on_status(display_obj)
-
-        finally:
-            _LOGGER.info("LokalTerm: piec rozłączony")
-            self._client_writer = None
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    def _close_connection_record(self, reason: str) -> None:
+        if self._connection is not None:
+            self._connection.close(reason)
+            self._connection = None
+
+    @callback
+    def async_connection_made(self, client: EltermProtocol) -> None:
+        old, self._client = self._client, client
+        if old is not None and old is not client:
+            # Moduł połączył się ponownie – poprzednie gniazdo jest martwe lub półotwarte
+            _LOGGER.info("LokalTerm: nowe połączenie z %s zastępuje poprzednie z %s", client.peer, old.peer)
+            self.stats.superseded_total += 1
+            old.abort("superseded")
+            self._close_connection_record("superseded")
+        elif old is None:
+            _LOGGER.info("LokalTerm: piec podłączony z %s", client.peer)
+        if self._connection is None:
+            self._connection = self.stats.record_connection(client)
+        if old is None and self.on_connection is not None:
+            self.on_connection(True)
+        # Oczekujące komendy idą od razu nowym połączeniem
+        if self._commands and self._flush_handle is None:
+            self._schedule_flush()
+
+    @callback
+    def async_connection_lost(self, client: EltermProtocol) -> None:
+        if self._client is not client:
+            return
+        _LOGGER.info("LokalTerm: piec rozłączony")
+        self._client = None
+        # Transport jeszcze otwarty = połączenie przypięte do innej sesji
+        self._close_connection_record(client.close_reason or "detached")
+        if self.on_connection is not None:
+            self.on_connection(False)
+
+    @callback
+    def async_handle_duplicate(self, client: EltermProtocol | None, obj: dict[str, Any]) -> None:
+        """Ramka identyczna z poprzednią – bez komend w kolejce nie ma nic do zrobienia."""
+        if self._commands or self.recorder is not None:
+            self.async_handle_frame(client, obj)
+            return
+        if obj.get("FrameType") == "SkzpData":
+            self.stats.frames_in.add(1)
+            self.stats.duplicates_total += 1
+            # Serwer nadrzędny dostaje każdą ramkę – dla niego to też znak życia pieca
+            if self.upstream is not None:
+                self.upstream.forward(obj)
+
+    @callback
+    def async_handle_frame(self, client: EltermProtocol | None, obj: dict[str, Any]) -> None:
+        if self.recorder is not None:
+            self.recorder.record(DIR_IN, _mask_sensitive(obj))
+        if obj.get("FrameType") != "SkzpData":
+            return
+
+        self.stats.record_frame(DIR_IN, obj)
+        now = time.monotonic()
+        self.stats.frames_in.add(1, now)
+
+        if self._commands:
+            acked = self._commands.ack(obj)
+            for key, pending in acked.items():
+                self.stats.record_ack(pending.queued_at, pending.sent_at, pending.attempts, now)
+                _LOGGER.info("LokalTerm: potwierdzone przez piec [%s] (%s)", pending.token, key)
+            self._acks.resolve(acked, ACK_CONFIRMED)
+            # Niepotwierdzone pola trzyma nakładka koordynatora (retransmisję planuje timer)
+            if not self._commands:
+                self._cancel_retry()
+
+        self.on_status(obj)
+        if self.upstream is not None:
+            self.upstream.forward(obj)
+
+    async def _async_sender(self) -> None:
+        """Nadawca sesji: jedyne miejsce zapisu do gniazda, więc bez blokad.
+
+        Pobudki w trakcie wysyłki scalają się w jedną kolejną wysyłkę
+        z aktualną zawartością kolejki.
+        """
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await self._send_minimal_command()
 
     async def _send_minimal_command(self) -> None:
-        """Sama wysyłka fizyczna."""
-        # Bardzo krótka pauza, żeby nie zalać bufora pieca przy szybkich kliknięciach
-        await asyncio.sleep(0.1)
-
-        async with self._lock:
-            if not self._pending_fields or not self._client_writer:
-                return
-
-            frame: dict[str, Any] = {
-                "FrameType": "DataToSend",
-                "vId": str(self.cfg.devid),
-                "vPin": str(self.cfg.devpin),
-            }
-            for k, v in self._pending_fields.items():
-                frame[k] = str(v)
-            frame["vToken"] = str(self._pending_token)
+        """Sama wysyłka fizyczna – jedna ramka ze wszystkimi oczekującymi polami."""
+        client = self._client
+        if not self._commands:
+            return
+        if client is None:
+            # Brak połączenia – timer i tak sprawdzi termin i ponowi próbę
+            self._schedule_retry()
+            return
+        if not client.writable:
+            # Bufor nadawczy pełny – zmiany czekają scalone w kolejce, ponowi je timer
+            self.stats.writes_deferred_total += 1
+            self._schedule_retry()
+            return
+
+        fields = self._commands.values()
+        token = self._commands.frame_token
+        body: dict[str, Any] = dict(fields)
+        body["vToken"] = str(token)
 
+        try:
+            payload = self._prefix + json.dumps(body, separators=(",", ":"))[1:].encode("ascii") + b"\r\n"
+            client.write(payload)
+            self._commands.mark_sent()
+            self.stats.frames_out.add(1)
+            self.stats.bytes_out.add(len(payload))
+            # Próbka do diagnostyki bez nagłówka – vId/vPin i tak byłyby zamaskowane
+            self.stats.record_frame(DIR_OUT, body)
+            # Pełna ramka tylko dla zapisu ramek i logów DEBUG
+            frame: dict[str, Any] | None = None
+            if self.recorder is not None or _LOGGER.isEnabledFor(logging.DEBUG):
+                frame = {"FrameType": "DataToSend", "vId": "***", "vPin": "***", **body}
+            if self.recorder is not None:
+                self.recorder.record(DIR_OUT, frame)
+            self._schedule_retry()
             try:
-                payload = json.dumps(frame, separators=(",", ":"))
-                self._client_writer.write(payload.encode("ascii") + b"\r\n")
-                await self._client_writer.drain()
-
-                # INFO: nie logujemy sekretów ani pełnego payloadu
-                _LOGGER.info(
-                    "LokalTerm: wysłano komendę do pieca [%s] (pola=%s)",
-                    self._pending_token,
-                    list(self._pending_fields.keys()),
+                async with asyncio.timeout(DRAIN_TIMEOUT_SECONDS):
+                    await client.drain()
+            except TimeoutError:
+                # Moduł nie odbiera danych – zrywamy połączenie, piec połączy się ponownie
+                _LOGGER.warning(
+                    "LokalTerm: %s nie odebrał danych w %.0f s – zamykam połączenie",
+                    client.peer,
+                    DRAIN_TIMEOUT_SECONDS,
                 )
-                # DEBUG: szczegóły (zamaskowane)
-                _LOGGER.debug("LokalTerm: payload [%s] -> %s", self._pending_token, _mask_sensitive(frame))
+                self.stats.drain_timeouts_total += 1
+                client.abort("drain_timeout")
+                return
 
-            except Exception as e:
-                _LOGGER.error("LokalTerm: wysyłka nie powiodła się: %s", e)
+            # INFO: nie logujemy sekretów ani pełnego payloadu
+            _LOGGER.info(
+                "LokalTerm: wysłano komendę do pieca [%s] (pola=%s)",
+                token,
+                list(fields),
+            )
+            # DEBUG: szczegóły (zamaskowane)
+            if frame is not None:
+                _LOGGER.debug("LokalTerm: payload [%s] -> %s", token, frame)
+
+        except Exception as e:
+            _LOGGER.error("LokalTerm: wysyłka nie powiodła się: %s", e)
+            self._schedule_retry()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DEVID, CONF_DEVPIN, DOMAIN
+
+TO_REDACT = {CONF_DEVID, CONF_DEVPIN, "vId", "vPin"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    data = hass.data[DOMAIN][entry.entry_id]
+    server = data["server"]
+    coordinator = data["coordinator"]
+    stats = server.stats
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "stats": stats.as_dict(server.parse_errors),
+        "connected": server.connected,
+        "connections": [record.as_dict() for record in stats.connections],
+        "event_loop": {
+            # Obsługa ramki w połączeniu (z parsowaniem), publikacja do encji
+            "frame_handling_us": stats.frame_handling.summary(),
+            "coordinator_update_us": coordinator.update_duration.summary(),
+            "publisher": data["publisher"].as_dict(),
+        },
+        "recent_frames": [
+            {"time": ts, "direction": direction, "frame": async_redact_data(frame, TO_REDACT)}
+            for ts, direction, frame in stats.recent_frames
+        ],
+        "power": data["power"].as_dict(),
+        "schedule": data["schedule"].as_dict(),
+        "upstream": server.upstream.as_dict() if server.upstream is not None else None,
+    }
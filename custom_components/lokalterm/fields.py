@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from homeassistant.const import UnitOfEnergy, UnitOfTemperature
+
+from .const import BU_MODUL_TO_PERCENT
+
+# Rodzaje pól ramki
+KIND_NUMBER = "number"  # liczba całkowita na kablu, wartość = liczba / scale
+KIND_INT = "int"
+KIND_FLOAT = "float"
+KIND_MODE = "mode"  # tekst z zamkniętej listy (options)
+KIND_TEXT = "text"
+KIND_AUTO = "auto"  # nieopisany parametr: int, potem float, na końcu tekst
+
+_PARAMETER_RE = re.compile(r"P\d{3}")
+
+
+def _parse_int(v: Any) -> int | None:
+    """Liczba całkowita z pola ramki (bez wyjątków w ścieżce dekodowania)."""
+    if isinstance(v, int) and not isinstance(v, bool):
+        return v
+    if not isinstance(v, str):
+        return None
+    s = v.strip()
+    digits = s[1:] if s[:1] in ("-", "+") else s
+    if not digits.isdigit():
+        return None
+    return int(s)
+
+
+def _parse_float(v: Any) -> float | None:
+    if v is None or isinstance(v, bool):
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_temp100(v: Any) -> float | None:
+    """Temperatura z ramki (setne części °C) -> °C."""
+    i = _parse_int(v)
+    return None if i is None else i / 100.0
+
+
+def _parse_energy(v: Any) -> float | None:
+    """Licznik energii P033 (kWh) zaokrąglony do 0.01."""
+    f = _parse_float(v)
+    return None if f is None else round(f, 2)
+
+
+def _parse_text(v: Any) -> str | None:
+    return None if v is None else str(v)
+
+
+def _parse_auto(v: Any) -> int | float | str | None:
+    i = _parse_int(v)
+    if i is not None:
+        return i
+    f = _parse_float(v)
+    return f if f is not None else _parse_text(v)
+
+
+@dataclass(frozen=True, slots=True)
+class FieldSpec:
+    """Opis jednego pola ramki SkzpData/DataToSend.
+
+    ``decode``/``encode`` są budowane raz, przy tworzeniu opisu, i używane
+    zarówno przy dekodowaniu ramek, jak i przy budowie komend.
+    """
+
+    wire: str
+    kind: str
+    scale: float = 1.0
+    digits: int | None = None
+    unit: str | None = None
+    writable: bool = False
+    min_value: float | None = None
+    max_value: float | None = None
+    step: float | None = None
+    # Dozwolone wartości na kablu -> etykieta w UI
+    options: Mapping[str, str] | None = None
+    decode: Callable[[Any], Any] = field(init=False, repr=False, compare=False)
+    encode: Callable[[Any], str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "decode", self._build_decoder())
+        object.__setattr__(self, "encode", self._build_encoder())
+
+    def _build_decoder(self) -> Callable[[Any], Any]:
+        kind, scale, digits = self.kind, self.scale, self.digits
+        if kind == KIND_NUMBER:
+            if scale == 100:
+                return _parse_temp100
+            if scale == 1:
+                return _parse_int
+
+            def decode_number(v: Any) -> float | None:
+                i = _parse_int(v)
+                return None if i is None else i / scale
+
+            return decode_number
+        if kind == KIND_INT:
+            return _parse_int
+        if kind == KIND_FLOAT:
+            if digits == 2:
+                return _parse_energy
+            if digits is None:
+                return _parse_float
+
+            def decode_float(v: Any) -> float | None:
+                f = _parse_float(v)
+                return None if f is None else round(f, digits)
+
+            return decode_float
+        if kind == KIND_AUTO:
+            return _parse_auto
+        return _parse_text
+
+    def _build_encoder(self) -> Callable[[Any], str]:
+        spec = self
+
+        def check_range(value: float) -> None:
+            if spec.min_value is not None and value < spec.min_value:
+                raise ValueError(f"{spec.wire}: {value} < {spec.min_value}")
+            if spec.max_value is not None and value > spec.max_value:
+                raise ValueError(f"{spec.wire}: {value} > {spec.max_value}")
+
+        if self.options is None and self.kind == KIND_NUMBER:
+            scale = self.scale
+
+            def encode_number(value: Any) -> str:
+                v = float(value)
+                check_range(v)
+                return str(int(round(v * scale)))
+
+            return encode_number
+        if self.options is None and self.kind in (KIND_INT, KIND_FLOAT):
+
+            def encode_plain(value: Any) -> str:
+                v = float(value)
+                check_range(v)
+                return str(int(v)) if spec.kind == KIND_INT else str(v)
+
+            return encode_plain
+
+        def encode_text(value: Any) -> str:
+            s = str(value)
+            if spec.options is not None and s not in spec.options:
+                raise ValueError(f"{spec.wire}: niedozwolona wartość {s!r}")
+            return s
+
+        return encode_text
+
+    def from_user(self, value: Any) -> str:
+        """Wartość z usługi/automatyzacji -> kabel; pola z listą przyjmują też etykiety z UI."""
+        if self.options is not None:
+            value = self.to_wire(str(value)) or value
+        return self.encode(value)
+
+    def to_wire(self, label: str) -> str | None:
+        """Wartość na kablu dla etykiety z ``options`` (None, gdy brak)."""
+        if self.options is None:
+            return None
+        for wire, lab in self.options.items():
+            if lab == label:
+                return wire
+        return None
+
+
+def _temp(wire: str, **kwargs: Any) -> FieldSpec:
+    return FieldSpec(wire, KIND_NUMBER, scale=100, unit=UnitOfTemperature.CELSIUS, **kwargs)
+
+
+FIELDS: dict[str, FieldSpec] = {
+    spec.wire: spec
+    for spec in (
+        _temp("BoilerTempAct"),
+        _temp("BoilerTempCmd", writable=True, min_value=20.0, max_value=69.0, step=1.0),
+        _temp("BoilerHist", writable=True, min_value=0.0, max_value=6.0, step=1.0),
+        _temp("DHWTempAct"),
+        _temp("DHWTempCmd", writable=True, min_value=30.0, max_value=69.0, step=1.0),
+        _temp("DHWHist", writable=True, min_value=0.0, max_value=6.0, step=1.0),
+        FieldSpec("CH1Mode", KIND_MODE, writable=True, options={"Still_On": "Włączony", "Stop": "STOP"}),
+        FieldSpec(
+            "DHWMode",
+            KIND_MODE,
+            writable=True,
+            options={"Still_On": "Włączony", "Stop": "STOP", "Priority": "PRIORYTET"},
+        ),
+        FieldSpec(
+            "BuModulMax",
+            KIND_INT,
+            writable=True,
+            options={str(step): str(pct) for step, pct in BU_MODUL_TO_PERCENT.items()},
+        ),
+        FieldSpec("DevStatus", KIND_TEXT),
+        FieldSpec("P033", KIND_FLOAT, digits=2, unit=UnitOfEnergy.KILO_WATT_HOUR),
+    )
+}
+
+# Pola, które integracja może zmieniać komendą DataToSend
+WRITABLE_FIELDS: frozenset[str] = frozenset(w for w, s in FIELDS.items() if s.writable)
+
+_PARAMETERS: dict[str, FieldSpec] = {}
+
+
+def is_parameter(wire: str) -> bool:
+    """Parametr serwisowy pieca (P001…P999)."""
+    return _PARAMETER_RE.fullmatch(wire) is not None
+
+
+def field_spec(wire: str) -> FieldSpec | None:
+    """Opis pola; dla nieopisanych parametrów P0xx – opis ogólny (tylko odczyt)."""
+    spec = FIELDS.get(wire)
+    if spec is None and is_parameter(wire):
+        spec = _PARAMETERS.get(wire)
+        if spec is None:
+            spec = _PARAMETERS[wire] = FieldSpec(wire, KIND_AUTO)
+    return spec
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import (
+    CONNECTION_IDLE_TIMEOUT,
+    CONNECTION_WATCHDOG_SECONDS,
+    DATA_LISTENERS,
+    DOMAIN,
+    LISTENER_RELEASE_GRACE_SECONDS,
+)
+from .protocol import EltermProtocol
+
+if TYPE_CHECKING:
+    from .coordinator import EltermLocalServer
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EltermListener:
+    """Wspólne gniazdo nasłuchu – rozdziela połączenia na urządzenia wg vId.
+
+    Każdy wpis konfiguracji (jedno urządzenie) rejestruje tu swoją sesję
+    ``EltermLocalServer``; połączenie przypina się do sesji przy pierwszej
+    ramce, więc routing kolejnych ramek to jedno porównanie vId.
+    """
+
+    def __init__(self, hass: HomeAssistant, host: str, port: int) -> None:
+        self.hass = hass
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+        self._start_lock = asyncio.Lock()
+        self._sessions: dict[str, EltermLocalServer] = {}
+        self._clients: set[EltermProtocol] = set()
+        self._warned_ids: set[str] = set()
+        # Jeden timer watchdoga dla wszystkich połączeń na tym porcie
+        self._watchdog: asyncio.TimerHandle | None = None
+        self.idle_timeout = CONNECTION_IDLE_TIMEOUT
+        # Opóźnione zamknięcie po odejściu ostatniej sesji (przeładowanie wpisu)
+        self._release_handle: asyncio.TimerHandle | None = None
+        # Zamknięcie przy zatrzymaniu HA – zarejestrowane tylko, gdy gniazdo jest otwarte
+        self._unsub_hass_stop: CALLBACK_TYPE | None = None
+
+        # Dane, których nie dało się przypisać do żadnego urządzenia
+        self.parse_errors: dict[str, int] = {}
+        self.unrouted_frames = 0
+
+    async def async_start(self) -> None:
+        async with self._start_lock:
+            if self._server is not None:
+                return
+            self._server = await self.hass.loop.create_server(
+                lambda: EltermProtocol(self),
+                self.host,
+                self.port,
+            )
+            self._schedule_watchdog()
+            self._unsub_hass_stop = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_on_hass_stop
+            )
+        _LOGGER.info("LokalTerm: serwer nasłuchuje na %s:%d", self.host, self.port)
+
+    async def async_stop(self) -> None:
+        self._cancel_release()
+        if self._unsub_hass_stop is not None:
+            self._unsub_hass_stop()
+            self._unsub_hass_stop = None
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        server.close()
+        for client in list(self._clients):
+            client.close()
+        self._clients.clear()
+        await server.wait_closed()
+        _LOGGER.info("LokalTerm: serwer %s:%d zatrzymany", self.host, self.port)
+
+    @callback
+    def _async_on_hass_stop(self, _event: Event) -> None:
+        # Subskrypcja już zużyta – async_stop nie może jej wyrejestrować ponownie
+        self._unsub_hass_stop = None
+        listeners: dict[tuple[str, int], EltermListener] = self.hass.data.get(DOMAIN, {}).get(DATA_LISTENERS, {})
+        if listeners.get((self.host, self.port)) is self:
+            del listeners[(self.host, self.port)]
+        self.hass.async_create_task(self.async_stop())
+
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    def _cancel_release(self) -> None:
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+            self._release_handle = None
+
+    @callback
+    def async_schedule_release(self, delay: float, on_release: Callable[[], Any]) -> None:
+        """Zamknięcie za ``delay`` s, o ile w tym czasie nie zarejestruje się żadna sesja."""
+        self._cancel_release()
+
+        @callback
+        def _release() -> None:
+            self._release_handle = None
+            if not self._sessions:
+                on_release()
+
+        self._release_handle = self.hass.loop.call_later(delay, _release)
+
+    def _schedule_watchdog(self) -> None:
+        self._watchdog = self.hass.loop.call_later(CONNECTION_WATCHDOG_SECONDS, self._async_watchdog)
+
+    @callback
+    def _async_watchdog(self) -> None:
+        """Zamyka połączenia, z których od ``idle_timeout`` s nie przyszły żadne dane."""
+        self._schedule_watchdog()
+        now = self.hass.loop.time()
+        for client in [c for c in self._clients if now - c.last_rx > self.idle_timeout]:
+            _LOGGER.warning(
+                "LokalTerm: brak danych z %s od %.0f s – zamykam połączenie",
+                client.peer,
+                now - client.last_rx,
+            )
+            if client.session is not None:
+                client.session.stats.idle_timeouts_total += 1
+            client.abort("idle_timeout")
+            # abort() woła connection_lost dopiero w kolejnym kroku pętli
+            self._clients.discard(client)
+
+    @property
+    def sessions(self) -> dict[str, EltermLocalServer]:
+        return self._sessions
+
+    @callback
+    def async_register(self, session: EltermLocalServer) -> None:
+        devid = str(session.cfg.devid)
+        if self._sessions.get(devid) not in (None, session):
+            _LOGGER.warning("LokalTerm: urządzenie %s zarejestrowane ponownie", devid)
+        self._sessions[devid] = session
+        self._warned_ids.discard(devid)
+        self._cancel_release()
+        # Połączenie pieca, które przetrwało przeładowanie wpisu, od razu trafia do nowej sesji
+        for client in self._clients:
+            if client.session is None and client.devid == devid:
+                client.bind(session)
+
+    @callback
+    def async_unregister(self, session: EltermLocalServer) -> bool:
+        """Wyrejestrowuje sesję; zwraca True, gdy nie została żadna."""
+        devid = str(session.cfg.devid)
+        if self._sessions.get(devid) is session:
+            del self._sessions[devid]
+        # Gniazdo pieca zostaje otwarte – przejmie je sesja zarejestrowana ponownie
+        for client in self._clients:
+            if client.session is session:
+                client.detach()
+        return not self._sessions
+
+    @callback
+    def async_connection_made(self, client: EltermProtocol) -> None:
+        _LOGGER.debug("LokalTerm: nowe połączenie z %s", client.peer)
+        self._clients.add(client)
+
+    @callback
+    def async_connection_lost(self, client: EltermProtocol) -> None:
+        self._clients.discard(client)
+
+    @callback
+    def async_record_parse_error(self, reason: str) -> None:
+        self.parse_errors[reason] = self.parse_errors.get(reason, 0) + 1
+
+    @callback
+    def async_route(self, client: EltermProtocol, obj: dict[str, Any]) -> EltermLocalServer | None:
+        """Sesja urządzenia dla ramki (po vId; bez vId – jedyne zarejestrowane urządzenie)."""
+        vid = obj.get("vId")
+        if vid is not None:
+            session = self._sessions.get(str(vid))
+        elif len(self._sessions) == 1:
+            session = next(iter(self._sessions.values()))
+        else:
+            session = None
+
+        if session is None:
+            self.unrouted_frames += 1
+            key = str(vid)
+            if client.devid == key:
+                # Urządzenie chwilowo bez sesji (przeładowanie wpisu) – ramkę pomijamy po cichu
+                return None
+            if key not in self._warned_ids:
+                self._warned_ids.add(key)
+                _LOGGER.warning(
+                    "LokalTerm: ramka od nieznanego urządzenia z %s – pomijam",
+                    client.peer,
+                )
+        return session
+
+
+async def async_get_listener(hass: HomeAssistant, host: str, port: int) -> EltermListener:
+    """Zwraca (i w razie potrzeby uruchamia) wspólny listener dla host:port."""
+    listeners: dict[tuple[str, int], EltermListener] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_LISTENERS, {}
+    )
+    key = (host, port)
+    listener = listeners.get(key)
+    if listener is None:
+        listener = listeners[key] = EltermListener(hass, host, port)
+    try:
+        await listener.async_start()
+    except OSError:
+        if not listener.sessions:
+            listeners.pop(key, None)
+        raise
+    return listener
+
+
+async def async_release_listener(
+    hass: HomeAssistant,
+    session: EltermLocalServer,
+    grace: float = LISTENER_RELEASE_GRACE_SECONDS,
+) -> None:
+    """Odpina sesję od listenera; ostatnia sesja zamyka gniazdo nasłuchu.
+
+    Zamknięcie następuje po ``grace`` s – przeładowanie wpisu w tym czasie
+    przejmuje gniazdo nasłuchu i otwarte połączenie pieca bez ponownego bind().
+    """
+    listeners: dict[tuple[str, int], EltermListener] = hass.data.get(DOMAIN, {}).get(DATA_LISTENERS, {})
+    key = (session.cfg.listen_host, int(session.cfg.listen_port))
+    listener = listeners.get(key)
+    if listener is None or not listener.async_unregister(session):
+        return
+
+    async def _async_close() -> None:
+        if listeners.get(key) is listener and not listener.sessions:
+            listeners.pop(key, None)
+            await listener.async_stop()
+
+    if grace <= 0 or hass.is_stopping:
+        await _async_close()
+        return
+    listener.async_schedule_release(grace, lambda: hass.async_create_task(_async_close()))
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import logging
+import time
+from array import array
+from typing import Any, Callable, Mapping, NamedTuple
+
+from homeassistant.const import UnitOfEnergy, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN, LTS_BUCKET_COUNT, LTS_BUCKET_SECONDS
+from .fields import _parse_energy, _parse_temp100
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOUR = 3600
+
+# Pola ramki eksportowane jako statystyki średnia/min/max: pole -> (klucz, nazwa, dekoder)
+_MEAN_FIELDS: dict[str, tuple[str, str, Callable[[Any], float | None]]] = {
+    "BoilerTempAct": ("temp_wody_co", "Temperatura wody CO", _parse_temp100),
+    "DHWTempAct": ("temp_wody_cwu", "Temperatura wody CWU", _parse_temp100),
+}
+_ENERGY_FIELD = "P033"
+_ENERGY_KEY = "energia"
+
+
+def counter_delta(prev: float | None, value: float) -> float:
+    """Przyrost licznika energii; spadek wartości traktujemy jako reset (przyrost 0)."""
+    if prev is None or value < prev:
+        return 0.0
+    return value - prev
+
+
+class Bucket(NamedTuple):
+    start: int
+    weight: float
+    mean: float
+    min: float
+    max: float
+    last: float
+
+
+class BucketSeries:
+    """Próbki jednego pola zagregowane w kubełki po ``period`` sekund.
+
+    Bufor cykliczny na tablicach ``array`` – dodanie próbki to O(1) i stała
+    pamięć niezależnie od częstotliwości ramek; surowe próbki nie są trzymane.
+    Średnia jest ważona czasem trwania wartości (ramki powtórzone nie muszą
+    docierać jako próbki), a przerwa w danych liczy się najwyżej jako ``period``.
+    """
+
+    __slots__ = ("_period", "_size", "_start", "_weight", "_wsum", "_min", "_max", "_last", "_prev_ts", "_prev_value")
+
+    def __init__(self, period: int = LTS_BUCKET_SECONDS, size: int = LTS_BUCKET_COUNT) -> None:
+        self._period = period
+        self._size = size
+        self._start = array("q", [-1]) * size
+        self._weight = array("d", bytes(8 * size))
+        self._wsum = array("d", bytes(8 * size))
+        self._min = array("d", bytes(8 * size))
+        self._max = array("d", bytes(8 * size))
+        self._last = array("d", bytes(8 * size))
+        self._prev_ts: float | None = None
+        self._prev_value = 0.0
+
+    def _slot(self, ts: float, value: float) -> int:
+        start = int(ts) // self._period * self._period
+        i = (start // self._period) % self._size
+        if self._start[i] != start:
+            self._start[i] = start
+            self._weight[i] = self._wsum[i] = 0.0
+            self._min[i] = self._max[i] = value
+        return i
+
+    def add(self, ts: float, value: float) -> None:
+        prev_ts = self._prev_ts
+        if prev_ts is not None and ts > prev_ts:
+            # Poprzednia wartość obowiązywała do teraz – dopisujemy jej czas trwania
+            dt = min(ts - prev_ts, self._period)
+            j = self._slot(prev_ts, self._prev_value)
+            self._weight[j] += dt
+            self._wsum[j] += self._prev_value * dt
+        self._prev_ts = ts
+        self._prev_value = value
+
+        i = self._slot(ts, value)
+        if value < self._min[i]:
+            self._min[i] = value
+        if value > self._max[i]:
+            self._max[i] = value
+        self._last[i] = value
+
+    def buckets(self, start: float = 0, end: float = float("inf")) -> list[Bucket]:
+        """Kubełki z przedziału [start, end) w kolejności czasu."""
+        out = [
+            Bucket(
+                s,
+                self._weight[i],
+                self._wsum[i] / self._weight[i] if self._weight[i] else self._last[i],
+                self._min[i],
+                self._max[i],
+                self._last[i],
+            )
+            for i, s in enumerate(self._start)
+            if s >= 0 and start <= s < end
+        ]
+        out.sort()
+        return out
+
+    def aggregate(self, start: float, end: float) -> Bucket | None:
+        """Jeden kubełek zbiorczy z przedziału (średnia ważona czasem)."""
+        parts = self.buckets(start, end)
+        if not parts:
+            return None
+        weight = sum(b.weight for b in parts)
+        if weight:
+            mean = sum(b.mean * b.weight for b in parts) / weight
+        else:
+            mean = sum(b.mean for b in parts) / len(parts)
+        return Bucket(
+            int(start),
+            weight,
+            mean,
+            min(b.min for b in parts),
+            max(b.max for b in parts),
+            parts[-1].last,
+        )
+
+
+class LongTermStats:
+    """Godzinowe statystyki długoterminowe (external statistics) z ramek SkzpData.
+
+    Próbki temperatur i licznika P033 trafiają do kubełków 5-minutowych w
+    pamięci; po zakończeniu godziny wszystkie pełne godziny są jednorazowo
+    importowane do recordera przez ``async_add_external_statistics``.
+    """
+
+    def __init__(self, hass: HomeAssistant, devid: str, name: str) -> None:
+        self.hass = hass
+        self._name = name
+        prefix = f"{DOMAIN}:{slugify(devid)}"
+        self._ids = {f: f"{prefix}_{key}" for f, (key, _n, _d) in _MEAN_FIELDS.items()}
+        self._energy_id = f"{prefix}_{_ENERGY_KEY}"
+        self._series = {f: BucketSeries() for f in _MEAN_FIELDS}
+        # Licznik energii: godzina -> (stan licznika, suma narastająca) na koniec godziny
+        self._energy_hours: dict[int, tuple[float, float]] = {}
+        self._energy_prev: float | None = None
+        self._energy_sum = 0.0
+        self._hour: int | None = None
+        self._exported_until = 0
+        self.enabled = False
+        self.exported_rows = 0
+
+    @property
+    def statistic_ids(self) -> list[str]:
+        return [*self._ids.values(), self._energy_id]
+
+    async def async_enable(self) -> None:
+        """Włącza eksport; sumę energii kontynuuje od ostatniego wpisu w bazie."""
+        if self.enabled:
+            return
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.warning("LokalTerm: recorder nie jest załadowany – statystyki długoterminowe wyłączone")
+            return
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, self._energy_id, True, {"state", "sum"}
+        )
+        rows = last.get(self._energy_id) or []
+        if rows:
+            row = rows[0]
+            self._energy_sum = float(row.get("sum") or 0.0)
+            if row.get("state") is not None:
+                self._energy_prev = float(row["state"])
+            start = row.get("start")
+            if isinstance(start, (int, float)):
+                self._exported_until = int(start) + _HOUR
+            # Godziny policzone od zera przed odczytem bazy byłyby niespójne z sumą
+            self._energy_hours.clear()
+        self.enabled = True
+        if self._hour is not None:
+            self._export(self._hour)
+
+    @callback
+    def async_disable(self) -> None:
+        self.enabled = False
+
+    @callback
+    def async_add_frame(self, obj: Mapping[str, Any], now: float | None = None) -> None:
+        ts = time.time() if now is None else now
+        for field, (_key, _name, decode) in _MEAN_FIELDS.items():
+            value = decode(obj.get(field))
+            if value is not None:
+                self._series[field].add(ts, value)
+
+        hour = int(ts) // _HOUR * _HOUR
+        energy = _parse_energy(obj.get(_ENERGY_FIELD))
+        if energy is not None:
+            self._energy_sum += counter_delta(self._energy_prev, energy)
+            self._energy_prev = energy
+            self._energy_hours[hour] = (energy, self._energy_sum)
+
+        if self._hour is None:
+            self._hour = hour
+        elif hour > self._hour:
+            self._hour = hour
+            if self.enabled:
+                self._export(hour)
+            else:
+                # Bez eksportu trzymamy tyle godzin, ile obejmują kubełki (24 h)
+                self._prune_energy_hours(hour - LTS_BUCKET_COUNT * LTS_BUCKET_SECONDS)
+
+    def _prune_energy_hours(self, before: int) -> None:
+        for h in [h for h in self._energy_hours if h < before]:
+            del self._energy_hours[h]
+
+    def _export(self, until: int) -> None:
+        """Import wszystkich pełnych, jeszcze niewysłanych godzin sprzed ``until``."""
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        since = max(self._exported_until, until - LTS_BUCKET_COUNT * LTS_BUCKET_SECONDS)
+        hours = range(since // _HOUR * _HOUR, until, _HOUR)
+
+        for field, (key, name, _decode) in _MEAN_FIELDS.items():
+            series = self._series[field]
+            rows = []
+            for h in hours:
+                agg = series.aggregate(h, h + _HOUR)
+                if agg is not None:
+                    rows.append(
+                        {
+                            "start": dt_util.utc_from_timestamp(h),
+                            "mean": round(agg.mean, 2),
+                            "min": agg.min,
+                            "max": agg.max,
+                        }
+                    )
+            if rows:
+                async_add_external_statistics(
+                    self.hass,
+                    {
+                        "has_mean": True,
+                        "has_sum": False,
+                        "name": f"{self._name} {name}",
+                        "source": DOMAIN,
+                        "statistic_id": self._ids[field],
+                        "unit_of_measurement": UnitOfTemperature.CELSIUS,
+                    },
+                    rows,
+                )
+                self.exported_rows += len(rows)
+
+        rows = []
+        for h in hours:
+            if (entry := self._energy_hours.get(h)) is not None:
+                state, total = entry
+                rows.append({"start": dt_util.utc_from_timestamp(h), "state": state, "sum": round(total, 3)})
+        if rows:
+            async_add_external_statistics(
+                self.hass,
+                {
+                    "has_mean": False,
+                    "has_sum": True,
+                    "name": f"{self._name} Energia",
+                    "source": DOMAIN,
+                    "statistic_id": self._energy_id,
+                    "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
+                },
+                rows,
+            )
+            self.exported_rows += len(rows)
+
+        self._prune_energy_hours(until)
+        self._exported_until = until
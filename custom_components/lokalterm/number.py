@@ -1,77 +1,46 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Callable
 
 from homeassistant.components.number import NumberEntity, NumberEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-
-
-def _to_temp100(v: Any) -> float | None:
-    if v is None:
-        return None
-    try:
-        return int(v) / 100.0
-    except Exception:
-        return None
-
-
-def _temp_to_wire(value_c: float) -> str:
-    return str(int(round(value_c * 100)))
+from .fields import FIELDS
+from .snapshot import EltermSnapshot
 
 
 @dataclass(frozen=True, kw_only=True)
 class EltermNumberDescription(NumberEntityDescription):
     field: str
+    value_fn: Callable[[EltermSnapshot], float | None]
+
+
+def _number(key: str, name: str, icon: str, field: str, value_fn: Callable[[EltermSnapshot], float | None]) -> EltermNumberDescription:
+    """Opis encji z zakresem, krokiem i jednostką wziętymi z rejestru pól."""
+    spec = FIELDS[field]
+    return EltermNumberDescription(
+        key=key,
+        name=name,
+        icon=icon,
+        native_unit_of_measurement=spec.unit,
+        native_min_value=spec.min_value,
+        native_max_value=spec.max_value,
+        native_step=spec.step,
+        field=field,
+        value_fn=value_fn,
+    )
 
 
 NUMBERS: list[EltermNumberDescription] = [
-    EltermNumberDescription(
-        key="co_temperatura_zadana",
-        name="CO Temperatura",
-        icon="mdi:thermometer",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        native_min_value=20.0,
-        native_max_value=69.0,
-        native_step=1,
-        field="BoilerTempCmd",
-    ),
-    EltermNumberDescription(
-        key="co_histereza",
-        name="CO Histereza",
-        icon="mdi:delta",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        native_min_value=0.0,
-        native_max_value=6.0,
-        native_step=1.0,
-        field="BoilerHist",
-    ),
-    EltermNumberDescription(
-        key="cwu_temperatura_zadana",
-        name="CWU Temperatura",
-        icon="mdi:thermometer",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        native_min_value=30.0,
-        native_max_value=69.0,
-        native_step=1,
-        field="DHWTempCmd",
-    ),
-    EltermNumberDescription(
-        key="cwu_histereza",
-        name="CWU Histereza",
-        icon="mdi:delta",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        native_min_value=0.0,
-        native_max_value=6.0,
-        native_step=1.0,
-        field="DHWHist",
-    ),
+    _number("co_temperatura_zadana", "CO Temperatura", "mdi:thermometer", "BoilerTempCmd", lambda s: s.boiler_temp_cmd),
+    _number("co_histereza", "CO Histereza", "mdi:delta", "BoilerHist", lambda s: s.boiler_hist),
+    _number("cwu_temperatura_zadana", "CWU Temperatura", "mdi:thermometer", "DHWTempCmd", lambda s: s.dhw_temp_cmd),
+    _number("cwu_histereza", "CWU Histereza", "mdi:delta", "DHWHist", lambda s: s.dhw_hist),
 ]
 
 
@@ -87,7 +56,7 @@ class EltermNumber(CoordinatorEntity, NumberEntity):
     entity_description: EltermNumberDescription
 
     def __init__(self, coordinator, server, devid: str, dev_name: str, description: EltermNumberDescription) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset((description.field,)))
         self.entity_description = description
         self._server = server
 
@@ -104,14 +73,16 @@ class EltermNumber(CoordinatorEntity, NumberEntity):
 
     @property
     def available(self) -> bool:
-        return self.coordinator.data is not None
+        return self.coordinator.available
 
     @property
     def native_value(self) -> float | None:
-        data = self.coordinator.data or {}
-        return _to_temp100(data.get(self.entity_description.field))
+        data: EltermSnapshot | None = self.coordinator.data
+        if data is None:
+            return None
+        return self.entity_description.value_fn(data)
 
     async def async_set_native_value(self, value: float) -> None:
-        data = self.coordinator.data or {}
-        fields = {self.entity_description.field: _temp_to_wire(float(value))}
-        await self._server.send_data_to_send(fields, base_state=dict(data))
+        field = self.entity_description.field
+        fields = {field: FIELDS[field].encode(value)}
+        await self._server.send_data_to_send(fields)
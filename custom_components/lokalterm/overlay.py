@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Iterable, Mapping
+
+from homeassistant.core import HomeAssistant, callback
+
+
+class OptimisticOverlay:
+    """Optymistyczne wartości pól po komendzie z UI – tylko nadpisane pola.
+
+    Każde pole ma własny termin; znika, gdy piec potwierdzi wartość w ramce
+    (``settle``), gdy komenda zostanie wycofana (``clear``) albo po terminie.
+    Wygasanie obsługuje jeden timer ustawiony na najbliższy termin.
+    """
+
+    def __init__(self, hass: HomeAssistant, on_expire: Callable[[frozenset[str]], None]) -> None:
+        self.hass = hass
+        self._on_expire = on_expire
+        self._values: dict[str, str] = {}
+        self._expires: dict[str, float] = {}
+        self._handle: asyncio.TimerHandle | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self._values)
+
+    @property
+    def values(self) -> Mapping[str, str]:
+        return self._values
+
+    def set(self, fields: Mapping[str, Any], ttl: float) -> frozenset[str]:
+        """Nadpisuje pola na ``ttl`` sekund; zwraca pola, których wartość się zmieniła."""
+        expires = self.hass.loop.time() + ttl
+        changed = []
+        for key, value in fields.items():
+            value = str(value)
+            if self._values.get(key) != value:
+                changed.append(key)
+            self._values[key] = value
+            self._expires[key] = expires
+        self._schedule()
+        return frozenset(changed)
+
+    def clear(self, keys: Iterable[str]) -> frozenset[str]:
+        """Wycofuje nadpisania (np. po timeoucie komendy); zwraca usunięte pola."""
+        removed = frozenset(k for k in keys if self._values.pop(k, None) is not None)
+        for key in removed:
+            del self._expires[key]
+        if removed:
+            self._schedule()
+        return removed
+
+    def settle(self, raw: Mapping[str, Any]) -> frozenset[str]:
+        """Usuwa pola, których wartość piec już raportuje; zwraca usunięte."""
+        if not self._values:
+            return frozenset()
+        return self.clear([k for k, v in self._values.items() if str(raw.get(k)) == v])
+
+    def _schedule(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._expires:
+            self._handle = self.hass.loop.call_at(min(self._expires.values()), self._async_expire)
+
+    @callback
+    def _async_expire(self) -> None:
+        self._handle = None
+        now = self.hass.loop.time()
+        removed = self.clear([k for k, t in self._expires.items() if t <= now])
+        if not removed:
+            self._schedule()
+            return
+        self._on_expire(removed)
+
+    @callback
+    def async_shutdown(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._values.clear()
+        self._expires.clear()
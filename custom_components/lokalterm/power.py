@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import math
+import time
+from datetime import timedelta
+from typing import Any, Mapping
+
+from homeassistant.util import dt as dt_util
+
+from .const import POWER_RATED_SMOOTHING, POWER_SMOOTHING_SECONDS
+from .longterm import counter_delta
+from .fields import _parse_int
+from .snapshot import _power_percent
+
+
+def _parse_counter(v: Any) -> float | None:
+    """Licznik P033 bez zaokrąglania (pełna rozdzielczość do estymacji mocy)."""
+    if v is None:
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class PowerEstimator:
+    """Moc grzania i energia godzinowa/dobowa liczone przyrostowo z ramek SkzpData.
+
+    Licznik P033 rośnie skokowo, więc moc z samej pochodnej licznika jest
+    dostępna dopiero po kolejnym skoku. Między skokami moc wynika z procentu
+    mocy (DevStatus) i mocy znamionowej wyuczonej z licznika: energia między
+    skokami / czas pracy ważony procentem mocy. Spadek licznika traktowany
+    jest jako reset. Każda ramka to O(1).
+    """
+
+    def __init__(self, smoothing: float = POWER_SMOOTHING_SECONDS) -> None:
+        self._tau = smoothing
+        self._prev_energy: float | None = None
+        self._prev_t: float | None = None
+        self._percent: int | None = None
+        # Kotwica ostatniego skoku licznika i praca (% * s) od tej chwili
+        self._anchor_t: float | None = None
+        self._anchor_energy = 0.0
+        self._anchor_valid = False
+        self._duty = 0.0
+        self._counter_kw: float | None = None
+        self.rated_kw: float | None = None
+        self.resets = 0
+        # Kubełki energii w czasie lokalnym
+        self._hour_end = 0.0
+        self._day_end = 0.0
+        self.energy_hour = 0.0
+        self.energy_day = 0.0
+
+    @property
+    def has_data(self) -> bool:
+        """Czy dotarła już ramka z licznikiem P033 (wcześniej moc i energia są nieznane)."""
+        return self._prev_energy is not None
+
+    @property
+    def power_w(self) -> float | None:
+        if self._percent == 0:
+            return 0.0
+        if self.rated_kw is not None and self._percent is not None:
+            return round(self.rated_kw * self._percent * 10.0, 0)
+        if self._counter_kw is not None:
+            return round(self._counter_kw * 1000.0, 0)
+        return None
+
+    def _roll_buckets(self, wall: float) -> None:
+        if wall < self._hour_end:
+            return
+        local = dt_util.as_local(dt_util.utc_from_timestamp(wall))
+        hour_start = local.replace(minute=0, second=0, microsecond=0)
+        self._hour_end = (hour_start + timedelta(hours=1)).timestamp()
+        self.energy_hour = 0.0
+        if wall >= self._day_end:
+            day_start = dt_util.start_of_local_day(local)
+            self._day_end = dt_util.start_of_local_day(day_start + timedelta(days=1, hours=1)).timestamp()
+            self.energy_day = 0.0
+
+    def add_frame(self, obj: Mapping[str, Any], now: float | None = None, wall: float | None = None) -> None:
+        t = time.monotonic() if now is None else now
+        self._roll_buckets(time.time() if wall is None else wall)
+
+        ch1_mode = obj.get("CH1Mode")
+        percent = _power_percent(obj, None if ch1_mode is None else str(ch1_mode), _parse_int(obj.get("BuModulMax")))
+        if self._prev_t is not None and self._percent is not None:
+            self._duty += self._percent * (t - self._prev_t)
+        self._prev_t = t
+        self._percent = percent
+
+        energy = _parse_counter(obj.get("P033"))
+        if energy is None:
+            return
+        if self._prev_energy is not None and energy < self._prev_energy:
+            self.resets += 1
+            self._anchor_valid = False
+        delta = counter_delta(self._prev_energy, energy)
+        self._prev_energy = energy
+        self.energy_hour += delta
+        self.energy_day += delta
+
+        if self._anchor_t is None or not self._anchor_valid:
+            # Pierwsza ramka lub reset: kotwica startuje w nieznanym miejscu skoku
+            self._set_anchor(t, energy, valid=self._anchor_t is not None and delta > 0)
+            return
+        if energy <= self._anchor_energy:
+            return
+
+        dt = t - self._anchor_t
+        used = energy - self._anchor_energy
+        if dt > 0:
+            kw = used * 3600.0 / dt
+            a = 1.0 - math.exp(-dt / self._tau)
+            self._counter_kw = kw if self._counter_kw is None else self._counter_kw + a * (kw - self._counter_kw)
+        if self._duty > 0:
+            rated = used * 3600.0 * 100.0 / self._duty
+            self.rated_kw = (
+                rated if self.rated_kw is None else self.rated_kw + POWER_RATED_SMOOTHING * (rated - self.rated_kw)
+            )
+        self._set_anchor(t, energy, valid=True)
+
+    def _set_anchor(self, t: float, energy: float, valid: bool) -> None:
+        self._anchor_t = t
+        self._anchor_energy = energy
+        self._anchor_valid = valid
+        self._duty = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "power_w": self.power_w,
+            "rated_kw": None if self.rated_kw is None else round(self.rated_kw, 3),
+            "energy_hour_kwh": round(self.energy_hour, 3),
+            "energy_day_kwh": round(self.energy_day, 3),
+            "counter_resets": self.resets,
+        }
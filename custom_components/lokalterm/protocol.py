@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from .const import (
+    MAX_FRAME_BYTES,
+    TCP_KEEPALIVE_COUNT,
+    TCP_KEEPALIVE_IDLE,
+    TCP_KEEPALIVE_INTERVAL,
+    WRITE_BUFFER_HIGH_BYTES,
+)
+
+try:
+    # Szybszy dekoder, gdy jest zainstalowany (Home Assistant ma go w zależnościach)
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+if TYPE_CHECKING:
+    from .coordinator import EltermLocalServer
+    from .listener import EltermListener
+
+# Powody odrzucenia danych (klucze liczników błędów)
+ERR_JSON = "json"
+ERR_OVERSIZE = "oversize"
+ERR_GARBAGE = "garbage"
+
+_BLANK = b"\r\n\t \x00"
+
+
+class FrameParser:
+    """Dzieli strumień bajtów z modułu WIZ108SR na ramki JSON.
+
+    Ramki kończą się ``\\r\\n``; gdy moduł zgubi terminator, granicą jest też
+    sekwencja ``}{``. Bufor nigdy nie przekracza ``max_frame`` bajtów bez
+    terminatora – nadmiar jest odrzucany do ostatniej granicy ``}``.
+
+    Ramka identyczna bajt w bajt z poprzednią nie jest dekodowana ponownie –
+    ``feed`` zwraca wtedy ten sam obiekt (``last``), co pozwala pominąć dalszą
+    obróbkę porównaniem tożsamości.
+    """
+
+    def __init__(
+        self,
+        on_error: Callable[[str], None] | None = None,
+        max_frame: int = MAX_FRAME_BYTES,
+    ) -> None:
+        self._buf = bytearray()
+        # Do tego miejsca bufor przeszukano już pod kątem terminatora
+        self._scan = 0
+        self._max_frame = max_frame
+        self._on_error = on_error
+        # Ostatnia poprawna ramka (surowe bajty i wynik dekodowania)
+        self._last_raw: bytes | None = None
+        self.last: dict[str, Any] | None = None
+        self.duplicates = 0
+
+    def _error(self, reason: str) -> None:
+        if self._on_error is not None:
+            self._on_error(reason)
+
+    def feed(self, data: bytes) -> list[dict[str, Any]]:
+        """Dokłada dane do bufora i zwraca wszystkie kompletne ramki."""
+        buf = self._buf
+        buf += data
+        frames: list[dict[str, Any]] = []
+        start = 0
+
+        with memoryview(buf) as view:
+            while True:
+                end = self._find_boundary(buf, max(start, self._scan))
+                if end < 0:
+                    break
+                self._emit(view[start:end], frames)
+                # "}{" – granica bez terminatora, kolejna ramka zaczyna się od "{"
+                start = end + 1 if buf[end] == 0x0A else end
+                self._scan = start
+
+        if start:
+            del buf[:start]
+            self._scan -= start
+
+        if len(buf) > self._max_frame:
+            # Brak terminatora w limicie – resynchronizacja na ostatniej granicy "}"
+            self._error(ERR_OVERSIZE)
+            cut = buf.rfind(b"}")
+            del buf[: cut + 1 if cut >= 0 else len(buf)]
+            self._scan = 0
+        else:
+            self._scan = max(self._scan, len(buf) - 1)
+
+        return frames
+
+    @staticmethod
+    def _find_boundary(buf: bytearray, pos: int) -> int:
+        nl = buf.find(b"\n", pos)
+        joined = buf.find(b"}{", pos, nl if nl >= 0 else len(buf))
+        if joined >= 0:
+            return joined + 1
+        return nl
+
+    def _emit(self, chunk: memoryview, frames: list[dict[str, Any]]) -> None:
+        if len(chunk) > self._max_frame:
+            self._error(ERR_OVERSIZE)
+            return
+        # Powtórzona ramka: porównanie bajtów bez kopiowania i bez json.loads
+        if self.last is not None and chunk == self._last_raw:
+            self.duplicates += 1
+            frames.append(self.last)
+            return
+
+        raw = whole = bytes(chunk)
+        first = raw.find(b"{")
+        if first < 0:
+            if raw.strip(_BLANK):
+                self._error(ERR_GARBAGE)
+            return
+        if first:
+            if raw[:first].strip(_BLANK):
+                # Śmieci przed "{" (np. po zaniku zasilania) – pomijamy je
+                self._error(ERR_GARBAGE)
+            raw = raw[first:]
+
+        try:
+            obj = _json_loads(raw)
+        except ValueError:
+            self._error(ERR_JSON)
+            return
+        if not isinstance(obj, dict):
+            self._error(ERR_JSON)
+            return
+        self._last_raw = whole
+        self.last = obj
+        frames.append(obj)
+
+
+def _configure_socket(sock: socket.socket | None) -> None:
+    """TCP_NODELAY – krótkie komendy idą od razu, bez czekania algorytmu Nagle'a.
+
+    Keepalive TCP – system wykryje półotwarte połączenie po zaniku Wi-Fi modułu.
+    """
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Opcje dostępne na Linuksie; na innych systemach zostają wartości domyślne
+        for name, value in (
+            ("TCP_KEEPIDLE", TCP_KEEPALIVE_IDLE),
+            ("TCP_KEEPINTVL", TCP_KEEPALIVE_INTERVAL),
+            ("TCP_KEEPCNT", TCP_KEEPALIVE_COUNT),
+        ):
+            if hasattr(socket, name):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
+    except OSError:
+        pass
+
+
+class EltermProtocol(asyncio.Protocol):
+    """Połączenie TCP z modułem pieca – parsowanie ramek bez zadań per linia.
+
+    Połączenie przypina się do sesji urządzenia (``session``) przy pierwszej
+    ramce z pasującym vId; dopóki vId się nie zmienia, routing jest O(1).
+    """
+
+    def __init__(self, listener: EltermListener) -> None:
+        self._listener = listener
+        self._parser = FrameParser(on_error=self._on_parse_error)
+        self.session: EltermLocalServer | None = None
+        # vId ostatnio przypiętego urządzenia – pozwala przejąć połączenie po przeładowaniu
+        self.devid: str | None = None
+        self.transport: asyncio.Transport | None = None
+        self.peer: Any = None
+        self._paused = False
+        self._drain_waiter: asyncio.Future[None] | None = None
+        # Czas pętli ostatnio odebranych danych (watchdog bezczynności)
+        self.last_rx = 0.0
+        # Ostatnia ramka przekazana sesji (wykrywanie powtórzeń)
+        self._prev_obj: dict[str, Any] | None = None
+        # Liczniki tego połączenia (diagnostyka) i powód zamknięcia
+        self.frames_in = 0
+        self.bytes_in = 0
+        self.frames_out = 0
+        self.bytes_out = 0
+        self.parse_errors = 0
+        self.close_reason: str | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        self.peer = transport.get_extra_info("peername")
+        self.last_rx = asyncio.get_running_loop().time()
+        _configure_socket(transport.get_extra_info("socket"))
+        # Niski próg bufora: zablokowany moduł szybko wstrzymuje kolejne zapisy
+        transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH_BYTES)  # type: ignore[attr-defined]
+        self._listener.async_connection_made(self)
+
+    def data_received(self, data: bytes) -> None:
+        start = time.perf_counter()
+        self.last_rx = self._listener.hass.loop.time()
+        self.bytes_in += len(data)
+        frames = self._parser.feed(data)
+        if frames:
+            # Czas obsługi ramki w sesji obejmuje też jej udział w parsowaniu porcji danych
+            parse_share = (time.perf_counter() - start) / len(frames)
+            for obj in frames:
+                t0 = time.perf_counter()
+                session = self._dispatch(obj)
+                if session is not None:
+                    session.stats.frame_handling.add((time.perf_counter() - t0 + parse_share) * 1_000_000.0)
+        if self.session is not None:
+            self.session.stats.bytes_in.add(len(data))
+
+    def _dispatch(self, obj: dict[str, Any]) -> EltermLocalServer | None:
+        """Przekazuje ramkę sesji (routing po vId przy pierwszej ramce); zwraca sesję."""
+        self.frames_in += 1
+        session = self.session
+        if obj is self._prev_obj and session is not None:
+            # Ta sama ramka co poprzednio – ten sam vId i ta sama sesja
+            session.async_handle_duplicate(self, obj)
+            return session
+        vid = obj.get("vId")
+        if session is None or (vid is not None and str(vid) != session.cfg.devid):
+            session = self._listener.async_route(self, obj)
+            if session is None:
+                return None
+            self._bind(session)
+        # Po przypięciu – ramka, od której sesja startuje, też jest punktem odniesienia
+        self._prev_obj = obj
+        session.async_handle_frame(self, obj)
+        return session
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.transport = None
+        if self.close_reason is None:
+            self.close_reason = f"error: {exc}" if exc is not None else "closed"
+        self._wake_drain(exc or ConnectionResetError("LokalTerm: połączenie zamknięte"))
+        self._listener.async_connection_lost(self)
+        if self.session is not None:
+            self.session.async_connection_lost(self)
+
+    def _bind(self, session: EltermLocalServer) -> None:
+        if self.session is not None:
+            self.session.async_connection_lost(self)
+        self.session = session
+        self.devid = str(session.cfg.devid)
+        # Nowa sesja musi dostać pełną ramkę, nawet powtórzoną
+        self._prev_obj = None
+        session.async_connection_made(self)
+
+    def bind(self, session: EltermLocalServer) -> None:
+        """Przypina połączenie do (nowej) sesji bez czekania na kolejną ramkę."""
+        self._bind(session)
+
+    def detach(self) -> None:
+        """Odpina połączenie od sesji, nie zamykając gniazda."""
+        self.session = None
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "frames_in": self.frames_in,
+            "bytes_in": self.bytes_in,
+            "frames_out": self.frames_out,
+            "bytes_out": self.bytes_out,
+            "duplicate_frames": self._parser.duplicates,
+            "parse_errors": self.parse_errors,
+        }
+
+    def _on_parse_error(self, reason: str) -> None:
+        self.parse_errors += 1
+        target = self.session or self._listener
+        target.async_record_parse_error(reason)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._wake_drain(None)
+
+    def _wake_drain(self, exc: Exception | None) -> None:
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is None or waiter.done():
+            return
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+
+    @property
+    def writable(self) -> bool:
+        """Bufor nadawczy poniżej progu – można dopisać kolejną ramkę."""
+        return self.transport is not None and not self._paused
+
+    @property
+    def is_connected(self) -> bool:
+        return self.transport is not None and not self.transport.is_closing()
+
+    def write(self, payload: bytes) -> None:
+        if self.transport is None:
+            raise ConnectionResetError("LokalTerm: brak połączenia z piecem")
+        self.transport.write(payload)
+        self.frames_out += 1
+        self.bytes_out += len(payload)
+
+    async def drain(self) -> None:
+        """Czeka, aż bufor nadawczy transportu spadnie poniżej progu."""
+        if self.transport is None:
+            raise ConnectionResetError("LokalTerm: brak połączenia z piecem")
+        if not self._paused:
+            return
+        if self._drain_waiter is None or self._drain_waiter.done():
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+        await self._drain_waiter
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    def abort(self, reason: str | None = None) -> None:
+        """Natychmiastowe zamknięcie (bez czekania na bufor) – dla martwych połączeń."""
+        if reason is not None and self.close_reason is None:
+            self.close_reason = reason
+        if self.transport is not None:
+            self.transport.abort()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DEFAULT_PUBLISH_ENERGY_DEADBAND,
+    DEFAULT_PUBLISH_MAX_STALE,
+    DEFAULT_PUBLISH_TEMP_DEADBAND,
+    PUBLISH_MIN_INTERVAL_SECONDS,
+)
+from .fields import WRITABLE_FIELDS, _parse_energy, _parse_temp100
+from .stats import LatencyRing
+
+# Pola pomiarowe objęte martwą strefą
+_TEMP_FIELDS = ("BoilerTempAct", "DHWTempAct")
+_ENERGY_FIELDS = ("P033",)
+
+
+@dataclass(frozen=True, slots=True)
+class PublishPolicy:
+    """Zasady publikacji ramek do koordynatora.
+
+    - pola sterujące (tryby, nastawy) publikowane są od razu,
+    - pomiary z martwą strefą (temperatury, energia) – dopiero po zmianie
+      o co najmniej ``temp_deadband`` / ``energy_deadband``,
+    - pozostałe zmiany – nie częściej niż co ``min_interval``,
+    - drobne zmiany poniżej strefy – najpóźniej po ``max_stale`` sekundach.
+    """
+
+    temp_deadband: float = DEFAULT_PUBLISH_TEMP_DEADBAND
+    energy_deadband: float = DEFAULT_PUBLISH_ENERGY_DEADBAND
+    min_interval: float = PUBLISH_MIN_INTERVAL_SECONDS
+    max_stale: float = DEFAULT_PUBLISH_MAX_STALE
+    immediate_fields: frozenset[str] = field(default=WRITABLE_FIELDS)
+
+    def deadbands(self) -> dict[str, tuple[Callable[[Any], float | None], float]]:
+        out: dict[str, tuple[Callable[[Any], float | None], float]] = {}
+        for f in _TEMP_FIELDS:
+            out[f] = (_parse_temp100, self.temp_deadband)
+        for f in _ENERGY_FIELDS:
+            out[f] = (_parse_energy, self.energy_deadband)
+        return out
+
+
+class FramePublisher:
+    """Decyduje, kiedy ramka od serwera trafia do ``EltermCoordinator.async_set_frame``.
+
+    Porównuje ramkę z ostatnio opublikowaną i klasyfikuje zmiany
+    (natychmiastowe / istotne / szum). Zawsze publikowana jest najnowsza
+    ramka, więc drobne zmiany nie giną – jedynie czekają.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        publish: Callable[[dict[str, Any]], None],
+        policy: PublishPolicy | None = None,
+    ) -> None:
+        self.hass = hass
+        self._publish = publish
+        self._latest: dict[str, Any] | None = None
+        self._published: Mapping[str, Any] | None = None
+        self._last_publish = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+        # Czas pętli pierwszej nieopublikowanej zmiany
+        self._pending_since: float | None = None
+        self.set_policy(policy or PublishPolicy())
+        self.published = 0
+        self.suppressed = 0
+        # Opóźnienie od ramki ze zmianą do publikacji w koordynatorze (ms)
+        self.delay = LatencyRing()
+
+    def set_policy(self, policy: PublishPolicy) -> None:
+        self.policy = policy
+        self._deadbands = policy.deadbands()
+
+    def _classify(self, obj: Mapping[str, Any]) -> tuple[bool, bool, bool]:
+        """(natychmiast, istotna zmiana, jakakolwiek zmiana) względem ostatniej publikacji."""
+        prev = self._published
+        assert prev is not None
+        significant = False
+        any_change = False
+        for k in obj.keys() | prev.keys():
+            new, old = obj.get(k), prev.get(k)
+            if new == old:
+                continue
+            any_change = True
+            if k in self.policy.immediate_fields:
+                return True, True, True
+            band = self._deadbands.get(k)
+            if band is not None:
+                decode, limit = band
+                a, b = decode(new), decode(old)
+                if a is not None and b is not None and abs(a - b) < limit:
+                    continue
+            significant = True
+        return False, significant, any_change
+
+    @callback
+    def async_on_status(self, obj: dict[str, Any]) -> None:
+        """Wejście z serwera: ramka statusu od pieca."""
+        self._latest = obj
+        now = self.hass.loop.time()
+        if self._published is None:
+            self._pending_since = now
+            self._publish_now()
+            return
+
+        immediate, significant, any_change = self._classify(obj)
+        if not any_change:
+            return
+        if self._pending_since is None:
+            self._pending_since = now
+        if immediate:
+            self._publish_now()
+            return
+
+        if significant:
+            due = self._last_publish + self.policy.min_interval
+            if now >= due:
+                self._publish_now()
+                return
+        else:
+            self.suppressed += 1
+            due = self._last_publish + self.policy.max_stale
+        self._schedule(due)
+
+    def _schedule(self, due: float) -> None:
+        # Publikacja już zaplanowana wcześniej obejmie też tę ramkę
+        if self._handle is not None:
+            if self._handle.when() <= due:
+                return
+            self._handle.cancel()
+        self._handle = self.hass.loop.call_at(due, self._publish_now)
+
+    @callback
+    def _publish_now(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        obj = self._latest
+        if obj is None:
+            return
+        self._published = obj
+        self._last_publish = self.hass.loop.time()
+        if self._pending_since is not None:
+            self.delay.add((self._last_publish - self._pending_since) * 1000.0)
+            self._pending_since = None
+        self.published += 1
+        self._publish(obj)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "publish_delay_ms": self.delay.summary(),
+        }
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Zatrzymuje timer; wstrzymana ramka trafia jeszcze do koordynatora (i do zapisu stanu)."""
+        if self._handle is not None:
+            self._publish_now()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .capture import DIR_OUT, load_capture
+from .coordinator import EltermLocalCfg, EltermLocalServer
+from .protocol import FrameParser
+
+
+async def async_replay_capture(
+    hass: HomeAssistant,
+    path: str | os.PathLike[str],
+    on_status: Callable[[dict[str, Any]], None],
+    speed: float = 1.0,
+) -> dict[str, Any]:
+    """Odtwarza zapis przez parser, dopasowanie potwierdzeń i ``on_status``.
+
+    Odtwarzanie odbywa się na odizolowanej sesji (bez gniazda), więc do pieca
+    nic nie jest wysyłane. ``speed=1`` – tempo rzeczywiste, ``speed<=0`` –
+    najszybciej jak się da. Zwraca statystyki sesji po odtworzeniu.
+    """
+    records = await hass.async_add_executor_job(load_capture, path)
+    session = EltermLocalServer(
+        hass,
+        EltermLocalCfg(listen_host="", listen_port=0, devid="***", devpin="***"),
+        on_status=on_status,
+    )
+    parser = FrameParser(on_error=session.async_record_parse_error)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    t0 = records[0].t if records else 0.0
+
+    for i, rec in enumerate(records):
+        if speed > 0:
+            delay = start + (rec.t - t0) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif i % 100 == 0:
+            await asyncio.sleep(0)
+
+        if rec.direction == DIR_OUT:
+            fields = {
+                k: v for k, v in rec.frame.items() if k not in ("FrameType", "vId", "vPin", "vToken")
+            }
+            session.async_queue_replayed_command(fields)
+            continue
+
+        data = json.dumps(rec.frame, separators=(",", ":")).encode("utf-8") + b"\r\n"
+        for obj in parser.feed(data):
+            session.async_handle_frame(None, obj)
+        session.stats.bytes_in.add(len(data))
+
+    session.async_shutdown()
+    return {
+        "records": len(records),
+        "duration_s": round(loop.time() - start, 3),
+        "stats": session.stats.as_dict(session.parse_errors),
+    }
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from itertools import count
+from typing import Any, Callable, Iterable
+
+from homeassistant.const import WEEKDAYS
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .commands import ACK_CANCELLED, ACK_CONFIRMED, ACK_SUPERSEDED
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pola, dla których można ustawić program tygodniowy
+SCHEDULE_FIELDS = ("BoilerTempCmd", "DHWTempCmd", "DHWMode")
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleEntry:
+    """Jedno przejście programu: dzień tygodnia (0 = poniedziałek), minuta doby, wartość na kablu."""
+
+    day: int
+    minute: int
+    value: str
+
+    def next_after(self, now: datetime) -> datetime:
+        """Najbliższe wystąpienie po ``now`` w czasie lokalnym (z uwzględnieniem zmiany czasu)."""
+        local = dt_util.as_local(now)
+        at = time(self.minute // 60, self.minute % 60)
+        day = local.date() + timedelta(days=(self.day - local.weekday()) % 7)
+        when = datetime.combine(day, at, tzinfo=local.tzinfo)
+        if when <= local:
+            when = datetime.combine(day + timedelta(days=7), at, tzinfo=local.tzinfo)
+        return when
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "day": WEEKDAYS[self.day],
+            "time": f"{self.minute // 60:02d}:{self.minute % 60:02d}",
+            "value": self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ScheduleEntry:
+        hours, minutes = str(data["time"]).split(":")[:2]
+        return cls(WEEKDAYS.index(data["day"]), int(hours) * 60 + int(minutes), str(data["value"]))
+
+
+class ScheduleEngine:
+    """Tygodniowe programy nastaw wykonywane w integracji.
+
+    Przejścia wszystkich programów leżą w kopcu (czas, pole, wpis); uzbrojony
+    jest jeden timer – na najbliższe przejście. Po wykonaniu wpis wraca do
+    kopca z terminem za tydzień. Po każdym (ponownym) połączeniu z piecem
+    wartości obowiązujące w tej chwili są wysyłane dla wszystkich pól
+    z programem – piec mógł je zmienić w czasie przerwy (panel, zanik
+    zasilania), a przejścia przypadające na brak połączenia też trafiają
+    do pieca dopiero wtedy.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        store: Store,
+        apply: Callable[[dict[str, str]], asyncio.Future[dict[str, str]]],
+    ) -> None:
+        self.hass = hass
+        self._store = store
+        self._apply = apply
+        self._programmes: dict[str, tuple[ScheduleEntry, ...]] = {}
+        self._heap: list[tuple[float, int, str, ScheduleEntry]] = []
+        self._seq = count()
+        self._unsub: CALLBACK_TYPE | None = None
+        self._connected = False
+        # Pola, których przejścia nie dotarły do pieca
+        self._missed: set[str] = set()
+        # Numer połączenia – wynik wysyłki z poprzedniego połączenia jest nieaktualny
+        self._generation = 0
+        self.transitions_sent = 0
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        programmes = stored.get("programmes", {}) if isinstance(stored, dict) else {}
+        for field, entries in programmes.items():
+            if field in SCHEDULE_FIELDS and entries:
+                self._programmes[field] = tuple(ScheduleEntry.from_dict(e) for e in entries)
+        self._rebuild()
+
+    async def async_set_programme(self, field: str, entries: Iterable[ScheduleEntry]) -> None:
+        """Zastępuje program pola (pusty – usuwa go) i od razu stosuje obowiązującą wartość."""
+        programme = tuple(sorted(set(entries), key=lambda e: (e.day, e.minute)))
+        if programme:
+            self._programmes[field] = programme
+        else:
+            self._programmes.pop(field, None)
+        await self._store.async_save(
+            {"programmes": {f: [e.as_dict() for e in p] for f, p in self._programmes.items()}}
+        )
+        self._rebuild()
+        if programme:
+            self._async_send({field})
+
+    def _rebuild(self) -> None:
+        now = dt_util.now()
+        self._heap = [
+            (entry.next_after(now).timestamp(), next(self._seq), field, entry)
+            for field, programme in self._programmes.items()
+            for entry in programme
+        ]
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def _arm(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._heap:
+            self._unsub = async_track_point_in_utc_time(
+                self.hass, self._async_fire, dt_util.utc_from_timestamp(self._heap[0][0])
+            )
+
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        self._unsub = None
+        heap = self._heap
+        ts = now.timestamp()
+        due: dict[str, str] = {}
+        while heap and heap[0][0] <= ts:
+            when, _seq, field, entry = heapq.heappop(heap)
+            # Przy kilku przejściach naraz obowiązuje najpóźniejsze
+            due[field] = entry.value
+            heapq.heappush(
+                heap, (entry.next_after(dt_util.utc_from_timestamp(when)).timestamp(), next(self._seq), field, entry)
+            )
+        self._arm()
+        if not due:
+            return
+        if not self._connected:
+            _LOGGER.info("LokalTerm: harmonogram %s – piec niepodłączony, wyślę po połączeniu", due)
+            self._missed.update(due)
+            return
+        self._async_apply(due)
+
+    def current_values(self, now: datetime | None = None) -> dict[str, str]:
+        """Wartości obowiązujące teraz według programów (ostatnie minione przejście)."""
+        now = dt_util.now() if now is None else now
+        values: dict[str, str] = {}
+        for field, programme in self._programmes.items():
+            last = max(programme, key=lambda e: e.next_after(now) - timedelta(days=7))
+            values[field] = last.value
+        return values
+
+    @callback
+    def async_set_connected(self, connected: bool) -> None:
+        self._connected = connected
+        if not connected:
+            return
+        self._generation += 1
+        # Ponowne ustawienie obowiązujących wartości; zbędne wysyłki scala kolejka komend
+        self._missed.clear()
+        self._async_send(self._programmes)
+
+    @callback
+    def _async_send(self, fields: Iterable[str]) -> None:
+        values = self.current_values()
+        due = {f: values[f] for f in fields if f in values}
+        if not due:
+            return
+        if not self._connected:
+            self._missed.update(due)
+            return
+        self._async_apply(due)
+
+    @callback
+    def _async_apply(self, due: dict[str, str]) -> None:
+        _LOGGER.info("LokalTerm: harmonogram -> %s", due)
+        self.transitions_sent += 1
+        generation = self._generation
+        self._apply(due).add_done_callback(lambda future: self._async_result(future, generation))
+
+    @callback
+    def _async_result(self, future: asyncio.Future[dict[str, str]], generation: int) -> None:
+        """Niepotwierdzone pola wracają do ponownej wysyłki po ponownym połączeniu."""
+        if future.cancelled() or generation != self._generation:
+            # Po ponownym połączeniu obowiązujące wartości zostały już wysłane od nowa
+            return
+        # Anulowanie przy wyładowaniu wpisu to nie błąd pieca; nowsza komenda (np. z UI) ma pierwszeństwo
+        failed = {
+            k: v for k, v in future.result().items() if v not in (ACK_CONFIRMED, ACK_CANCELLED, ACK_SUPERSEDED)
+        }
+        if not failed:
+            return
+        _LOGGER.warning("LokalTerm: piec nie potwierdził nastaw z harmonogramu: %s", failed)
+        self._missed.update(failed)
+
+    @callback
+    def async_shutdown(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "programmes": {f: [e.as_dict() for e in p] for f, p in self._programmes.items()},
+            "next_transitions": [
+                {"at": dt_util.utc_from_timestamp(when).isoformat(), "field": field, "value": entry.value}
+                for when, _seq, field, entry in heapq.nsmallest(5, self._heap)
+            ],
+            "transitions_sent": self.transitions_sent,
+            "pending_after_reconnect": sorted(self._missed),
+        }
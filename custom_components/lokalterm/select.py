@@ -10,13 +10,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-
-
-def _get_str(data: dict[str, Any], key: str, default: str | None = None) -> str | None:
-    v = data.get(key)
-    if v is None:
-        return default
-    return str(v)
+from .fields import FIELDS
+from .snapshot import EltermSnapshot
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -26,13 +21,14 @@ class EltermSelectDescription(SelectEntityDescription):
     map_from_wire: dict[str, str]
 
 
-CO_POWER_OPTIONS = ["33", "67", "100"]
-CO_POWER_TO_STEP: dict[str, str] = {"33": "0", "67": "1", "100": "2"}
-CO_STEP_TO_POWER = {"0": "33", "1": "67", "2": "100"}
+# Wartości na kablu <-> etykiety w UI z rejestru pól
+CO_STEP_TO_POWER: dict[str, str] = dict(FIELDS["BuModulMax"].options)
+CO_POWER_TO_STEP: dict[str, str] = {v: k for k, v in CO_STEP_TO_POWER.items()}
+CO_POWER_OPTIONS = list(CO_POWER_TO_STEP)
 
-CWU_MODE_OPTIONS = ["Włączony", "STOP", "PRIORYTET"]
-CWU_MODE_TO_WIRE = {"Włączony": "Still_On", "STOP": "Stop", "PRIORYTET": "Priority"}
-CWU_MODE_FROM_WIRE = {"Still_On": "Włączony", "Stop": "STOP", "Priority": "PRIORYTET"}
+CWU_MODE_FROM_WIRE: dict[str, str] = dict(FIELDS["DHWMode"].options)
+CWU_MODE_TO_WIRE: dict[str, str] = {v: k for k, v in CWU_MODE_FROM_WIRE.items()}
+CWU_MODE_OPTIONS = list(CWU_MODE_TO_WIRE)
 
 
 SELECTS: list[EltermSelectDescription] = [
@@ -69,7 +65,7 @@ class EltermSelect(CoordinatorEntity, SelectEntity):
     entity_description: EltermSelectDescription
 
     def __init__(self, coordinator, server, devid: str, dev_name: str, description: EltermSelectDescription) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset((description.field,)))
         self.entity_description = description
         self._server = server
 
@@ -86,22 +82,23 @@ class EltermSelect(CoordinatorEntity, SelectEntity):
 
     @property
     def available(self) -> bool:
-        return self.coordinator.data is not None
+        return self.coordinator.available
 
     @property
     def current_option(self) -> str | None:
-        data = self.coordinator.data or {}
-        raw = _get_str(data, self.entity_description.field)
+        data: EltermSnapshot | None = self.coordinator.data
+        if data is None:
+            return None
+        raw = data.get(self.entity_description.field)
         if raw is None:
             return None
-        return self.entity_description.map_from_wire.get(raw)
+        return self.entity_description.map_from_wire.get(str(raw))
 
     async def async_select_option(self, option: str) -> None:
         if option not in self.entity_description.options:
             return
 
-        data = self.coordinator.data or {}
         wire_value = self.entity_description.map_to_wire[option]
         fields = {self.entity_description.field: wire_value}
 
-        await self._server.send_data_to_send(fields, base_state=dict(data))
+        await self._server.send_data_to_send(fields)
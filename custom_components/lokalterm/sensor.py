@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timedelta
 from typing import Any, Callable
 
 from homeassistant.components.sensor import (
@@ -10,44 +11,34 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature, PERCENTAGE, UnitOfEnergy
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    EntityCategory,
+    PERCENTAGE,
+    UnitOfDataRate,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .fields import FIELDS, field_spec, is_parameter
+from .power import PowerEstimator
+from .snapshot import EltermSnapshot
+from .stats import ServerStats
 
-
-def _to_temp100(v: Any) -> float | None:
-    if v is None:
-        return None
-    try:
-        return int(v) / 100.0
-    except Exception:
-        return None
-
-
-def _status_power_percent(data: dict[str, Any]) -> int | None:
-    ds = data.get("DevStatus")
-    if isinstance(ds, str) and len(ds) >= 6 and ds[3:6].isdigit():
-        return int(ds[3:6])
-
-    mode = data.get("CH1Mode")
-    if isinstance(mode, str) and mode == "Stop":
-        return 0
-
-    step = data.get("BuModulMax")
-    try:
-        step_i = int(step)
-    except Exception:
-        return None
-
-    return {0: 33, 1: 67, 2: 100}.get(step_i)
+# Dotyczy tylko sensorów odpytywanych (diagnostyka, moc); pozostałe są push
+SCAN_INTERVAL = timedelta(seconds=30)
 
 
 @dataclass(frozen=True, kw_only=True)
 class EltermSensorDescription(SensorEntityDescription):
-    value_fn: Callable[[dict[str, Any]], Any]
+    value_fn: Callable[[EltermSnapshot], Any]
+    # Pola ramki SkzpData, od których zależy wartość (routing aktualizacji)
+    fields: tuple[str, ...]
 
 
 SENSORS: list[EltermSensorDescription] = [
@@ -56,21 +47,24 @@ SENSORS: list[EltermSensorDescription] = [
         name="Status pieca",
         icon="mdi:flash",
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=_status_power_percent,
+        value_fn=lambda s: s.power_percent,
+        fields=("DevStatus", "CH1Mode", "BuModulMax"),
     ),
     EltermSensorDescription(
         key="temp_wody_co",
         name="Temperatura wody CO",
         icon="mdi:radiator",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda d: _to_temp100(d.get("BoilerTempAct")),
+        value_fn=lambda s: s.boiler_temp_act,
+        fields=("BoilerTempAct",),
     ),
     EltermSensorDescription(
         key="temp_wody_cwu",
         name="Temperatura wody CWU",
         icon="mdi:water-boiler",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda d: _to_temp100(d.get("DHWTempAct")),
+        value_fn=lambda s: s.dhw_temp_act,
+        fields=("DHWTempAct",),
     ),
     EltermSensorDescription(
         key="energia_licznik_kwh",
@@ -79,7 +73,154 @@ SENSORS: list[EltermSensorDescription] = [
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
-        value_fn=lambda d: (lambda v: None if v is None else round(float(v), 2))(d.get("P033")),
+        value_fn=lambda s: s.energy_kwh,
+        fields=("P033",),
+    ),
+]
+
+
+def _parameter_description(wire: str) -> EltermSensorDescription:
+    """Opis sensora diagnostycznego dla parametru P0xx bez dedykowanej encji."""
+    spec = field_spec(wire)
+    decode = spec.decode
+    return EltermSensorDescription(
+        key=f"parametr_{wire.lower()}",
+        name=f"Parametr {wire}",
+        icon="mdi:tune-variant",
+        native_unit_of_measurement=spec.unit,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda s: decode(s.get(wire)),
+        fields=(wire,),
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class EltermStatSensorDescription(SensorEntityDescription):
+    value_fn: Callable[[ServerStats, dict[str, int]], Any]
+
+
+def _latency_description(key: str, name: str, ring: str, pct: int) -> EltermStatSensorDescription:
+    return EltermStatSensorDescription(
+        key=key,
+        name=name,
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda st, _e: getattr(st, ring).percentile(pct),
+    )
+
+
+# Statystyki odpytywane co SCAN_INTERVAL – domyślnie wyłączone (każdy odczyt to
+# wiersz w recorderze); pełny obraz daje pobranie diagnostyki
+STAT_SENSORS: list[EltermStatSensorDescription] = [
+    _latency_description("komenda_potwierdzenie_p50", "Komenda – potwierdzenie p50", "write_to_ack", 50),
+    _latency_description("komenda_potwierdzenie_p95", "Komenda – potwierdzenie p95", "write_to_ack", 95),
+    _latency_description("komenda_potwierdzenie_p99", "Komenda – potwierdzenie p99", "write_to_ack", 99),
+    _latency_description("komenda_wysylka_p50", "Komenda – wysyłka p50", "click_to_write", 50),
+    _latency_description("komenda_wysylka_p95", "Komenda – wysyłka p95", "click_to_write", 95),
+    EltermStatSensorDescription(
+        key="komenda_retransmisje",
+        name="Komenda – retransmisje",
+        icon="mdi:repeat",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda st, _e: st.retransmissions_total,
+    ),
+    EltermStatSensorDescription(
+        key="komenda_bez_potwierdzenia",
+        name="Komenda – bez potwierdzenia",
+        icon="mdi:timer-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda st, _e: st.timeouts_total,
+    ),
+    EltermStatSensorDescription(
+        key="komenda_nadpisana",
+        name="Komenda – nadpisana przed potwierdzeniem",
+        icon="mdi:swap-horizontal",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda st, _e: st.superseded_commands_total,
+    ),
+    EltermStatSensorDescription(
+        key="ramki_na_sekunde",
+        name="Ramki na sekundę",
+        icon="mdi:swap-vertical",
+        native_unit_of_measurement="ramek/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda st, _e: round(st.frames_in.rate(), 3),
+    ),
+    EltermStatSensorDescription(
+        key="transfer_przychodzacy",
+        name="Transfer przychodzący",
+        icon="mdi:download-network",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda st, _e: round(st.bytes_in.rate(), 1),
+    ),
+    EltermStatSensorDescription(
+        key="bledy_parsowania",
+        name="Błędy parsowania ramek",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda _st, errors: sum(errors.values()),
+    ),
+]
+
+
+@dataclass(frozen=True, kw_only=True)
+class EltermPowerSensorDescription(SensorEntityDescription):
+    value_fn: Callable[[PowerEstimator], Any]
+
+
+POWER_SENSORS: list[EltermPowerSensorDescription] = [
+    EltermPowerSensorDescription(
+        key="moc_grzania",
+        name="Moc grzania",
+        icon="mdi:lightning-bolt",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda p: p.power_w,
+    ),
+    EltermPowerSensorDescription(
+        key="energia_dzis_kwh",
+        name="Energia - dziś (kWh)",
+        icon="mdi:calendar-today",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        value_fn=lambda p: round(p.energy_day, 3),
+    ),
+    EltermPowerSensorDescription(
+        key="energia_godzina_kwh",
+        name="Energia - bieżąca godzina (kWh)",
+        icon="mdi:clock-outline",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False,
+        value_fn=lambda p: round(p.energy_hour, 3),
     ),
 ]
 
@@ -92,14 +233,42 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     devid = hass.data[DOMAIN][entry.entry_id]["devid"]
     dev_name = entry.title
-    async_add_entities([EltermSensor(coordinator, devid, dev_name, desc) for desc in SENSORS])
+    server = hass.data[DOMAIN][entry.entry_id]["server"]
+    entities: list[SensorEntity] = [EltermSensor(coordinator, devid, dev_name, desc) for desc in SENSORS]
+    entities += [EltermStatSensor(server, devid, dev_name, desc) for desc in STAT_SENSORS]
+    power = hass.data[DOMAIN][entry.entry_id]["power"]
+    entities += [EltermPowerSensor(coordinator, power, devid, dev_name, desc) for desc in POWER_SENSORS]
+    async_add_entities(entities)
+
+    # Parametry P0xx pojawiają się dopiero w ramkach – encje dokładamy przy pierwszym wystąpieniu
+    covered = {field for desc in SENSORS for field in desc.fields}
+    known: set[str] = set()
+
+    @callback
+    def _async_add_parameters() -> None:
+        data: EltermSnapshot | None = coordinator.data
+        if data is None or data.raw.keys() <= known:
+            return
+        new = [
+            wire
+            for wire in data.raw
+            if wire not in known and wire not in covered and wire not in FIELDS and is_parameter(wire)
+        ]
+        known.update(data.raw)
+        if new:
+            async_add_entities(
+                [EltermSensor(coordinator, devid, dev_name, _parameter_description(wire)) for wire in sorted(new)]
+            )
+
+    _async_add_parameters()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_parameters))
 
 
 class EltermSensor(CoordinatorEntity, SensorEntity):
     entity_description: EltermSensorDescription
 
     def __init__(self, coordinator, devid: str, dev_name: str, description: EltermSensorDescription) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset(description.fields))
         self.entity_description = description
 
         # Stabilny object_id -> entity_id z prefiksem lokalterm_
@@ -115,9 +284,93 @@ class EltermSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self.coordinator.data is not None
+        return self.coordinator.available
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
+        data: EltermSnapshot | None = self.coordinator.data
+        if data is None:
+            return None
         return self.entity_description.value_fn(data)
+
+
+class EltermStatSensor(SensorEntity):
+    """Sensor diagnostyczny z liczników serwera – odpytywany co SCAN_INTERVAL."""
+
+    entity_description: EltermStatSensorDescription
+    _attr_should_poll = True
+
+    def __init__(self, server, devid: str, dev_name: str, description: EltermStatSensorDescription) -> None:
+        self.entity_description = description
+        self._server = server
+
+        # Stabilny object_id -> entity_id z prefiksem lokalterm_
+        self._attr_suggested_object_id = f"lokalterm_{description.key}"
+
+        self._attr_unique_id = f"{devid}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, devid)},
+            "name": dev_name,
+            "manufacturer": "Elterm",
+            "model": "SKZP (serwer lokalny)",
+        }
+
+    @property
+    def native_value(self) -> Any:
+        return self.entity_description.value_fn(self._server.stats, self._server.parse_errors)
+
+
+class EltermPowerSensor(SensorEntity):
+    """Moc i energia z estymatora P033 – odpytywane co SCAN_INTERVAL, by nie zapisywać każdej ramki.
+
+    Dostępność jak encji koordynatora (połączenie z piecem), a do tego
+    dopiero po pierwszej ramce z licznikiem – bez niej 0 W / 0 kWh nie jest
+    prawdziwym odczytem. Zmiana dostępności zapisywana jest od razu, bez
+    czekania na odpytanie.
+    """
+
+    entity_description: EltermPowerSensorDescription
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        coordinator,
+        power: PowerEstimator,
+        devid: str,
+        dev_name: str,
+        description: EltermPowerSensorDescription,
+    ) -> None:
+        self.entity_description = description
+        self._coordinator = coordinator
+        self._power = power
+        self._was_available: bool | None = None
+
+        # Stabilny object_id -> entity_id z prefiksem lokalterm_
+        self._attr_suggested_object_id = f"lokalterm_{description.key}"
+
+        self._attr_unique_id = f"{devid}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, devid)},
+            "name": dev_name,
+            "manufacturer": "Elterm",
+            "model": "SKZP (serwer lokalny)",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._was_available = self.available
+        self.async_on_remove(self._coordinator.async_add_listener(self._async_coordinator_updated))
+
+    @callback
+    def _async_coordinator_updated(self) -> None:
+        if self.available != self._was_available:
+            self._was_available = self.available
+            self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        return self._coordinator.available and self._power.has_data
+
+    @property
+    def native_value(self) -> Any:
+        return self.entity_description.value_fn(self._power)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import WEEKDAYS
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .commands import ACK_CONFIRMED
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    DOMAIN,
+    EVENT_SETTINGS_APPLIED,
+    SERVICE_APPLY_SETTINGS,
+    SERVICE_SET_SCHEDULE,
+)
+from .fields import FIELDS, KIND_NUMBER
+from .schedule import SCHEDULE_FIELDS, ScheduleEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pola usługi apply_settings (snake_case, jak w services.yaml) -> pole ramki
+APPLY_FIELD_KEYS: dict[str, str] = {
+    "boiler_temp_cmd": "BoilerTempCmd",
+    "boiler_hist": "BoilerHist",
+    "dhw_temp_cmd": "DHWTempCmd",
+    "dhw_hist": "DHWHist",
+    "ch1_mode": "CH1Mode",
+    "dhw_mode": "DHWMode",
+    "bu_modul_max": "BuModulMax",
+}
+
+APPLY_SETTINGS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+            **{
+                vol.Optional(key): vol.Coerce(float) if FIELDS[wire].kind == KIND_NUMBER else cv.string
+                for key, wire in APPLY_FIELD_KEYS.items()
+            },
+        }
+    ),
+    cv.has_at_least_one_key(*APPLY_FIELD_KEYS),
+)
+
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required("field"): vol.In(SCHEDULE_FIELDS),
+        vol.Required("program"): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required("days"): vol.All(cv.ensure_list, [vol.In(WEEKDAYS)]),
+                        vol.Required("time"): cv.time,
+                        vol.Required("value"): vol.Any(vol.Coerce(float), cv.string),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+
+def _resolve_entry(hass: HomeAssistant, entry_id: str | None) -> tuple[str, dict[str, Any]]:
+    domain_data: dict[str, Any] = hass.data.get(DOMAIN, {})
+    # Obok wpisów w hass.data[DOMAIN] leżą też wspólne listenery
+    loaded = [e.entry_id for e in hass.config_entries.async_entries(DOMAIN) if e.entry_id in domain_data]
+    if entry_id is None:
+        if len(loaded) != 1:
+            raise ServiceValidationError(
+                f"LokalTerm: załadowanych pieców: {len(loaded)} – podaj {ATTR_CONFIG_ENTRY_ID}"
+            )
+        entry_id = loaded[0]
+    if entry_id not in loaded:
+        raise ServiceValidationError(f"LokalTerm: brak załadowanego wpisu {entry_id}")
+    return entry_id, domain_data[entry_id]
+
+
+def _encode_fields(data: dict[str, Any]) -> dict[str, str]:
+    """Wartości z usługi -> wartości na kablu; całość jest sprawdzana przed wysyłką."""
+    fields: dict[str, str] = {}
+    for key, wire in APPLY_FIELD_KEYS.items():
+        if key not in data:
+            continue
+        try:
+            # Pola z listą wartości przyjmują też etykiety z UI (np. "PRIORYTET", "67")
+            fields[wire] = FIELDS[wire].from_user(data[key])
+        except ValueError as err:
+            raise ServiceValidationError(f"LokalTerm: {err}") from err
+    return fields
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Usługi: ``apply_settings`` (wiele nastaw w jednej ramce) i ``set_schedule`` (program tygodniowy)."""
+
+    async def _async_apply_settings(call: ServiceCall) -> ServiceResponse:
+        entry_id, data = _resolve_entry(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        fields = _encode_fields(call.data)
+        future = data["server"].async_apply_settings(fields)
+
+        async def _async_wait_for_acks() -> dict[str, Any]:
+            results = await future
+            success = all(status == ACK_CONFIRMED for status in results.values())
+            if not success:
+                _LOGGER.warning("LokalTerm: nie wszystkie nastawy zostały potwierdzone: %s", results)
+            hass.bus.async_fire(
+                EVENT_SETTINGS_APPLIED,
+                {"entry_id": entry_id, "fields": fields, "results": results, "success": success},
+            )
+            return {"fields": fields, "results": results, "success": success}
+
+        if not call.return_response:
+            # Bez oczekiwania na piec – wynik przyjdzie zdarzeniem
+            hass.async_create_background_task(_async_wait_for_acks(), f"{DOMAIN}_{SERVICE_APPLY_SETTINGS}")
+            return None
+        return await _async_wait_for_acks()
+
+    async def _async_set_schedule(call: ServiceCall) -> None:
+        _entry_id, data = _resolve_entry(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        field = call.data["field"]
+        spec = FIELDS[field]
+        entries: list[ScheduleEntry] = []
+        for item in call.data["program"]:
+            try:
+                value = spec.from_user(item["value"])
+            except ValueError as err:
+                raise ServiceValidationError(f"LokalTerm: {err}") from err
+            minute = item["time"].hour * 60 + item["time"].minute
+            entries.extend(ScheduleEntry(WEEKDAYS.index(day), minute, value) for day in item["days"])
+        await data["schedule"].async_set_programme(field, entries)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_SETTINGS,
+        _async_apply_settings,
+        schema=APPLY_SETTINGS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_SET_SCHEDULE, _async_set_schedule, schema=SET_SCHEDULE_SCHEMA)
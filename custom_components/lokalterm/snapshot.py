@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import ChainMap
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+from .const import BU_MODUL_TO_PERCENT
+from .fields import FIELDS
+
+
+def _power_percent(raw: Mapping[str, Any], ch1_mode: str | None, step: int | None) -> int | None:
+    """Aktualna moc grzania w % – z DevStatus, a gdy go brak, z trybu CO i stopnia mocy."""
+    ds = raw.get("DevStatus")
+    if isinstance(ds, str) and len(ds) >= 6 and ds[3:6].isdigit():
+        return int(ds[3:6])
+    if ch1_mode == "Stop":
+        return 0
+    if step is None:
+        return None
+    return BU_MODUL_TO_PERCENT.get(step)
+
+
+@dataclass(frozen=True, slots=True)
+class EltermSnapshot:
+    """Zdekodowana, niemutowalna ramka SkzpData współdzielona przez wszystkie platformy."""
+
+    raw: Mapping[str, Any]
+    boiler_temp_act: float | None
+    boiler_temp_cmd: float | None
+    boiler_hist: float | None
+    dhw_temp_act: float | None
+    dhw_temp_cmd: float | None
+    dhw_hist: float | None
+    ch1_mode: str | None
+    dhw_mode: str | None
+    power_step: int | None
+    power_percent: int | None
+    energy_kwh: float | None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Surowa wartość pola ramki (np. do mapowania opcji selecta)."""
+        return self.raw.get(key, default)
+
+
+# Atrybut EltermSnapshot -> pole ramki i jego dekoder (tabela budowana raz)
+_DECODE_TABLE: tuple[tuple[str, str, Callable[[Any], Any]], ...] = tuple(
+    (attr, wire, FIELDS[wire].decode)
+    for attr, wire in (
+        ("boiler_temp_act", "BoilerTempAct"),
+        ("boiler_temp_cmd", "BoilerTempCmd"),
+        ("boiler_hist", "BoilerHist"),
+        ("dhw_temp_act", "DHWTempAct"),
+        ("dhw_temp_cmd", "DHWTempCmd"),
+        ("dhw_hist", "DHWHist"),
+        ("ch1_mode", "CH1Mode"),
+        ("dhw_mode", "DHWMode"),
+        ("power_step", "BuModulMax"),
+        ("energy_kwh", "P033"),
+    )
+)
+
+
+# Pola ramki, od których zależy power_percent
+_POWER_WIRES = frozenset({"DevStatus", "CH1Mode", "BuModulMax"})
+
+
+def decode_frame(obj: Mapping[str, Any]) -> EltermSnapshot:
+    """Jednorazowe dekodowanie ramki SkzpData do EltermSnapshot.
+
+    Ramka nie jest kopiowana – snapshot trzyma ją za widokiem tylko do
+    odczytu, więc wywołujący nie może jej potem modyfikować.
+    """
+    raw = obj if isinstance(obj, MappingProxyType) else MappingProxyType(obj)
+    values = {attr: decode(raw.get(wire)) for attr, wire, decode in _DECODE_TABLE}
+    return EltermSnapshot(
+        raw=raw,
+        power_percent=_power_percent(raw, values["ch1_mode"], values["power_step"]),
+        **values,
+    )
+
+
+def overlay_snapshot(base: EltermSnapshot, overlay: Mapping[str, Any]) -> EltermSnapshot:
+    """Snapshot z nałożonymi wartościami z UI – dekoduje tylko nadpisane pola.
+
+    Ramka bazowa nie jest kopiowana: ``raw`` to widok ``ChainMap`` z kopią
+    (kilku) nadpisanych pól na wierzchu.
+    """
+    top = dict(overlay)
+    raw = MappingProxyType(ChainMap(top, base.raw))
+    values = {attr: decode(top[wire]) for attr, wire, decode in _DECODE_TABLE if wire in top}
+    if not _POWER_WIRES.isdisjoint(top):
+        values["power_percent"] = _power_percent(
+            raw, values.get("ch1_mode", base.ch1_mode), values.get("power_step", base.power_step)
+        )
+    return replace(base, raw=raw, **values)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from .const import (
+    STATS_CONNECTION_HISTORY,
+    STATS_RATE_WINDOW_SECONDS,
+    STATS_RECENT_FRAMES,
+    STATS_RING_SIZE,
+)
+
+if TYPE_CHECKING:
+    from .protocol import EltermProtocol
+
+
+def _nearest_rank(ordered: list[float], p: float) -> float:
+    return ordered[max(1, math.ceil(p / 100.0 * len(ordered))) - 1]
+
+
+class LatencyRing:
+    """Bufor cykliczny ostatnich pomiarów z podsumowaniem percentyli."""
+
+    def __init__(self, size: int = STATS_RING_SIZE) -> None:
+        self._values = array("d", bytes(8 * size))
+        self._size = size
+        self._pos = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, value: float) -> None:
+        self._values[self._pos] = value
+        self._pos = (self._pos + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def values(self) -> list[float]:
+        """Zapisane pomiary (bez gwarancji kolejności)."""
+        return list(self._values[: self._count])
+
+    def percentile(self, p: float) -> float | None:
+        """Percentyl metodą najbliższej rangi; None, gdy brak pomiarów."""
+        if not self._count:
+            return None
+        return _nearest_rank(sorted(self._values[: self._count]), p)
+
+    def summary(self) -> dict[str, Any]:
+        if not self._count:
+            return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+        ordered = sorted(self._values[: self._count])
+        return {
+            "count": self._count,
+            "p50": round(_nearest_rank(ordered, 50), 1),
+            "p95": round(_nearest_rank(ordered, 95), 1),
+            "p99": round(_nearest_rank(ordered, 99), 1),
+            "max": round(ordered[-1], 1),
+        }
+
+
+class RateMeter:
+    """Średnie tempo zdarzeń w oknie przesuwnym – O(1) na zdarzenie (kubełki sekundowe)."""
+
+    def __init__(self, window: int = STATS_RATE_WINDOW_SECONDS) -> None:
+        self._window = window
+        self._buckets = array("d", bytes(8 * window))
+        self._stamps = array("q", bytes(8 * window))
+        self.total = 0.0
+
+    def add(self, amount: float = 1.0, now: float | None = None) -> None:
+        sec = int(time.monotonic() if now is None else now)
+        i = sec % self._window
+        if self._stamps[i] != sec:
+            self._stamps[i] = sec
+            self._buckets[i] = 0.0
+        self._buckets[i] += amount
+        self.total += amount
+
+    def rate(self, now: float | None = None) -> float:
+        """Zdarzenia na sekundę w ostatnim oknie."""
+        sec = int(time.monotonic() if now is None else now)
+        oldest = sec - self._window
+        total = sum(b for b, s in zip(self._buckets, self._stamps) if s > oldest)
+        return total / self._window
+
+
+class ConnectionRecord:
+    """Jedno połączenie pieca: czas trwania, powód zamknięcia i liczniki ruchu.
+
+    Dopóki połączenie trwa, liczniki czytane są na bieżąco z protokołu;
+    po zamknięciu zostają zamrożone w rekordzie.
+    """
+
+    __slots__ = ("peer", "connected_at", "closed_at", "reason", "_client", "_counters")
+
+    def __init__(self, client: EltermProtocol, now: float | None = None) -> None:
+        self.peer = str(client.peer)
+        self.connected_at = time.time() if now is None else now
+        self.closed_at: float | None = None
+        self.reason: str | None = None
+        self._client: EltermProtocol | None = client
+        self._counters: dict[str, int] = {}
+
+    @property
+    def open(self) -> bool:
+        return self._client is not None
+
+    def close(self, reason: str, now: float | None = None) -> None:
+        if self._client is None:
+            return
+        self._counters = self._client.counters()
+        self._client = None
+        self.reason = reason
+        self.closed_at = time.time() if now is None else now
+
+    def as_dict(self) -> dict[str, Any]:
+        end = time.time() if self.closed_at is None else self.closed_at
+        return {
+            "peer": self.peer,
+            "connected_at": self.connected_at,
+            "closed_at": self.closed_at,
+            "duration_s": round(end - self.connected_at, 1),
+            "reason": self.reason,
+            **(self._client.counters() if self._client is not None else self._counters),
+        }
+
+
+class ServerStats:
+    """Liczniki protokołu i opóźnień komend dla jednego urządzenia."""
+
+    def __init__(self) -> None:
+        self.frames_in = RateMeter()
+        self.bytes_in = RateMeter()
+        self.frames_out = RateMeter()
+        self.bytes_out = RateMeter()
+        # kliknięcie w UI -> pierwszy zapis do gniazda
+        self.click_to_write = LatencyRing()
+        # pierwszy zapis -> potwierdzenie w SkzpData (lub rezygnacja po terminie)
+        self.write_to_ack = LatencyRing()
+        # liczba retransmisji na potwierdzone/wygasłe pole
+        self.retransmissions = LatencyRing()
+        self.retransmissions_total = 0
+        self.acked_total = 0
+        self.timeouts_total = 0
+        # Pola zmienione nowszą komendą, zanim piec potwierdził poprzednią wartość
+        self.superseded_commands_total = 0
+        # Połączenia: zamknięte przez watchdog bezczynności / zastąpione nowszym
+        self.idle_timeouts_total = 0
+        self.superseded_total = 0
+        # Ramki identyczne z poprzednią, pominięte bez dekodowania
+        self.duplicates_total = 0
+        # Zapis do pieca: wstrzymane przez pełny bufor / zerwane po przekroczeniu czasu opróżnienia
+        self.writes_deferred_total = 0
+        self.drain_timeouts_total = 0
+        # Obciążenie pętli zdarzeń: obsługa jednej ramki w połączeniu, z parsowaniem (µs)
+        self.frame_handling = LatencyRing()
+        # Ostatnie połączenia (najnowsze na końcu) i próbka ostatnich ramek
+        self.connections: deque[ConnectionRecord] = deque(maxlen=STATS_CONNECTION_HISTORY)
+        self.recent_frames: deque[tuple[float, str, dict[str, Any]]] = deque(maxlen=STATS_RECENT_FRAMES)
+
+    def record_connection(self, client: EltermProtocol) -> ConnectionRecord:
+        record = ConnectionRecord(client)
+        self.connections.append(record)
+        return record
+
+    def record_frame(self, direction: str, obj: dict[str, Any]) -> None:
+        """Próbka do diagnostyki – przechowujemy referencję, maskowanie przy odczycie."""
+        self.recent_frames.append((time.time(), direction, obj))
+
+    def record_ack(self, queued_at: float, sent_at: float | None, attempts: int, now: float) -> None:
+        self.acked_total += 1
+        self._record_latency(queued_at, sent_at, now)
+        self._record_retransmissions(attempts)
+
+    def record_timeout(self, queued_at: float, sent_at: float | None, attempts: int, now: float) -> None:
+        """Pole bez potwierdzenia – próbka opóźnienia w chwili rezygnacji.
+
+        Dzięki temu percentyle obejmują też komendy, których piec nie przyjął,
+        a nie tylko te udane.
+        """
+        self.timeouts_total += 1
+        self._record_latency(queued_at, sent_at, now)
+        self._record_retransmissions(attempts)
+
+    def _record_latency(self, queued_at: float, sent_at: float | None, now: float) -> None:
+        if sent_at is None:
+            # Nie wysłane (brak połączenia) – całe oczekiwanie to czas do zapisu
+            self.click_to_write.add((now - queued_at) * 1000.0)
+            return
+        self.click_to_write.add((sent_at - queued_at) * 1000.0)
+        self.write_to_ack.add((now - sent_at) * 1000.0)
+
+    def _record_retransmissions(self, attempts: int) -> None:
+        retrans = max(attempts - 1, 0)
+        self.retransmissions.add(retrans)
+        self.retransmissions_total += retrans
+
+    def as_dict(self, parse_errors: dict[str, int] | None = None) -> dict[str, Any]:
+        return {
+            "frames_in_total": int(self.frames_in.total),
+            "frames_in_per_s": round(self.frames_in.rate(), 3),
+            "bytes_in_total": int(self.bytes_in.total),
+            "bytes_in_per_s": round(self.bytes_in.rate(), 1),
+            "duplicate_frames_total": self.duplicates_total,
+            "frames_out_total": int(self.frames_out.total),
+            "bytes_out_total": int(self.bytes_out.total),
+            "parse_errors": dict(parse_errors or {}),
+            "commands_acked": self.acked_total,
+            "commands_timed_out": self.timeouts_total,
+            "commands_superseded": self.superseded_commands_total,
+            "retransmissions_total": self.retransmissions_total,
+            "idle_timeouts": self.idle_timeouts_total,
+            "superseded_connections": self.superseded_total,
+            "writes_deferred": self.writes_deferred_total,
+            "drain_timeouts": self.drain_timeouts_total,
+            "click_to_write_ms": self.click_to_write.summary(),
+            "write_to_ack_ms": self.write_to_ack.summary(),
+            "retransmissions_per_field": self.retransmissions.summary(),
+        }
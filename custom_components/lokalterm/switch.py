@@ -9,11 +9,13 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .snapshot import EltermSnapshot
 
 
 @dataclass(frozen=True, kw_only=True)
 class EltermSwitchDescription(SwitchEntityDescription):
-    pass
+    # Pola ramki SkzpData, od których zależy stan (routing aktualizacji)
+    fields: tuple[str, ...]
 
 
 SWITCHES: list[EltermSwitchDescription] = [
@@ -21,6 +23,7 @@ SWITCHES: list[EltermSwitchDescription] = [
         key="co_enable",
         name="CO Włączone",
         icon="mdi:radiator",
+        fields=("CH1Mode",),
     )
 ]
 
@@ -35,7 +38,7 @@ class EltermCoEnableSwitch(CoordinatorEntity, SwitchEntity):
     entity_description: EltermSwitchDescription
 
     def __init__(self, coordinator, server, entry: ConfigEntry, description: EltermSwitchDescription):
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset(description.fields))
         self.entity_description = description
         self._server = server
 
@@ -50,11 +53,16 @@ class EltermCoEnableSwitch(CoordinatorEntity, SwitchEntity):
             "model": "SKZP (serwer lokalny)",
         }
 
+    @property
+    def available(self) -> bool:
+        return self.coordinator.available
+
     @property
     def is_on(self) -> bool | None:
-        data = self.coordinator.data or {}
-        val = data.get("CH1Mode")
-        return str(val) != "Stop" if val is not None else None
+        data: EltermSnapshot | None = self.coordinator.data
+        if data is None or data.ch1_mode is None:
+            return None
+        return data.ch1_mode != "Stop"
 
     async def async_turn_on(self, **kwargs) -> None:
         await self._server.send_data_to_send({"CH1Mode": "Still_On"})
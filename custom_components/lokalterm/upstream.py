@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import socket
+from collections import deque
+from contextlib import suppress
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    DRAIN_TIMEOUT_SECONDS,
+    MAX_FRAME_BYTES,
+    UPSTREAM_CONNECT_TIMEOUT_SECONDS,
+    UPSTREAM_QUEUE_SIZE,
+    UPSTREAM_RECONNECT_MAX_SECONDS,
+    UPSTREAM_RECONNECT_MIN_SECONDS,
+    WRITE_BUFFER_HIGH_BYTES,
+)
+from .fields import WRITABLE_FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Odstęp między próbami połączenia (alias modułu – testy podmieniają tylko backoff)
+_sleep = asyncio.sleep
+
+
+class UpstreamRelay:
+    """Przekazywanie ramek pieca do drugiego serwera (np. chmury producenta).
+
+    Ramki ``SkzpData`` trafiają do ograniczonej kolejki (``forward`` nie
+    blokuje – przy pełnej kolejce odrzucana jest najstarsza ramka), a jedno
+    trwałe połączenie utrzymywane przez zadanie w tle wysyła je dalej
+    i odbiera ``DataToSend``. Komendy z serwera nadrzędnego przekazywane są do
+    ``on_command``; niedostępny lub powolny serwer nadrzędny nie opóźnia
+    sterowania lokalnego.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        devid: str,
+        on_command: Callable[[dict[str, str]], None],
+    ) -> None:
+        self.hass = hass
+        self.host = host
+        self.port = port
+        self._devid = devid
+        self._on_command = on_command
+        self._queue: deque[dict[str, Any]] = deque(maxlen=UPSTREAM_QUEUE_SIZE)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.connected = False
+        self.connects = 0
+        self.forwarded = 0
+        self.dropped = 0
+        self.commands = 0
+        self.last_error: str | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN}_upstream_{self.host}:{self.port}"
+            )
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._queue.clear()
+
+    def forward(self, obj: dict[str, Any]) -> None:
+        """Nieblokujące przekazanie ramki (referencja – kodowanie dopiero przy wysyłce)."""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(obj)
+        self._wake.set()
+
+    async def _async_run(self) -> None:
+        delay = UPSTREAM_RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                async with asyncio.timeout(UPSTREAM_CONNECT_TIMEOUT_SECONDS):
+                    reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME_BYTES)
+            except (OSError, TimeoutError) as err:
+                self.last_error = f"connect: {err!r}"
+                _LOGGER.debug("LokalTerm: serwer nadrzędny %s:%s niedostępny: %r", self.host, self.port, err)
+                await _sleep(delay)
+                delay = min(delay * 2, UPSTREAM_RECONNECT_MAX_SECONDS)
+                continue
+
+            _LOGGER.info("LokalTerm: połączono z serwerem nadrzędnym %s:%s", self.host, self.port)
+            self._configure(writer)
+            self.connected = True
+            self.connects += 1
+            self.last_error = None
+            delay = UPSTREAM_RECONNECT_MIN_SECONDS
+            # Ramki zebrane bez połączenia są już nieaktualne
+            self._queue.clear()
+            receiver = asyncio.create_task(self._async_receive(reader))
+            sender = asyncio.create_task(self._async_send(writer))
+            try:
+                done, _pending = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if (err := task.exception()) is not None:
+                        self.last_error = repr(err)
+            finally:
+                self.connected = False
+                for task in (receiver, sender):
+                    task.cancel()
+                    with suppress(asyncio.CancelledError, Exception):
+                        await task
+                writer.transport.abort()
+            _LOGGER.info("LokalTerm: rozłączono z serwerem nadrzędnym (%s)", self.last_error or "closed")
+            await _sleep(delay)
+
+    @staticmethod
+    def _configure(writer: asyncio.StreamWriter) -> None:
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            with suppress(OSError):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH_BYTES)
+
+    async def _async_send(self, writer: asyncio.StreamWriter) -> None:
+        queue = self._queue
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while queue:
+                obj = queue.popleft()
+                writer.write(json.dumps(obj, separators=(",", ":")).encode() + b"\r\n")
+                self.forwarded += 1
+                # Powolny serwer: czekamy najwyżej tyle, co przy piecu; w tym czasie
+                # nowe ramki wypierają najstarsze z kolejki
+                async with asyncio.timeout(DRAIN_TIMEOUT_SECONDS):
+                    await writer.drain()
+
+    async def _async_receive(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError:
+                self.last_error = "closed"
+                return
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                _LOGGER.debug("LokalTerm: nieczytelne dane od serwera nadrzędnego: %r", line[:80])
+                continue
+            if not isinstance(obj, dict) or obj.get("FrameType") != "DataToSend":
+                continue
+            if str(obj.get("vId")) != self._devid:
+                continue
+            # Tylko pola sterujące znane integracji – resztę ramki pomijamy
+            fields = {k: str(v) for k, v in obj.items() if k in WRITABLE_FIELDS}
+            if fields:
+                self.commands += 1
+                self._on_command(fields)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "connected": self.connected,
+            "connects": self.connects,
+            "frames_forwarded": self.forwarded,
+            "frames_dropped": self.dropped,
+            "queued": len(self._queue),
+            "commands_received": self.commands,
+            "last_error": self.last_error,
+        }
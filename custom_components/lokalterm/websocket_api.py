@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Iterable, Mapping
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import ATTR_CONFIG_ENTRY_ID, WS_SUBSCRIBER_BUFFER
+from .coordinator import EltermCoordinator
+from .fields import field_spec
+from .services import _resolve_entry
+
+# Pola ramki pomijane w strumieniu: sekrety i nagłówek
+_HIDDEN_KEYS = frozenset({"vId", "vPin", "FrameType"})
+
+
+def _decode(raw: Mapping[str, Any], keys: Iterable[str]) -> dict[str, Any]:
+    """Zdekodowane wartości wskazanych pól (brak pola w ramce -> None), bez sekretów."""
+    out: dict[str, Any] = {}
+    for key in keys:
+        if key in _HIDDEN_KEYS:
+            continue
+        value = raw.get(key)
+        spec = field_spec(key)
+        out[key] = spec.decode(value) if spec is not None and value is not None else value
+    return out
+
+
+def _state(coordinator: EltermCoordinator, fields: frozenset[str] | None) -> dict[str, Any]:
+    data = coordinator.data
+    values: dict[str, Any] = {}
+    if data is not None:
+        values = _decode(data.raw, data.raw.keys() if fields is None else fields)
+    return {"connected": coordinator.connected, "stale": coordinator.stale, "values": values}
+
+
+class _Subscription:
+    """Jeden subskrybent strumienia: filtr pól i ograniczony bufor zmian.
+
+    Każda publikacja koordynatora to jeden wpis w buforze; bufor jest
+    wysyłany jedną wiadomością w następnej iteracji pętli. Gdy wpisów jest
+    więcej niż ``WS_SUBSCRIBER_BUFFER``, najstarsze są odrzucane i liczone
+    w ``dropped`` wiadomości.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        coordinator: EltermCoordinator,
+        fields: frozenset[str] | None,
+    ) -> None:
+        self.hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._coordinator = coordinator
+        self._fields = fields
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=WS_SUBSCRIBER_BUFFER)
+        self._dropped = 0
+        self._flush_scheduled = False
+        self._last_data = coordinator.data
+        self._connected = coordinator.connected
+        # Filtr pól jako kontekst – koordynator woła tylko przy zmianie tych pól
+        self.unsub: CALLBACK_TYPE = coordinator.async_add_listener(self._async_on_update, fields)
+
+    @callback
+    def _async_on_update(self) -> None:
+        coordinator = self._coordinator
+        data = coordinator.data
+        entry: dict[str, Any] = {"time": time.time()}
+        if coordinator.connected != self._connected:
+            self._connected = entry["connected"] = coordinator.connected
+        if data is not None and data is not self._last_data:
+            self._last_data = data
+            changed = coordinator.changed_fields
+            if changed is None:
+                changed = data.raw.keys()
+            if self._fields is not None:
+                changed = self._fields.intersection(changed)
+            if values := _decode(data.raw, changed):
+                entry["values"] = values
+        if len(entry) == 1:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped += 1
+        self._buffer.append(entry)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._buffer:
+            return
+        updates = list(self._buffer)
+        self._buffer.clear()
+        dropped, self._dropped = self._dropped, 0
+        self._connection.send_message(
+            websocket_api.event_message(self._msg_id, {"updates": updates, "dropped": dropped})
+        )
+
+    @callback
+    def async_unsubscribe(self) -> None:
+        self.unsub()
+        self._buffer.clear()
+
+
+def _coordinator(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> EltermCoordinator | None:
+    try:
+        _entry_id, data = _resolve_entry(hass, msg.get(ATTR_CONFIG_ENTRY_ID))
+    except ServiceValidationError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(err))
+        return None
+    return data["coordinator"]
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "lokalterm/snapshot",
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional("fields"): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+@callback
+def ws_snapshot(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Jednorazowy odczyt zdekodowanego stanu pieca."""
+    if (coordinator := _coordinator(hass, connection, msg)) is None:
+        return
+    fields = frozenset(msg["fields"]) if "fields" in msg else None
+    connection.send_result(msg["id"], _state(coordinator, fields))
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "lokalterm/subscribe",
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional("fields"): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+@callback
+def ws_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Strumień zmian: najpierw pełny stan, potem zmienione pola z każdej publikacji."""
+    if (coordinator := _coordinator(hass, connection, msg)) is None:
+        return
+    fields = frozenset(msg["fields"]) if "fields" in msg else None
+    subscription = _Subscription(hass, connection, msg["id"], coordinator, fields)
+    connection.subscriptions[msg["id"]] = subscription.async_unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"state": _state(coordinator, fields)}))
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Komendy ``lokalterm/snapshot`` i ``lokalterm/subscribe`` – dane na żywo bez encji i recordera."""
+    websocket_api.async_register_command(hass, ws_snapshot)
+    websocket_api.async_register_command(hass, ws_subscribe)
@@ -0,0 +1,29 @@
+"""Wspólne fixture'y testów LokalTerm (pytest-homeassistant-custom-component)."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+# Ramka SkzpData z pieca (vId/vPin zmienione)
+FRAME = {
+    "FrameType": "SkzpData",
+    "vId": "DEV1",
+    "BoilerTempAct": "4512",
+    "BoilerTempCmd": "5000",
+    "BoilerHist": "200",
+    "DHWTempAct": "4100",
+    "DHWTempCmd": "5500",
+    "DHWHist": "300",
+    "CH1Mode": "Still_On",
+    "DHWMode": "Priority",
+    "BuModulMax": "2",
+    "DevStatus": "0000670",
+    "P033": "123.456",
+}
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
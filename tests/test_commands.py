@@ -0,0 +1,147 @@
+"""Kolejka komend – scalanie pól, potwierdzenia per pole, debounce i retransmisje."""
+
+from __future__ import annotations
+
+import random
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.commands import (
+    ACK_CANCELLED,
+    ACK_CONFIRMED,
+    ACK_SUPERSEDED,
+    ACK_TIMEOUT,
+    AckTracker,
+    CommandQueue,
+    RetryPolicy,
+)
+from custom_components.lokalterm.const import COMMAND_DEBOUNCE_MAX_SECONDS, COMMAND_DEBOUNCE_SECONDS
+from custom_components.lokalterm.coordinator import EltermLocalCfg, EltermLocalServer
+
+
+def test_merge_overwrites_per_field() -> None:
+    queue = CommandQueue()
+    first = queue.merge({"BoilerTempCmd": 5000})
+    second = queue.merge({"BoilerTempCmd": "5500", "DHWMode": "Priority"})
+
+    assert len(queue) == 2
+    assert queue.values() == {"BoilerTempCmd": "5500", "DHWMode": "Priority"}
+    assert queue.pending["BoilerTempCmd"].token == second["BoilerTempCmd"] != first["BoilerTempCmd"]
+    # vToken ramki – najnowsza zmiana
+    assert queue.frame_token == second["DHWMode"]
+
+
+def test_ack_per_field() -> None:
+    queue = CommandQueue()
+    queue.merge({"BoilerTempCmd": "5500", "DHWTempCmd": "5000"})
+
+    acked = queue.ack({"BoilerTempCmd": "5500", "DHWTempCmd": "4500"})
+    assert list(acked) == ["BoilerTempCmd"]
+    assert queue.values() == {"DHWTempCmd": "5000"}
+    assert queue.frame_token is not None
+
+    assert queue.ack({"DHWTempCmd": 5000}).keys() == {"DHWTempCmd"}
+    assert not queue
+    assert queue.frame_token is None
+
+
+def test_mark_sent_counts_attempts() -> None:
+    queue = CommandQueue()
+    queue.merge({"BoilerTempCmd": "5500"})
+    queue.mark_sent(now=10.0)
+    queue.merge({"DHWTempCmd": "5000"})
+    queue.mark_sent(now=11.0)
+
+    assert queue.pending["BoilerTempCmd"].sent_at == 10.0
+    assert queue.pending["BoilerTempCmd"].attempts == 2
+    assert queue.pending["DHWTempCmd"].sent_at == 11.0
+    assert queue.min_attempts() == 1
+
+
+async def test_debounce_capped_by_deadline(hass: HomeAssistant) -> None:
+    server = EltermLocalServer(
+        hass,
+        EltermLocalCfg(listen_host="127.0.0.1", listen_port=0, devid="DEV1", devpin="1234"),
+        on_status=lambda obj: None,
+    )
+    # Kliknięcia co 0.2 s – każde przesuwa wysyłkę, ale nie dalej niż termin od pierwszego
+    for step in range(8):
+        now = 100.0 + step * 0.2
+        with patch.object(hass.loop, "time", return_value=now):
+            await server.send_data_to_send({"BoilerTempCmd": str(5000 + step)})
+        assert server._flush_deadline == 100.0 + COMMAND_DEBOUNCE_MAX_SECONDS
+        assert server._flush_handle is not None
+        assert server._flush_handle.when() == min(now + COMMAND_DEBOUNCE_SECONDS, server._flush_deadline)
+
+    server._flush()
+    assert server._flush_handle is None
+    assert server._flush_deadline is None
+    assert server._commands.values() == {"BoilerTempCmd": "5007"}
+    server.async_shutdown()
+
+
+def test_retry_delay_backoff_without_jitter() -> None:
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0, jitter=0.0)
+    assert [policy.delay(n) for n in range(7)] == [1.0, 1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+
+
+def test_retry_delay_jitter_bounds() -> None:
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0, jitter=0.2)
+    random.seed(1)
+    delays = [policy.delay(3) for _ in range(100)]
+    assert all(3.2 <= d <= 4.8 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_expire_by_deadline_and_attempts() -> None:
+    policy = RetryPolicy(max_attempts=3, deadline=20.0)
+    queue = CommandQueue()
+    queue.merge({"BoilerTempCmd": "5500"})
+    queued_at = queue.pending["BoilerTempCmd"].queued_at
+    for _ in range(2):
+        queue.mark_sent(now=queued_at)
+    queue.merge({"DHWTempCmd": "5000"})
+    queue.pending["DHWTempCmd"].queued_at = queued_at + 10.0
+
+    assert queue.expire(policy, now=queued_at + 19.9) == {}
+    # Termin liczony od zakolejkowania – młodsze pole zostaje
+    assert queue.expire(policy, now=queued_at + 20.0).keys() == {"BoilerTempCmd"}
+    assert queue.frame_token is not None
+
+    queue.mark_sent(now=queued_at + 21.0)
+    queue.mark_sent(now=queued_at + 22.0)
+    assert queue.expire(policy, now=queued_at + 23.0) == {}
+    queue.mark_sent(now=queued_at + 24.0)
+    # Limit prób wygasza pole przed terminem
+    assert queue.expire(policy, now=queued_at + 25.0).keys() == {"DHWTempCmd"}
+    assert not queue
+    assert queue.frame_token is None
+
+
+async def test_ack_tracker_resolves_group_per_field() -> None:
+    queue = CommandQueue()
+    tracker = AckTracker()
+    future = tracker.track(queue.merge({"BoilerTempCmd": "5500", "DHWTempCmd": "5000"}))
+
+    tracker.resolve(queue.ack({"BoilerTempCmd": "5500"}), ACK_CONFIRMED)
+    assert not future.done()
+    tracker.resolve(queue.expire(RetryPolicy(deadline=0.0)), ACK_TIMEOUT)
+    assert future.result() == {"BoilerTempCmd": ACK_CONFIRMED, "DHWTempCmd": ACK_TIMEOUT}
+    assert not tracker
+
+
+async def test_ack_tracker_superseded_and_cancelled() -> None:
+    queue = CommandQueue()
+    tracker = AckTracker()
+    older = tracker.track(queue.merge({"BoilerTempCmd": "5500"}))
+    # Nowsza komenda zmienia to samo pole przed potwierdzeniem
+    newer = tracker.track(queue.merge({"BoilerTempCmd": "6000", "DHWMode": "Priority"}))
+
+    tracker.resolve(queue.ack({"BoilerTempCmd": "6000"}), ACK_CONFIRMED)
+    assert older.result() == {"BoilerTempCmd": ACK_SUPERSEDED}
+    assert not newer.done()
+
+    tracker.cancel()
+    assert newer.result() == {"BoilerTempCmd": ACK_CONFIRMED, "DHWMode": ACK_CANCELLED}
+    assert not tracker
@@ -0,0 +1,29 @@
+"""Opcje wpisu – wyłączenie trybu proxy wyczyszczeniem hosta."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lokalterm.const import CONF_UPSTREAM_HOST, CONF_UPSTREAM_PORT, DOMAIN
+
+
+async def test_clearing_upstream_host_disables_proxy(hass: HomeAssistant) -> None:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="DEV1",
+        data={"devid": "DEV1", "devpin": "1234", "listen_host": "127.0.0.1", "listen_port": 4000},
+        options={CONF_UPSTREAM_HOST: "cloud.example", CONF_UPSTREAM_PORT: 4000},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    host = next(key for key in result["data_schema"].schema if key == CONF_UPSTREAM_HOST)
+    assert host.description == {"suggested_value": "cloud.example"}
+
+    # Frontend nie wysyła wyczyszczonego pola
+    result = await hass.config_entries.options.async_configure(result["flow_id"], {CONF_UPSTREAM_PORT: 4000})
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_UPSTREAM_HOST] == ""
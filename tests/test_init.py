@@ -0,0 +1,49 @@
+"""Ładowanie wpisu – zajęty port nie zostawia uzbrojonych timerów."""
+
+from __future__ import annotations
+
+import socket
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lokalterm.const import DOMAIN
+
+from .conftest import FRAME
+
+
+async def test_port_in_use_sets_up_retry_without_timers(
+    hass: HomeAssistant, hass_storage: dict[str, Any], socket_enabled: None
+) -> None:
+    busy = socket.socket()
+    busy.bind(("127.0.0.1", 0))
+    busy.listen()
+    port = busy.getsockname()[1]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="DEV1",
+        data={"devid": "DEV1", "devpin": "1234", "listen_host": "127.0.0.1", "listen_port": port},
+    )
+    entry.add_to_hass(hass)
+    # Zapisany stan (timer "stale") i program (timer przejścia) z poprzedniego uruchomienia
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.snapshot"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}.snapshot",
+        "data": {"saved_at": 0, "raw": FRAME},
+    }
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.schedule"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}.schedule",
+        "data": {"programmes": {"BoilerTempCmd": [{"day": "mon", "time": "06:00", "value": "6000"}]}},
+    }
+
+    try:
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        assert entry.state is ConfigEntryState.SETUP_RETRY
+        assert entry.entry_id not in hass.data[DOMAIN]
+        # Zatrzymuje ponowienie HA; timery wpisu sprawdza verify_cleanup
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        busy.close()
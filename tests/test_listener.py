@@ -0,0 +1,60 @@
+"""Wspólny listener – zamknięcie przy zatrzymaniu HA bez gromadzenia subskrypcji."""
+
+from __future__ import annotations
+
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.const import DATA_LISTENERS, DOMAIN
+from custom_components.lokalterm.listener import async_get_listener, async_release_listener
+
+
+def _session(port: int) -> SimpleNamespace:
+    """Minimalna sesja dla async_release_listener (tylko konfiguracja)."""
+    return SimpleNamespace(cfg=SimpleNamespace(listen_host="127.0.0.1", listen_port=port, devid="DEV1"))
+
+
+def _stop_listeners(hass: HomeAssistant) -> int:
+    return hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_STOP, 0)
+
+
+async def test_recreate_cycles_do_not_pile_up_stop_listeners(hass: HomeAssistant, socket_enabled: None) -> None:
+    baseline = _stop_listeners(hass)
+    for _ in range(3):
+        listener = await async_get_listener(hass, "127.0.0.1", 0)
+        assert listener.is_running
+        assert _stop_listeners(hass) == baseline + 1
+        await async_release_listener(hass, _session(0), grace=0)
+        assert not listener.is_running
+        assert _stop_listeners(hass) == baseline
+
+
+async def test_bind_error_leaves_no_stop_listener(hass: HomeAssistant, socket_enabled: None) -> None:
+    baseline = _stop_listeners(hass)
+    busy = socket.socket()
+    busy.bind(("127.0.0.1", 0))
+    busy.listen()
+    port = busy.getsockname()[1]
+    try:
+        with pytest.raises(OSError):
+            await async_get_listener(hass, "127.0.0.1", port)
+    finally:
+        busy.close()
+    assert _stop_listeners(hass) == baseline
+    assert ("127.0.0.1", port) not in hass.data[DOMAIN][DATA_LISTENERS]
+
+
+async def test_hass_stop_closes_listener(hass: HomeAssistant, socket_enabled: None) -> None:
+    listener = await async_get_listener(hass, "127.0.0.1", 0)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    assert not listener.is_running
+    assert ("127.0.0.1", 0) not in hass.data[DOMAIN][DATA_LISTENERS]
+    # Ponowne zatrzymanie nie wyrejestrowuje zużytej subskrypcji
+    await listener.async_stop()
@@ -0,0 +1,20 @@
+"""Statystyki długoterminowe – pamięć przy wyłączonym eksporcie."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.longterm import LongTermStats
+
+from .conftest import FRAME
+
+
+async def test_energy_hours_bounded_when_disabled(hass: HomeAssistant) -> None:
+    stats = LongTermStats(hass, "DEV1", "Piec")
+    start = 1_700_000_000 // 3600 * 3600
+    for i in range(72 * 12):
+        stats.async_add_frame(dict(FRAME, P033=str(100 + i * 0.1)), now=start + i * 300)
+
+    assert not stats.enabled
+    assert len(stats._energy_hours) <= 25
+    assert max(stats._energy_hours) == start + 71 * 3600
@@ -0,0 +1,44 @@
+"""OptimisticOverlay – nadpisania pól z UI, potwierdzenie i wygasanie."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.overlay import OptimisticOverlay
+
+
+async def test_set_reports_changed_fields(hass: HomeAssistant) -> None:
+    overlay = OptimisticOverlay(hass, lambda removed: None)
+    assert not overlay
+    assert overlay.set({"BoilerTempCmd": 5500, "DHWMode": "Priority"}, ttl=30) == {"BoilerTempCmd", "DHWMode"}
+    assert overlay.values == {"BoilerTempCmd": "5500", "DHWMode": "Priority"}
+    # Ta sama wartość tylko przedłuża termin
+    assert overlay.set({"BoilerTempCmd": "5500", "DHWMode": "Off"}, ttl=30) == {"DHWMode"}
+    overlay.async_shutdown()
+
+
+async def test_settle_removes_confirmed_fields(hass: HomeAssistant) -> None:
+    overlay = OptimisticOverlay(hass, lambda removed: None)
+    overlay.set({"BoilerTempCmd": "5500", "DHWTempCmd": "5000"}, ttl=30)
+    assert overlay.settle({"BoilerTempCmd": "5000", "DHWTempCmd": "5000"}) == {"DHWTempCmd"}
+    assert overlay.values == {"BoilerTempCmd": "5500"}
+    assert overlay.clear(["BoilerTempCmd", "DHWHist"]) == {"BoilerTempCmd"}
+    assert not overlay
+    assert overlay.settle({"BoilerTempCmd": "5500"}) == frozenset()
+
+
+async def test_fields_expire_on_their_own_deadline(hass: HomeAssistant) -> None:
+    expired: list[frozenset[str]] = []
+    overlay = OptimisticOverlay(hass, expired.append)
+    overlay.set({"BoilerTempCmd": "5500"}, ttl=0.05)
+    overlay.set({"DHWTempCmd": "5000"}, ttl=0.2)
+
+    await asyncio.sleep(0.1)
+    assert expired == [frozenset({"BoilerTempCmd"})]
+    assert overlay.values == {"DHWTempCmd": "5000"}
+
+    await asyncio.sleep(0.2)
+    assert expired == [frozenset({"BoilerTempCmd"}), frozenset({"DHWTempCmd"})]
+    assert not overlay
@@ -0,0 +1,125 @@
+"""FrameParser i EltermProtocol – podział strumienia na ramki, resynchronizacja, powtórzenia."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.coordinator import EltermLocalCfg, EltermLocalServer
+from custom_components.lokalterm.protocol import (
+    ERR_GARBAGE,
+    ERR_JSON,
+    ERR_OVERSIZE,
+    EltermProtocol,
+    FrameParser,
+)
+
+from .conftest import FRAME
+
+
+def _parser(max_frame: int = 64) -> tuple[FrameParser, list[str]]:
+    errors: list[str] = []
+    return FrameParser(on_error=errors.append, max_frame=max_frame), errors
+
+
+def test_frame_split_across_chunks() -> None:
+    parser, errors = _parser()
+    assert parser.feed(b'{"a":"1"}\r\n{"b"') == [{"a": "1"}]
+    assert parser.feed(b':"2"') == []
+    assert parser.feed(b"}\r\n") == [{"b": "2"}]
+    assert errors == []
+
+
+def test_frame_split_byte_by_byte() -> None:
+    parser, errors = _parser()
+    frames = []
+    for byte in b'{"a":"1"}\r\n{"b":"2"}\r\n':
+        frames += parser.feed(bytes([byte]))
+    assert frames == [{"a": "1"}, {"b": "2"}]
+    assert errors == []
+
+
+def test_two_frames_in_one_chunk() -> None:
+    parser, errors = _parser()
+    assert parser.feed(b'{"a":"1"}\r\n{"b":"2"}\r\n') == [{"a": "1"}, {"b": "2"}]
+    # Zgubiony terminator – granicą jest "}{"
+    assert parser.feed(b'{"c":"3"}{"d":"4"}\n') == [{"c": "3"}, {"d": "4"}]
+    assert errors == []
+
+
+def test_leading_garbage_is_skipped() -> None:
+    parser, errors = _parser()
+    assert parser.feed(b'\x00\xff{"a":"1"}\r\nzz\r\n{bad}\r\n{"b":"2"}\r\n') == [{"a": "1"}, {"b": "2"}]
+    assert errors == [ERR_GARBAGE, ERR_GARBAGE, ERR_JSON]
+    # Same białe znaki i bajty zerowe to nie błąd
+    errors.clear()
+    assert parser.feed(b'\r\n\x00 {"c":"3"}\r\n') == [{"c": "3"}]
+    assert errors == []
+
+
+def test_oversize_frame_dropped_then_recovers() -> None:
+    parser, errors = _parser()
+    for _ in range(10):
+        assert parser.feed(b'{"x":"' + b"x" * 50) == []
+        assert len(parser._buf) <= 64
+    assert ERR_OVERSIZE in errors
+    assert parser.feed(b'"}\r\n{"a":"1"}\r\n') == [{"a": "1"}]
+
+
+def test_oversize_frame_with_terminator_dropped() -> None:
+    parser, errors = _parser()
+    frames = parser.feed(b'{"x":"' + b"x" * 70 + b'"}\r\n{"a":"1"}\r\n')
+    assert frames == [{"a": "1"}]
+    assert errors == [ERR_OVERSIZE]
+
+
+def test_identical_bytes_return_same_object() -> None:
+    parser = FrameParser()
+    frames = parser.feed(b'{"a":1}\r\n{"a":1}\r\n{"a":2}\r\n{"a":2}\r\n')
+    assert frames[0] is frames[1]
+    assert frames[2] is frames[3]
+    assert frames[1] is not frames[2]
+    assert parser.duplicates == 2
+
+
+class _Listener:
+    """Zastępuje EltermListener – każda ramka trafia do jednej sesji."""
+
+    def __init__(self, hass: HomeAssistant, session: EltermLocalServer) -> None:
+        self.hass = hass
+        self._session = session
+
+    def async_route(self, protocol: EltermProtocol, obj: dict[str, Any]) -> EltermLocalServer:
+        return self._session
+
+    def async_record_parse_error(self, reason: str) -> None:
+        pass
+
+
+async def test_duplicate_suppressed_only_without_pending_command(hass: HomeAssistant) -> None:
+    statuses: list[dict[str, Any]] = []
+    server = EltermLocalServer(
+        hass,
+        EltermLocalCfg(listen_host="127.0.0.1", listen_port=0, devid="DEV1", devpin="1234"),
+        on_status=statuses.append,
+    )
+    protocol = EltermProtocol(_Listener(hass, server))  # type: ignore[arg-type]
+    data = json.dumps(FRAME).encode() + b"\r\n"
+
+    protocol.data_received(data)
+    protocol.data_received(data)
+    assert len(statuses) == 1
+    assert server.stats.duplicates_total == 1
+
+    # Komenda czeka na potwierdzenie – powtórzona ramka musi przejść dopasowanie
+    server.async_queue_replayed_command({"BoilerTempCmd": "5500"})
+    protocol.data_received(data)
+    assert len(statuses) == 2
+    assert server.stats.duplicates_total == 1
+
+    protocol.data_received(json.dumps(dict(FRAME, BoilerTempCmd="5500")).encode() + b"\r\n")
+    assert len(statuses) == 3
+    assert not server._commands
+    server.async_shutdown()
@@ -0,0 +1,86 @@
+"""FramePublisher – pola sterujące od razu, martwa strefa pomiarów, opróżnienie przy zamknięciu."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.publish import FramePublisher, PublishPolicy
+
+from .conftest import FRAME
+
+_POLICY = PublishPolicy(temp_deadband=0.1, energy_deadband=0.1, min_interval=2.0, max_stale=60.0)
+
+
+def _publisher(hass: HomeAssistant) -> tuple[FramePublisher, list[dict[str, Any]]]:
+    published: list[dict[str, Any]] = []
+    return FramePublisher(hass, published.append, _POLICY), published
+
+
+def _feed(hass: HomeAssistant, publisher: FramePublisher, now: float, **changes: str) -> None:
+    with patch.object(hass.loop, "time", return_value=now):
+        publisher.async_on_status(dict(FRAME, **changes))
+
+
+async def test_writable_fields_publish_immediately(hass: HomeAssistant) -> None:
+    publisher, published = _publisher(hass)
+    _feed(hass, publisher, 100.0)
+    # W odstępie krótszym niż min_interval
+    _feed(hass, publisher, 100.1, CH1Mode="Stop")
+    _feed(hass, publisher, 100.2, CH1Mode="Stop", BoilerTempCmd="5500")
+
+    assert [obj["CH1Mode"] for obj in published] == ["Still_On", "Stop", "Stop"]
+    assert published[-1]["BoilerTempCmd"] == "5500"
+    assert publisher._handle is None
+
+
+async def test_deadband_changes_held_until_max_stale(hass: HomeAssistant) -> None:
+    publisher, published = _publisher(hass)
+    _feed(hass, publisher, 100.0)
+    # 0,03 °C i 0,044 kWh – poniżej martwej strefy
+    _feed(hass, publisher, 101.0, BoilerTempAct="4515")
+    _feed(hass, publisher, 102.0, BoilerTempAct="4515", P033="123.5")
+
+    assert len(published) == 1
+    assert publisher.suppressed == 2
+    assert publisher._handle is not None
+    assert publisher._handle.when() == 100.0 + _POLICY.max_stale
+
+    with patch.object(hass.loop, "time", return_value=160.0):
+        publisher._publish_now()
+    # Publikowana jest najnowsza ramka – drobne zmiany nie giną
+    assert published[-1]["BoilerTempAct"] == "4515"
+    assert published[-1]["P033"] == "123.5"
+
+
+async def test_significant_change_waits_for_min_interval(hass: HomeAssistant) -> None:
+    publisher, published = _publisher(hass)
+    _feed(hass, publisher, 100.0)
+    _feed(hass, publisher, 100.5, BoilerTempAct="4600")
+
+    assert len(published) == 1
+    assert publisher._handle is not None
+    assert publisher._handle.when() == 100.0 + _POLICY.min_interval
+
+    # Po min_interval istotna zmiana wychodzi od razu
+    with patch.object(hass.loop, "time", return_value=102.0):
+        publisher._publish_now()
+    _feed(hass, publisher, 105.0, BoilerTempAct="4700")
+    assert [obj["BoilerTempAct"] for obj in published] == ["4512", "4600", "4700"]
+    assert publisher._handle is None
+
+
+async def test_shutdown_flushes_held_frame(hass: HomeAssistant) -> None:
+    publisher, published = _publisher(hass)
+    _feed(hass, publisher, 100.0)
+    publisher.async_shutdown()
+    assert len(published) == 1
+
+    _feed(hass, publisher, 101.0, BoilerTempAct="4515")
+    assert len(published) == 1
+    publisher.async_shutdown()
+    assert len(published) == 2
+    assert published[-1]["BoilerTempAct"] == "4515"
+    assert publisher._handle is None
@@ -0,0 +1,65 @@
+"""Odtwarzanie zapisu ramek (replay) – dekodowanie i dopasowanie potwierdzeń."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.coordinator import EltermCoordinator
+from custom_components.lokalterm.replay import async_replay_capture
+
+from .conftest import FRAME
+
+
+def _write_capture(path: Path, records: list[tuple[float, str, dict]]) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for t, direction, frame in records:
+            fh.write(json.dumps({"t": t, "dir": direction, "frame": frame}) + "\n")
+
+
+async def test_replay_capture(hass: HomeAssistant, tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl.gz"
+    command = {"FrameType": "DataToSend", "vId": "***", "vPin": "***", "BoilerTempCmd": "5500", "vToken": "ABC"}
+    _write_capture(
+        path,
+        [
+            (0.0, "in", FRAME),
+            (0.1, "out", command),
+            (0.2, "in", dict(FRAME, BoilerTempAct="4600")),
+            (0.3, "in", dict(FRAME, BoilerTempAct="4700", BoilerTempCmd="5500")),
+        ],
+    )
+    coordinator = EltermCoordinator(hass, name="replay")
+
+    result = await async_replay_capture(hass, path, coordinator.async_set_frame, speed=0)
+
+    assert result["records"] == 4
+    stats = result["stats"]
+    assert stats["frames_in_total"] == 3
+    assert stats["commands_acked"] == 1
+    assert stats["commands_timed_out"] == 0
+    assert stats["parse_errors"] == {}
+    snapshot = coordinator.data
+    assert snapshot.boiler_temp_act == 47.0
+    assert snapshot.boiler_temp_cmd == 55.0
+    assert snapshot.dhw_mode == "Priority"
+
+
+async def test_replay_unacked_command(hass: HomeAssistant, tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl.gz"
+    _write_capture(
+        path,
+        [
+            (0.0, "out", {"FrameType": "DataToSend", "DHWMode": "Stop", "vToken": "X"}),
+            (0.1, "in", FRAME),
+        ],
+    )
+    frames: list[dict] = []
+
+    result = await async_replay_capture(hass, path, frames.append, speed=0)
+
+    assert result["stats"]["commands_acked"] == 0
+    assert [f["DHWMode"] for f in frames] == ["Priority"]
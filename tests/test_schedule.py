@@ -0,0 +1,94 @@
+"""Harmonogram tygodniowy – ponowna wysyłka niepotwierdzonych przejść."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.lokalterm.commands import ACK_CANCELLED, ACK_CONFIRMED, ACK_TIMEOUT
+from custom_components.lokalterm.schedule import ScheduleEngine, ScheduleEntry
+
+
+class _Apply:
+    """Zastępuje EltermLocalServer.async_apply_settings – future rozstrzyga test."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.calls: list[tuple[dict[str, str], asyncio.Future[dict[str, str]]]] = []
+
+    def __call__(self, fields: dict[str, str]) -> asyncio.Future[dict[str, str]]:
+        future: asyncio.Future[dict[str, str]] = self.hass.loop.create_future()
+        self.calls.append((fields, future))
+        return future
+
+
+async def _engine(hass: HomeAssistant) -> tuple[ScheduleEngine, _Apply]:
+    apply = _Apply(hass)
+    engine = ScheduleEngine(hass, Store(hass, 1, "lokalterm.test.schedule"), apply)
+    await engine.async_load()
+    engine.async_set_connected(True)
+    now = dt_util.now()
+    await engine.async_set_programme("BoilerTempCmd", [ScheduleEntry(now.weekday(), 0, "6000")])
+    return engine, apply
+
+
+def test_next_after_same_day() -> None:
+    now = datetime(2026, 10, 21, 5, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)  # środa
+    when = ScheduleEntry(2, 6 * 60, "6000").next_after(now)
+    assert when == now + timedelta(hours=1)
+    assert ScheduleEntry(2, 4 * 60, "6000").next_after(now) == now + timedelta(days=7, hours=-1)
+
+
+async def test_reconnect_reasserts_active_values(hass: HomeAssistant) -> None:
+    engine, apply = await _engine(hass)
+    apply.calls[0][1].set_result({"BoilerTempCmd": ACK_CONFIRMED})
+    await hass.async_block_till_done()
+
+    # Bez pominiętego przejścia – piec mógł zmienić nastawę w czasie przerwy
+    engine.async_set_connected(False)
+    engine.async_set_connected(True)
+    assert [fields for fields, _ in apply.calls] == [{"BoilerTempCmd": "6000"}] * 2
+    engine.async_shutdown()
+
+
+async def test_timeout_after_reconnect_not_resent_twice(hass: HomeAssistant) -> None:
+    engine, apply = await _engine(hass)
+    assert [fields for fields, _ in apply.calls] == [{"BoilerTempCmd": "6000"}]
+
+    # Połączenie zrywa się i wraca w trakcie retransmisji, potem stara komenda wygasa
+    engine.async_set_connected(False)
+    engine.async_set_connected(True)
+    apply.calls[0][1].set_result({"BoilerTempCmd": ACK_TIMEOUT})
+    await hass.async_block_till_done()
+
+    assert [fields for fields, _ in apply.calls][1:] == [{"BoilerTempCmd": "6000"}]
+    assert engine.as_dict()["pending_after_reconnect"] == []
+    engine.async_shutdown()
+
+
+async def test_timeout_on_same_connection_waits_for_reconnect(hass: HomeAssistant) -> None:
+    engine, apply = await _engine(hass)
+    apply.calls[0][1].set_result({"BoilerTempCmd": ACK_TIMEOUT})
+    await hass.async_block_till_done()
+
+    assert len(apply.calls) == 1
+    assert engine.as_dict()["pending_after_reconnect"] == ["BoilerTempCmd"]
+    engine.async_set_connected(False)
+    engine.async_set_connected(True)
+    assert len(apply.calls) == 2
+    engine.async_shutdown()
+
+
+async def test_acked_and_cancelled_not_resent(hass: HomeAssistant) -> None:
+    engine, apply = await _engine(hass)
+    apply.calls[0][1].set_result({"BoilerTempCmd": ACK_CONFIRMED})
+    engine._async_send({"BoilerTempCmd"})
+    apply.calls[1][1].set_result({"BoilerTempCmd": ACK_CANCELLED})
+    await hass.async_block_till_done()
+
+    assert engine.as_dict()["pending_after_reconnect"] == []
+    engine.async_shutdown()
@@ -0,0 +1,30 @@
+"""Sensory mocy i energii – niedostępne bez połączenia i przed pierwszym odczytem licznika."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.coordinator import EltermCoordinator
+from custom_components.lokalterm.power import PowerEstimator
+from custom_components.lokalterm.sensor import POWER_SENSORS, EltermPowerSensor
+
+from .conftest import FRAME
+
+
+async def test_power_sensor_availability(hass: HomeAssistant) -> None:
+    coordinator = EltermCoordinator(hass, name="test")
+    power = PowerEstimator()
+    sensors = [EltermPowerSensor(coordinator, power, "DEV1", "Piec", desc) for desc in POWER_SENSORS]
+
+    assert not any(s.available for s in sensors)
+    coordinator.async_set_frame(dict(FRAME))
+    coordinator.async_set_connected(True)
+    # Ramka bez licznika P033 – estymator nadal bez danych
+    power.add_frame({k: v for k, v in FRAME.items() if k != "P033"})
+    assert not any(s.available for s in sensors)
+
+    power.add_frame(FRAME)
+    assert all(s.available for s in sensors)
+
+    coordinator.async_set_connected(False)
+    assert not any(s.available for s in sensors)
@@ -0,0 +1,30 @@
+"""Usługa apply_settings – pola snake_case i kodowanie na kabel."""
+
+from __future__ import annotations
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.lokalterm.fields import WRITABLE_FIELDS
+from custom_components.lokalterm.services import APPLY_FIELD_KEYS, APPLY_SETTINGS_SCHEMA, _encode_fields
+
+
+def test_apply_field_keys_cover_writable_fields() -> None:
+    assert set(APPLY_FIELD_KEYS.values()) == WRITABLE_FIELDS
+
+
+def test_encode_snake_case_fields() -> None:
+    data = APPLY_SETTINGS_SCHEMA({"boiler_temp_cmd": 55, "dhw_mode": "PRIORYTET", "bu_modul_max": "67"})
+    assert _encode_fields(data) == {"BoilerTempCmd": "5500", "DHWMode": "Priority", "BuModulMax": "1"}
+
+
+def test_wire_names_rejected() -> None:
+    with pytest.raises(vol.Invalid):
+        APPLY_SETTINGS_SCHEMA({"BoilerTempCmd": 55})
+
+
+def test_out_of_range_value() -> None:
+    with pytest.raises(ServiceValidationError):
+        _encode_fields(APPLY_SETTINGS_SCHEMA({"boiler_temp_cmd": 90}))
@@ -0,0 +1,102 @@
+"""Dekodowanie ramki SkzpData do EltermSnapshot."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.lokalterm.snapshot import decode_frame, overlay_snapshot
+
+from .conftest import FRAME
+
+
+def test_decode_real_frame() -> None:
+    snap = decode_frame(FRAME)
+    assert snap.boiler_temp_act == 45.12
+    assert snap.boiler_temp_cmd == 50.0
+    assert snap.boiler_hist == 2.0
+    assert snap.dhw_temp_act == 41.0
+    assert snap.dhw_temp_cmd == 55.0
+    assert snap.dhw_hist == 3.0
+    assert snap.ch1_mode == "Still_On"
+    assert snap.dhw_mode == "Priority"
+    assert snap.power_step == 2
+    assert snap.energy_kwh == 123.46
+    assert snap.get("DevStatus") == "0000670"
+
+
+def test_decode_raw_is_read_only_view() -> None:
+    obj = dict(FRAME)
+    snap = decode_frame(obj)
+    with pytest.raises(TypeError):
+        snap.raw["BoilerTempAct"] = "9999"  # type: ignore[index]
+    assert decode_frame(snap.raw).raw is snap.raw
+
+
+def test_decode_missing_fields() -> None:
+    snap = decode_frame({"FrameType": "SkzpData"})
+    assert snap.boiler_temp_act is None
+    assert snap.dhw_temp_cmd is None
+    assert snap.ch1_mode is None
+    assert snap.dhw_mode is None
+    assert snap.power_step is None
+    assert snap.power_percent is None
+    assert snap.energy_kwh is None
+
+
+def test_decode_garbage_values() -> None:
+    snap = decode_frame(
+        dict(FRAME, BoilerTempAct="45.1x", DHWTempAct="", BoilerHist=None, BuModulMax="dwa", P033="n/a")
+    )
+    assert snap.boiler_temp_act is None
+    assert snap.dhw_temp_act is None
+    assert snap.boiler_hist is None
+    assert snap.power_step is None
+    assert snap.energy_kwh is None
+    # Pozostałe pola dekodują się mimo błędnych sąsiadów
+    assert snap.boiler_temp_cmd == 50.0
+
+
+def test_decode_negative_temperature() -> None:
+    assert decode_frame(dict(FRAME, BoilerTempAct="-150")).boiler_temp_act == -1.5
+
+
+def test_power_percent_from_dev_status() -> None:
+    assert decode_frame(FRAME).power_percent == 67
+    assert decode_frame(dict(FRAME, DevStatus="000100x")).power_percent == 100
+
+
+def test_power_percent_without_dev_status() -> None:
+    # Bez DevStatus: z trybu CO i stopnia mocy
+    assert decode_frame(dict(FRAME, DevStatus=None, BuModulMax="0")).power_percent == 33
+    assert decode_frame(dict(FRAME, DevStatus="00100xx", BuModulMax="1")).power_percent == 67
+    assert decode_frame(dict(FRAME, DevStatus=None, CH1Mode="Stop")).power_percent == 0
+    assert decode_frame(dict(FRAME, DevStatus=None, BuModulMax=None)).power_percent is None
+
+
+def test_mode_decoding() -> None:
+    snap = decode_frame(dict(FRAME, CH1Mode="Stop", DHWMode="Still_On"))
+    assert snap.ch1_mode == "Stop"
+    assert snap.dhw_mode == "Still_On"
+
+
+def test_overlay_snapshot_decodes_only_overridden_fields() -> None:
+    base = decode_frame(FRAME)
+    overlay = {"BoilerTempCmd": "5500", "CH1Mode": "Stop"}
+    snap = overlay_snapshot(base, overlay)
+    overlay["BoilerTempCmd"] = "6000"
+    assert snap.boiler_temp_cmd == 55.0
+    assert snap.ch1_mode == "Stop"
+    assert snap.get("BoilerTempCmd") == "5500"
+    # Pozostałe pola wprost z ramki bazowej
+    assert snap.boiler_temp_act is base.boiler_temp_act
+    assert snap.get("DHWTempCmd") == "5500"
+    assert snap.power_percent == 67
+    assert base.boiler_temp_cmd == 50.0
+    assert base.get("CH1Mode") == "Still_On"
+
+
+def test_overlay_snapshot_recomputes_power_percent() -> None:
+    base = decode_frame(dict(FRAME, DevStatus=None))
+    assert base.power_percent == 100
+    assert overlay_snapshot(base, {"BuModulMax": "0"}).power_percent == 33
+    assert overlay_snapshot(base, {"CH1Mode": "Stop"}).power_percent == 0
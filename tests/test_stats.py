@@ -0,0 +1,38 @@
+"""Statystyki komend – komendy bez potwierdzenia i nadpisane też są liczone."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm.coordinator import EltermLocalCfg, EltermLocalServer
+from custom_components.lokalterm.stats import ServerStats
+
+
+def test_timeout_recorded_in_latency() -> None:
+    stats = ServerStats()
+    stats.record_ack(queued_at=10.0, sent_at=10.1, attempts=1, now=11.0)
+    stats.record_timeout(queued_at=20.0, sent_at=20.2, attempts=3, now=40.0)
+    # Niewysłane w ogóle – czeka do rezygnacji
+    stats.record_timeout(queued_at=50.0, sent_at=None, attempts=0, now=70.0)
+
+    assert stats.acked_total == 1
+    assert stats.timeouts_total == 2
+    assert sorted(round(v) for v in stats.write_to_ack.values()) == [900, 19800]
+    assert sorted(round(v) for v in stats.click_to_write.values()) == [100, 200, 20000]
+    assert stats.write_to_ack.percentile(99) == stats.write_to_ack.summary()["max"]
+    assert stats.retransmissions_total == 2
+
+
+async def test_superseded_commands_counted(hass: HomeAssistant) -> None:
+    server = EltermLocalServer(
+        hass,
+        EltermLocalCfg(listen_host="127.0.0.1", listen_port=0, devid="DEV1", devpin="1234"),
+        on_status=lambda obj: None,
+    )
+    await server.send_data_to_send({"BoilerTempCmd": "5500"})
+    await server.send_data_to_send({"BoilerTempCmd": "6000", "DHWMode": "Priority"})
+    await server.send_data_to_send({"DHWTempCmd": "5000"})
+
+    assert server.stats.superseded_commands_total == 1
+    assert server.stats.as_dict()["commands_superseded"] == 1
+    server.async_shutdown()
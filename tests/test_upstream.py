@@ -0,0 +1,133 @@
+"""Tryb proxy – UpstreamRelay z lokalnym serwerem zastępczym."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.lokalterm import upstream
+from custom_components.lokalterm.const import UPSTREAM_QUEUE_SIZE
+from custom_components.lokalterm.upstream import UpstreamRelay
+
+from .conftest import FRAME
+
+
+class _Upstream:
+    """Serwer nadrzędny na loopbacku: zbiera ramki i pozwala odpowiadać."""
+
+    def __init__(self) -> None:
+        self.frames: asyncio.Queue[dict] = asyncio.Queue()
+        self.writers: list[asyncio.StreamWriter] = []
+        self.connected = asyncio.Event()
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.writers.append(writer)
+        self.connected.set()
+        while line := await reader.readline():
+            await self.frames.put(json.loads(line))
+
+    async def wait_connected(self) -> asyncio.StreamWriter:
+        await asyncio.wait_for(self.connected.wait(), 5)
+        self.connected.clear()
+        return self.writers[-1]
+
+    async def stop(self) -> None:
+        for writer in self.writers:
+            writer.close()
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+
+@pytest.fixture(autouse=True)
+def _fast_reconnect(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(upstream, "UPSTREAM_RECONNECT_MIN_SECONDS", 0.05)
+
+
+async def test_forward_command_and_reconnect(hass: HomeAssistant, socket_enabled: None) -> None:
+    stand_in = _Upstream()
+    port = await stand_in.start()
+    commands: list[dict[str, str]] = []
+    relay = UpstreamRelay(hass, "127.0.0.1", port, "DEV1", commands.append)
+    relay.start()
+    writer = await stand_in.wait_connected()
+
+    # Ramki statusu docierają do serwera nadrzędnego
+    relay.forward(FRAME)
+    frame = await asyncio.wait_for(stand_in.frames.get(), 5)
+    assert frame == FRAME
+    assert relay.as_dict()["frames_forwarded"] == 1
+
+    # DataToSend: tylko pola sterujące, tylko dla tego pieca
+    writer.write(b'{"FrameType":"DataToSend","vId":"OTHER","BoilerTempCmd":"4000"}\r\n')
+    writer.write(
+        b'{"FrameType":"DataToSend","vId":"DEV1","vPin":"1234","vToken":"X",'
+        b'"BoilerTempCmd":"6000","P101":"1","Junk":"x"}\r\n'
+    )
+    await writer.drain()
+    for _ in range(100):
+        if commands:
+            break
+        await asyncio.sleep(0.01)
+    assert commands == [{"BoilerTempCmd": "6000"}]
+
+    # Serwer zamyka połączenie – relay łączy się ponownie
+    writer.close()
+    await stand_in.wait_connected()
+    for _ in range(100):
+        if relay.connected:
+            break
+        await asyncio.sleep(0.01)
+    assert relay.as_dict()["connects"] == 2
+    relay.forward(dict(FRAME, BoilerTempAct="4600"))
+    frame = await asyncio.wait_for(stand_in.frames.get(), 5)
+    assert frame["BoilerTempAct"] == "4600"
+
+    await relay.stop()
+    await stand_in.stop()
+
+
+async def test_reconnect_backoff_while_unreachable(
+    hass: HomeAssistant, socket_enabled: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    delays: list[float] = []
+
+    async def _record_sleep(delay: float) -> None:
+        delays.append(delay)
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(upstream, "_sleep", _record_sleep)
+    stand_in = _Upstream()
+    port = await stand_in.start()
+    await stand_in.stop()
+
+    relay = UpstreamRelay(hass, "127.0.0.1", port, "DEV1", lambda _fields: None)
+    relay.start()
+    for _ in range(200):
+        if len(delays) >= 4:
+            break
+        await asyncio.sleep(0.01)
+    await relay.stop()
+
+    assert delays[:4] == [0.05, 0.1, 0.2, 0.4]
+    assert relay.as_dict()["last_error"].startswith("connect:")
+
+
+async def test_queue_drops_oldest(hass: HomeAssistant) -> None:
+    relay = UpstreamRelay(hass, "127.0.0.1", 1, "DEV1", lambda _fields: None)
+    for i in range(UPSTREAM_QUEUE_SIZE + 4):
+        relay.forward(dict(FRAME, n=i))
+
+    state = relay.as_dict()
+    assert state["frames_dropped"] == 4
+    assert state["queued"] == UPSTREAM_QUEUE_SIZE
+    assert [f["n"] for f in relay._queue] == list(range(4, UPSTREAM_QUEUE_SIZE + 4))
@@ -0,0 +1,190 @@
+"""Benchmark end-to-end ścieżki LokalTerm: gniazdo -> parser -> routing -> ack -> koordynator.
+
+Uruchamia w procesie instancję Home Assistant (wymaga zainstalowanego pakietu
+``homeassistant``), wspólny listener LokalTerm na 127.0.0.1 oraz symulowane
+piece (``tools/simulator.py``) w osobnym procesie – dzięki temu zużycie CPU
+liczone jest tylko po stronie serwera. Nie wymaga sieci poza loopbackiem.
+
+Przykład::
+
+    python tools/benchmark.py --devices 1 10 100 --duration 20 --rate 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.lokalterm.coordinator import (  # noqa: E402
+    EltermCoordinator,
+    EltermLocalCfg,
+    EltermLocalServer,
+)
+from custom_components.lokalterm.publish import FramePublisher  # noqa: E402
+from custom_components.lokalterm.stats import LatencyRing  # noqa: E402
+
+SIMULATOR = ROOT / "tools" / "simulator.py"
+PIN = "0000"
+ID_PREFIX = "SIM"
+# Zapas na potwierdzenie ostatnich komend (kolejna ramka statusu + debounce)
+_ACK_GRACE_SECONDS = 1.5
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _maxrss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def run_scenario(devices: int, args: argparse.Namespace) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        port = _free_port()
+        sessions: list[EltermLocalServer] = []
+        publishers: list[FramePublisher] = []
+
+        for i in range(1, devices + 1):
+            devid = f"{ID_PREFIX}{i:04d}"
+            coordinator = EltermCoordinator(hass, name=f"bench_{devid}")
+            publisher = FramePublisher(hass, coordinator.async_set_frame)
+            server = EltermLocalServer(
+                hass,
+                EltermLocalCfg(listen_host="127.0.0.1", listen_port=port, devid=devid, devpin=PIN),
+                on_status=publisher.async_on_status,
+                entry_id=devid,
+            )
+            await server.start()
+            sessions.append(server)
+            publishers.append(publisher)
+
+        sim = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(SIMULATOR),
+            "--port", str(port),
+            "--devices", str(devices),
+            "--id-prefix", ID_PREFIX,
+            "--pin", PIN,
+            "--rate", str(args.rate),
+            "--ack-delay", str(args.ack_delay),
+            "--drop-rate", str(args.drop_rate),
+            "--duration", str(args.warmup + args.duration + args.ack_delay + _ACK_GRACE_SECONDS + 1),
+            "--json",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        await asyncio.sleep(args.warmup)
+
+        frames0 = sum(s.stats.frames_in.total for s in sessions)
+        bytes0 = sum(s.stats.bytes_in.total for s in sessions)
+        published0 = sum(p.published for p in publishers)
+        cpu0 = time.process_time()
+        rss0 = _maxrss_kb()
+        t0 = loop.time()
+
+        rnd = random.Random(args.seed)
+        commands = 0
+        while loop.time() - t0 < args.duration:
+            await asyncio.sleep(args.command_interval)
+            target = rnd.choice(sessions)
+            await target.send_data_to_send({"BoilerTempCmd": str(rnd.randrange(4000, 6500, 100))})
+            commands += 1
+
+        elapsed = loop.time() - t0
+        cpu = time.process_time() - cpu0
+        frames = sum(s.stats.frames_in.total for s in sessions) - frames0
+        nbytes = sum(s.stats.bytes_in.total for s in sessions) - bytes0
+        rss_growth = _maxrss_kb() - rss0
+        published = sum(p.published for p in publishers) - published0
+
+        # Dajemy czas na potwierdzenia ostatnich komend
+        await asyncio.sleep(args.ack_delay + _ACK_GRACE_SECONDS)
+        acks = LatencyRing(size=max(16, commands * 2))
+        for s in sessions:
+            for v in s.stats.write_to_ack.values():
+                acks.add(v)
+
+        out, _ = await sim.communicate()
+        sim_summary = json.loads(out.decode() or "{}") if out else {}
+
+        for p in publishers:
+            p.async_shutdown()
+        for s in sessions:
+            s.async_shutdown()
+            await s.stop()
+        await hass.async_stop(force=True)
+
+    return {
+        "devices": devices,
+        "frames_per_s": round(frames / elapsed, 1),
+        "bytes_per_s": round(nbytes / elapsed, 1),
+        "published_per_s": round(published / elapsed, 1),
+        "cpu_us_per_frame": round(cpu / frames * 1e6, 1) if frames else None,
+        "cpu_percent": round(cpu / elapsed * 100, 1),
+        "maxrss_growth_kb": rss_growth,
+        "commands": commands,
+        "ack_ms": acks.summary(),
+        "timeouts": sum(s.stats.timeouts_total for s in sessions),
+        "parse_errors": sum(sum(s.parse_errors.values()) for s in sessions),
+        "simulator": sim_summary,
+    }
+
+
+def _print_table(results: list[dict[str, Any]]) -> None:
+    header = f"{'pieców':>7} {'ramek/s':>9} {'B/s':>10} {'publ./s':>8} {'µs CPU/ramkę':>13} {'CPU %':>6} {'RSS +KB':>8} {'ack p50':>8} {'ack p95':>8} {'ack p99':>8} {'timeout':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        ack = r["ack_ms"]
+        print(
+            f"{r['devices']:>7} {r['frames_per_s']:>9} {r['bytes_per_s']:>10} {r['published_per_s']:>8} {str(r['cpu_us_per_frame']):>13} "
+            f"{r['cpu_percent']:>6} {r['maxrss_growth_kb']:>8} {str(ack['p50']):>8} {str(ack['p95']):>8} "
+            f"{str(ack['p99']):>8} {r['timeouts']:>7}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> list[dict[str, Any]]:
+    return [await run_scenario(n, args) for n in args.devices]
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark LokalTerm z symulowanymi piecami")
+    p.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100])
+    p.add_argument("--duration", type=float, default=20.0, help="czas pomiaru (s) na scenariusz")
+    p.add_argument("--warmup", type=float, default=3.0)
+    p.add_argument("--rate", type=float, default=2.0, help="ramki/s na piec")
+    p.add_argument("--ack-delay", type=float, default=0.3)
+    p.add_argument("--drop-rate", type=float, default=0.0)
+    p.add_argument("--command-interval", type=float, default=0.5, help="odstęp między komendami (s)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--json", action="store_true", help="wyniki jako JSON")
+    args = p.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Odtwarzanie zapisu ramek LokalTerm (``.jsonl.gz``) offline.
+
+Uruchamia w procesie instancję Home Assistant (wymaga zainstalowanego pakietu
+``homeassistant``), tak jak ``tools/benchmark.py``, i przepuszcza zapis przez
+parser, dopasowanie potwierdzeń i koordynator – bez gniazda i bez pieca.
+Na końcu wypisuje statystyki sesji i ostatni zdekodowany stan.
+
+Przykład::
+
+    python tools/replay.py /config/lokalterm_capture/capture-XYZ-20240101-120000.jsonl.gz --speed 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.lokalterm.coordinator import EltermCoordinator  # noqa: E402
+from custom_components.lokalterm.replay import async_replay_capture  # noqa: E402
+
+
+async def run(path: Path, speed: float) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        coordinator = EltermCoordinator(hass, name="replay")
+        # Każda ramka trafia do koordynatora – bez martwej strefy publikacji
+        result = await async_replay_capture(hass, path, coordinator.async_set_frame, speed=speed)
+        snapshot = coordinator.data
+        await hass.async_stop(force=True)
+
+    result["snapshot"] = (
+        None
+        if snapshot is None
+        else {f.name: getattr(snapshot, f.name) for f in fields(snapshot) if f.name != "raw"}
+    )
+    return result
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Odtwarzanie zapisu ramek LokalTerm offline")
+    p.add_argument("path", type=Path, help="plik zapisu .jsonl.gz")
+    p.add_argument("--speed", type=float, default=0.0, help="1 – tempo rzeczywiste, 0 – najszybciej")
+    args = p.parse_args()
+
+    result = asyncio.run(run(args.path, args.speed))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Symulator modułu WIZ108SR / klienta SKZP do testów LokalTerm bez pieca.
+
+Łączy się z serwerem LokalTerm (domyślnie 127.0.0.1:1088), wysyła ramki
+SkzpData z zadaną częstotliwością i wykonuje komendy DataToSend z
+konfigurowalnym opóźnieniem i odsetkiem zgubionych komend.
+
+Przykład::
+
+    python tools/simulator.py --port 1088 --devices 3 --rate 1 --ack-delay 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+_LOGGER = logging.getLogger("lokalterm.simulator")
+
+# Pola sterujące ramki DataToSend, których symulator nie traktuje jako ustawień
+_CONTROL_KEYS = {"FrameType", "vId", "vPin", "vToken"}
+
+
+def initial_state(devid: str, seed: int) -> dict[str, str]:
+    """Stan startowy pieca w postaci pól ramki SkzpData (wartości jak na kablu)."""
+    rnd = random.Random(seed)
+    state = {
+        "FrameType": "SkzpData",
+        "vId": devid,
+        "BoilerTempAct": str(4000 + rnd.randint(0, 1500)),
+        "BoilerTempCmd": "5000",
+        "BoilerHist": "200",
+        "DHWTempAct": str(3800 + rnd.randint(0, 1200)),
+        "DHWTempCmd": "5000",
+        "DHWHist": "300",
+        "CH1Mode": "Still_On",
+        "DHWMode": "Still_On",
+        "BuModulMax": "2",
+        "DevStatus": "000067",
+        "P033": f"{rnd.uniform(100, 5000):.3f}",
+    }
+    # Parametry serwisowe – realistyczny rozmiar ramki
+    for i in range(1, 41):
+        state.setdefault(f"P{i:03d}", str(rnd.randint(0, 100)))
+    return state
+
+
+@dataclass
+class SimStats:
+    frames_sent: int = 0
+    commands_received: int = 0
+    commands_applied: int = 0
+    commands_dropped: int = 0
+    reconnects: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class SimulatedBoiler:
+    """Jeden symulowany piec – jedno połączenie TCP do serwera."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        devid: str,
+        devpin: str,
+        rate: float = 1.0,
+        ack_delay: float = 0.5,
+        drop_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.devid = devid
+        self.devpin = devpin
+        self.rate = rate
+        self.ack_delay = ack_delay
+        self.drop_rate = drop_rate
+        self.state = initial_state(devid, seed)
+        self.stats = SimStats()
+        self._rnd = random.Random(seed)
+        self._energy = float(self.state["P033"])
+
+    def _tick(self) -> None:
+        """Drobne zmiany temperatur i licznika energii między ramkami."""
+        act = int(self.state["BoilerTempAct"]) + self._rnd.choice((-1, 0, 0, 1))
+        self.state["BoilerTempAct"] = str(act)
+        if self._rnd.random() < 0.1:
+            self.state["DHWTempAct"] = str(int(self.state["DHWTempAct"]) + self._rnd.choice((-10, 10)))
+        if self.state["CH1Mode"] != "Stop":
+            self._energy += 0.0005
+        self.state["P033"] = f"{self._energy:.3f}"
+
+    def _apply(self, fields: dict[str, Any]) -> None:
+        for k, v in fields.items():
+            if k in self.state:
+                self.state[k] = str(v)
+        self.stats.commands_applied += 1
+
+    def _on_command(self, raw: bytes) -> None:
+        try:
+            obj = json.loads(raw)
+        except ValueError:
+            self.stats.errors.append("niepoprawny JSON komendy")
+            return
+        if obj.get("FrameType") != "DataToSend":
+            return
+        self.stats.commands_received += 1
+        if obj.get("vId") != self.devid or obj.get("vPin") != self.devpin:
+            self.stats.errors.append("komenda z błędnym vId/vPin")
+            return
+        if self._rnd.random() < self.drop_rate:
+            self.stats.commands_dropped += 1
+            return
+        fields = {k: v for k, v in obj.items() if k not in _CONTROL_KEYS}
+        asyncio.get_running_loop().call_later(self.ack_delay, self._apply, fields)
+
+    async def _reader(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            self._on_command(line)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        period = 1.0 / self.rate if self.rate > 0 else 1.0
+        while not stop.is_set():
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                self.stats.reconnects += 1
+                _LOGGER.debug("%s: brak połączenia (%s), ponawiam", self.devid, e)
+                await asyncio.sleep(1.0)
+                continue
+
+            read_task = asyncio.create_task(self._reader(reader))
+            next_at = time.monotonic()
+            try:
+                while not stop.is_set() and not read_task.done():
+                    self._tick()
+                    writer.write(json.dumps(self.state, separators=(",", ":")).encode("ascii") + b"\r\n")
+                    await writer.drain()
+                    self.stats.frames_sent += 1
+                    next_at += period
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        try:
+                            await asyncio.wait_for(stop.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+            except (ConnectionError, OSError) as e:
+                self.stats.reconnects += 1
+                _LOGGER.debug("%s: połączenie zerwane (%s)", self.devid, e)
+            finally:
+                read_task.cancel()
+                writer.close()
+
+
+def device_ids(prefix: str, count: int) -> list[str]:
+    return [f"{prefix}{i:04d}" for i in range(1, count + 1)]
+
+
+async def run_simulation(args: argparse.Namespace) -> list[SimulatedBoiler]:
+    stop = asyncio.Event()
+    boilers = [
+        SimulatedBoiler(
+            args.host,
+            args.port,
+            devid,
+            args.pin,
+            rate=args.rate,
+            ack_delay=args.ack_delay,
+            drop_rate=args.drop_rate,
+            seed=args.seed + i,
+        )
+        for i, devid in enumerate(device_ids(args.id_prefix, args.devices))
+    ]
+    tasks = [asyncio.create_task(b.run(stop)) for b in boilers]
+    try:
+        if args.duration > 0:
+            await asyncio.sleep(args.duration)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return boilers
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Symulator pieca Elterm (WIZ108SR/SKZP) dla LokalTerm")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=1088)
+    p.add_argument("--devices", type=int, default=1, help="liczba symulowanych pieców")
+    p.add_argument("--id-prefix", default="SIM", help="prefiks vId (SIM0001, SIM0002, ...)")
+    p.add_argument("--pin", default="0000", help="vPin oczekiwany w komendach")
+    p.add_argument("--rate", type=float, default=1.0, help="ramki SkzpData na sekundę na piec")
+    p.add_argument("--ack-delay", type=float, default=0.5, help="opóźnienie wykonania komendy (s)")
+    p.add_argument("--drop-rate", type=float, default=0.0, help="odsetek gubionych komend (0..1)")
+    p.add_argument("--duration", type=float, default=0.0, help="czas pracy (s), 0 = bez końca")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--json", action="store_true", help="wypisz statystyki jako JSON na koniec")
+    return p
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        boilers = asyncio.run(run_simulation(args))
+    except KeyboardInterrupt:
+        return
+    summary = {
+        "frames_sent": sum(b.stats.frames_sent for b in boilers),
+        "commands_received": sum(b.stats.commands_received for b in boilers),
+        "commands_applied": sum(b.stats.commands_applied for b in boilers),
+        "commands_dropped": sum(b.stats.commands_dropped for b in boilers),
+        "reconnects": sum(b.stats.reconnects for b in boilers),
+        "errors": sum(len(b.stats.errors) for b in boilers),
+    }
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        for k, v in summary.items():
+            print(f"{k:>18}: {v}")
+
+
+if __name__ == "__main__":
+    main()